@@ -0,0 +1,173 @@
+"""
+Benchmark suite for the clinical data quality pipeline.
+
+Generates seeded synthetic datasets (see healthcli.synthetic), times each
+pipeline stage on them and compares the results with recorded baselines:
+- rows/s per stage must not drop more than --tolerance below the baseline
+- result checks (violation counts, FHIR counters) must match exactly,
+  since the generator is deterministic
+
+Usage:
+    python benchmarks/run_benchmarks.py                      # 10k rows, compare
+    python benchmarks/run_benchmarks.py --sizes 10k 1m       # larger sizes
+    python benchmarks/run_benchmarks.py --sizes 10k --update # record baselines
+
+Exit status is 1 if any stage regressed or any result check changed.
+"""
+
+import argparse
+import json
+import logging
+import platform
+import sys
+import tempfile
+from pathlib import Path
+from typing import Dict, List
+
+from healthcli.clinical_rules_extended import run_clinical_rules
+from healthcli.data_loader import load_csv_data
+from healthcli.metrics import MetricsRecorder
+from healthcli.quality import fhir_validation_summary, missing_summary
+from healthcli.quality_report import QualityReportGenerator
+from healthcli.render_worker import render_missing_chart
+from healthcli.synthetic import SIZES, write_dataset
+
+
+BASELINE_PATH = Path(__file__).with_name("baselines.json")
+
+# Thresholds only matter for logging; the benchmark measures throughput
+BENCH_CONFIG = {
+    "quality": {"missing": {"warning_threshold": 1.0, "critical_threshold": 1.0}},
+}
+
+
+def run_case(kind: str, size: str, seed: int, work_dir: Path) -> Dict:
+    """Generate one dataset, time every stage and collect result checks."""
+    logger = logging.getLogger("healthcli.benchmarks")
+    n_rows = SIZES[size]
+    data_path = write_dataset(kind, n_rows, str(work_dir / f"{kind}-{size}.csv"), seed=seed)
+
+    recorder = MetricsRecorder(logger=logger)
+
+    with recorder.stage("load_csv_data", rows=n_rows):
+        df = load_csv_data(str(data_path))
+    with recorder.stage("missing_summary", rows=n_rows):
+        summary = missing_summary(df, logger, BENCH_CONFIG)
+    with recorder.stage("run_clinical_rules", rows=n_rows):
+        clinical = run_clinical_rules(df, logger)
+    with recorder.stage("fhir_validation_summary", rows=n_rows):
+        fhir = fhir_validation_summary(df, logger)
+    # matplotlib is imported on the first chart (healthcli defers it to keep
+    # startup fast); pay that once-per-process cost outside the timed stage
+    render_missing_chart({"warm_up": 1})
+    with recorder.stage("quality_report_html", rows=n_rows):
+        missing_for_report = {
+            col: {"count": int(row["missing_count"]), "pct": float(row["missing_ratio"]) * 100}
+            for col, row in summary.iterrows()
+        }
+        QualityReportGenerator(logger=logger).generate_html_report(
+            df,
+            missing_summary=missing_for_report,
+            clinical_violations=clinical,
+            fhir_summary=fhir,
+            output_path=str(work_dir / f"{kind}-{size}.html"),
+        )
+
+    checks = {f"clinical:{name}": result.count for name, result in clinical.items()}
+    checks.update({
+        f"fhir:{key}": value for key, value in fhir.items() if isinstance(value, int)
+    })
+    checks["missing:total"] = int(summary["missing_count"].sum())
+
+    return {
+        "rows": n_rows,
+        "stages": {
+            m.stage: {
+                "wall_seconds": round(m.wall_seconds, 4),
+                "rows_per_second": round(m.rows_per_second or 0.0, 1),
+            }
+            for m in recorder.stages
+        },
+        "checks": checks,
+    }
+
+
+def compare(case: str, result: Dict, baseline: Dict, tolerance: float) -> List[str]:
+    """Return human-readable regressions of result against baseline."""
+    problems = []
+
+    for stage, timing in baseline.get("stages", {}).items():
+        current = result["stages"].get(stage)
+        if current is None:
+            problems.append(f"{case}: stage {stage} missing from results")
+            continue
+        floor = timing["rows_per_second"] * (1 - tolerance)
+        if current["rows_per_second"] < floor:
+            problems.append(
+                f"{case}: {stage} regressed to {current['rows_per_second']:,.0f} rows/s "
+                f"(baseline {timing['rows_per_second']:,.0f}, floor {floor:,.0f})"
+            )
+
+    for key, expected in baseline.get("checks", {}).items():
+        actual = result["checks"].get(key)
+        if actual != expected:
+            problems.append(f"{case}: result check {key} changed from {expected} to {actual}")
+
+    return problems
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark healthcli pipeline stages")
+    parser.add_argument("--kinds", nargs="+", default=["diabetic", "vitals"], choices=["diabetic", "vitals"])
+    parser.add_argument("--sizes", nargs="+", default=["10k"], choices=sorted(SIZES))
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--tolerance", type=float, default=None, help="Allowed rows/s drop (default from baselines)")
+    parser.add_argument("--baseline", default=str(BASELINE_PATH))
+    parser.add_argument("--update", action="store_true", help="Record results as the new baselines")
+    args = parser.parse_args(argv)
+
+    # Rule and threshold warnings are expected on synthetic data
+    logging.getLogger("healthcli.benchmarks").setLevel(logging.ERROR)
+
+    baseline_path = Path(args.baseline)
+    baselines = json.loads(baseline_path.read_text()) if baseline_path.exists() else {}
+    tolerance = args.tolerance if args.tolerance is not None else baselines.get("tolerance", 0.25)
+    recorded = baselines.setdefault("results", {})
+
+    problems = []
+    with tempfile.TemporaryDirectory(prefix="healthcli-bench-") as tmp:
+        for kind in args.kinds:
+            for size in args.sizes:
+                case = f"{kind}-{size}-seed{args.seed}"
+                result = run_case(kind, size, args.seed, Path(tmp))
+
+                print(f"\n[{case}]")
+                for stage, timing in result["stages"].items():
+                    print(f"  {stage:<26} {timing['wall_seconds']:>9.3f}s {timing['rows_per_second']:>14,.0f} rows/s")
+
+                if args.update:
+                    recorded[case] = result
+                elif case in recorded:
+                    problems.extend(compare(case, result, recorded[case], tolerance))
+                else:
+                    print(f"  (no baseline recorded for {case})")
+
+    if args.update:
+        baselines["tolerance"] = tolerance
+        baselines["machine"] = {"python": platform.python_version(), "platform": platform.platform()}
+        baseline_path.write_text(json.dumps(baselines, indent=2, sort_keys=True) + "\n")
+        print(f"\nBaselines written to {baseline_path}")
+        return 0
+
+    if problems:
+        print("\nRegressions detected:")
+        for problem in problems:
+            print(f"  - {problem}")
+        return 1
+
+    print("\nNo regressions against baselines.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,223 @@
+"""
+Columnar (Parquet) result artifacts.
+
+Row-level validation results are written as typed Parquet files so
+downstream dashboards can read them with column projection instead of
+re-running validation:
+- violations.parquet: one row per rule violation (rule, row_id, column)
+- column_profile.parquet: one row per input column (dtype, missing
+  counts, distinct count, numeric min/max/mean)
+- fhir_errors.parquet: one row per FHIR model validation failure
+  (resource, row_id, column, error_class)
+
+Files are written through pyarrow.parquet.ParquetWriter in record
+batches, so large violation lists are never materialised as one table.
+pyarrow is an optional dependency; without it the artifacts are skipped.
+"""
+
+import logging
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+
+RESULTS_DIR = "results"
+DEFAULT_BATCH_SIZE = 65_536
+
+# Populated by load_pyarrow() on first use
+PYARROW_IMPORT_ERROR = None
+
+
+def load_pyarrow():
+    """Import pyarrow and pyarrow.parquet, or return None if unavailable."""
+    global PYARROW_IMPORT_ERROR
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as exc:
+        PYARROW_IMPORT_ERROR = exc
+        return None
+    return pa, pq
+
+
+def pyarrow_available() -> bool:
+    return load_pyarrow() is not None
+
+
+def _row_id(value: Any) -> Optional[int]:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _batched(items: Iterable, size: int) -> Iterator[List]:
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def write_violations(clinical_violations: Dict, path: Path, batch_size: int = DEFAULT_BATCH_SIZE) -> int:
+    """
+    Stream every rule violation to a Parquet file.
+
+    Row-level rules contribute row_id; column-level rules (e.g.
+    MissingDataThresholdRule) contribute the column name instead.
+    Returns the number of rows written.
+    """
+    pa, pq = load_pyarrow()
+    schema = pa.schema([
+        ("rule", pa.dictionary(pa.int32(), pa.string())),
+        ("severity", pa.dictionary(pa.int8(), pa.string())),
+        ("row_id", pa.int64()),
+        ("column", pa.string()),
+    ])
+
+    written = 0
+    with pq.ParquetWriter(str(path), schema) as writer:
+        for rule_name, result in clinical_violations.items():
+            violations = result.violations
+            row_level = not violations or isinstance(violations[0], (int, np.integer))
+            for start in range(0, len(violations), batch_size):
+                chunk = violations[start:start + batch_size]
+                n = len(chunk)
+                if row_level:
+                    row_ids = pa.array(np.asarray(chunk, dtype=np.int64))
+                    columns = pa.nulls(n, pa.string())
+                else:
+                    row_ids = pa.nulls(n, pa.int64())
+                    columns = pa.array([str(v) for v in chunk], pa.string())
+                batch = pa.record_batch(
+                    [
+                        pa.DictionaryArray.from_arrays(pa.array(np.zeros(n, dtype=np.int32)), [rule_name]),
+                        pa.DictionaryArray.from_arrays(pa.array(np.zeros(n, dtype=np.int8)), [result.severity]),
+                        row_ids,
+                        columns,
+                    ],
+                    schema=schema,
+                )
+                writer.write_batch(batch)
+                written += n
+
+    return written
+
+
+def column_profile(df: pd.DataFrame) -> List[Dict[str, Any]]:
+    """One profile record per column of the input DataFrame."""
+    missing = df.isna().sum()
+    rows = len(df)
+    records = []
+    for col in df.columns:
+        series = df[col]
+        numeric = pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series)
+        records.append({
+            "column": str(col),
+            "dtype": str(series.dtype),
+            "rows": rows,
+            "missing_count": int(missing[col]),
+            "missing_ratio": float(missing[col] / rows) if rows else 0.0,
+            "distinct_count": int(series.nunique(dropna=True)),
+            "min": float(series.min()) if numeric and series.notna().any() else None,
+            "max": float(series.max()) if numeric and series.notna().any() else None,
+            "mean": float(series.mean()) if numeric and series.notna().any() else None,
+        })
+    return records
+
+
+def write_column_profile(records: List[Dict[str, Any]], path: Path) -> int:
+    """Write column profile records (see column_profile) to a Parquet file."""
+    pa, pq = load_pyarrow()
+
+    schema = pa.schema([
+        ("column", pa.string()),
+        ("dtype", pa.string()),
+        ("rows", pa.int64()),
+        ("missing_count", pa.int64()),
+        ("missing_ratio", pa.float64()),
+        ("distinct_count", pa.int64()),
+        ("min", pa.float64()),
+        ("max", pa.float64()),
+        ("mean", pa.float64()),
+    ])
+    pq.write_table(pa.Table.from_pylist(records, schema=schema), str(path))
+    return len(records)
+
+
+def write_fhir_errors(fhir_summary: Dict, path: Path, batch_size: int = DEFAULT_BATCH_SIZE) -> int:
+    """Stream structured FHIR validation failures to a Parquet file."""
+    pa, pq = load_pyarrow()
+    schema = pa.schema([
+        ("resource", pa.dictionary(pa.int8(), pa.string())),
+        ("row_id", pa.int64()),
+        ("column", pa.dictionary(pa.int32(), pa.string())),
+        ("error_class", pa.dictionary(pa.int32(), pa.string())),
+    ])
+
+    written = 0
+    details = (fhir_summary or {}).get("error_details", [])
+    with pq.ParquetWriter(str(path), schema) as writer:
+        for chunk in _batched(details, batch_size):
+            batch = pa.record_batch(
+                [
+                    pa.array([d["resource"] for d in chunk], pa.string()).dictionary_encode(),
+                    pa.array([_row_id(d["row"]) for d in chunk], pa.int64()),
+                    pa.array([d["column"] for d in chunk], pa.string()).dictionary_encode(),
+                    pa.array([d["error_class"] for d in chunk], pa.string()).dictionary_encode(),
+                ],
+                schema=schema,
+            )
+            writer.write_batch(batch)
+            written += len(chunk)
+
+    return written
+
+
+def write_result_artifacts(
+    df: Optional[pd.DataFrame],
+    results: Dict,
+    output_dir: str,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    logger: Optional[logging.Logger] = None,
+    profile: Optional[List[Dict[str, Any]]] = None,
+) -> List[str]:
+    """
+    Write all columnar artifacts to <output_dir>/results/.
+
+    The column profile is computed from df unless precomputed profile
+    records are given (incremental runs pass df=None). Returns the written file paths relative to output_dir (empty if
+    pyarrow is not installed).
+    """
+    logger = logger or logging.getLogger("healthcli.artifacts")
+    if not pyarrow_available():
+        logger.warning(
+            "Columnar artifacts skipped: pyarrow is not installed (%s). Install with: pip install pyarrow",
+            PYARROW_IMPORT_ERROR,
+        )
+        return []
+
+    out_dir = Path(output_dir)
+    results_dir = out_dir / RESULTS_DIR
+    results_dir.mkdir(parents=True, exist_ok=True)
+
+    paths = {
+        "violations": results_dir / "violations.parquet",
+        "column_profile": results_dir / "column_profile.parquet",
+        "fhir_errors": results_dir / "fhir_errors.parquet",
+    }
+    n_violations = write_violations(results.get("clinical_violations") or {}, paths["violations"], batch_size)
+    write_column_profile(profile if profile is not None else column_profile(df), paths["column_profile"])
+    n_errors = write_fhir_errors(results.get("fhir_summary"), paths["fhir_errors"], batch_size)
+
+    logger.info(
+        "Columnar artifacts written to %s (%d violations, %d FHIR errors)",
+        results_dir,
+        n_violations,
+        n_errors,
+    )
+    return [p.relative_to(out_dir).as_posix() for p in paths.values()]
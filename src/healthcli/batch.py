@@ -0,0 +1,265 @@
+"""
+Batch validation of many datasets (healthcli batch).
+
+Instead of one `healthcli pipeline` process per file, a batch runs every
+dataset of a manifest or glob on one pool of warm worker processes
+(warmup.warm_up):
+- each distinct config file is loaded once and shared with every job
+- each dataset gets its own output directory, <output>/<name>/
+- a failing dataset is recorded and the batch carries on; a dataset that
+  kills its worker process (e.g. out of memory) is retried alone so it
+  cannot take other datasets down with it
+- index.json and index.html in <output> summarise every dataset and
+  link to its quality report
+
+A manifest is a YAML list whose entries are paths or glob patterns, or
+mappings with data, and optionally name and config:
+
+    - drops/site1.csv
+    - drops/archive/*.csv
+    - {data: drops/site2.csv, name: site2-icu, config: config/icu.yaml}
+
+Relative paths in a manifest are resolved against its directory.
+"""
+
+import glob
+import json
+import logging
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import yaml
+
+from healthcli.config_loader import load_config
+from healthcli.history import dataset_name
+from healthcli.warmup import warm_up
+
+INDEX_JSON = "index.json"
+INDEX_HTML = "index.html"
+ERROR_FILE = "error.txt"
+
+# run_pipeline keyword arguments a batch may set for every dataset
+BATCH_OPTIONS = ("force", "sample", "sample_by")
+
+
+def _expand(pattern: str) -> List[str]:
+    if glob.has_magic(pattern):
+        return sorted(glob.glob(pattern, recursive=True))
+    return [pattern]
+
+
+def collect_datasets(
+    patterns: List[str],
+    manifest: Optional[str] = None,
+    default_config: str = "config/config.yaml",
+) -> List[Dict[str, str]]:
+    """
+    Datasets named by glob patterns and/or a manifest file.
+
+    Returns one {name, data, config} entry per dataset, in order and
+    without duplicate paths. Names default to the file name without
+    extension (as in the run history) and are made unique with a suffix.
+    """
+    entries = []
+    for pattern in patterns:
+        entries += [{"data": path} for path in _expand(pattern)]
+
+    if manifest is not None:
+        base = Path(manifest).parent
+        with open(manifest, "r", encoding="utf-8") as f:
+            listed = yaml.safe_load(f) or []
+        if not isinstance(listed, list):
+            raise ValueError(f"Batch manifest must be a list of datasets: {manifest}")
+        for entry in listed:
+            if isinstance(entry, str):
+                entry = {"data": entry}
+            if not isinstance(entry, dict) or "data" not in entry:
+                raise ValueError(f"Invalid batch manifest entry: {entry!r}")
+            for path in _expand(str(base / entry["data"])):
+                resolved = {**entry, "data": path}
+                if "config" in entry:
+                    resolved["config"] = str(base / entry["config"])
+                entries.append(resolved)
+
+    datasets: List[Dict[str, str]] = []
+    seen_paths, seen_names = set(), set()
+    for entry in entries:
+        data = str(Path(entry["data"]).resolve())
+        if data in seen_paths:
+            continue
+        seen_paths.add(data)
+
+        base_name = name = entry.get("name") or dataset_name(data)
+        suffix = 2
+        while name in seen_names:
+            name = f"{base_name}-{suffix}"
+            suffix += 1
+        seen_names.add(name)
+        datasets.append({"name": name, "data": data, "config": entry.get("config") or default_config})
+    return datasets
+
+
+def run_dataset(dataset: Dict[str, str], output: str, config: dict, options: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Worker: run the pipeline for one dataset and summarise the outcome.
+
+    Exceptions are caught and reported, with the traceback written to
+    <output>/error.txt, so one bad file never fails the batch.
+    """
+    from healthcli.pipeline import RUN_SUMMARY, run_pipeline
+
+    out_dir = Path(output)
+    start = time.perf_counter()
+    record: Dict[str, Any] = {"name": dataset["name"], "data": dataset["data"], "output": str(out_dir)}
+    try:
+        run_pipeline(dataset["data"], dataset["config"], str(out_dir), config=config, **options)
+    except Exception as exc:
+        out_dir.mkdir(parents=True, exist_ok=True)
+        (out_dir / ERROR_FILE).write_text(traceback.format_exc(), encoding="utf-8")
+        record.update(status="failed", error=f"{type(exc).__name__}: {exc}")
+    else:
+        with open(out_dir / RUN_SUMMARY, "r", encoding="utf-8") as f:
+            record.update(status="succeeded", summary=json.load(f))
+        (out_dir / ERROR_FILE).unlink(missing_ok=True)
+    record["seconds"] = round(time.perf_counter() - start, 3)
+    return record
+
+
+def validate_batch(
+    datasets: List[Dict[str, str]],
+    output_dir: str,
+    concurrency: int = 1,
+    options: Optional[Dict[str, Any]] = None,
+    logger: Optional[logging.Logger] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Run every dataset on a pool of concurrency warm workers and write the index.
+
+    Returns one result record per dataset, in input order.
+    """
+    logger = logger or logging.getLogger("healthcli.batch")
+    options = {key: options[key] for key in BATCH_OPTIONS if (options or {}).get(key) is not None}
+    out_dir = Path(output_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    configs = {path: load_config(path) for path in {d["config"] for d in datasets}}
+    started_at = datetime.now().isoformat(timespec="seconds")
+
+    def submit(executor, dataset):
+        return executor.submit(
+            run_dataset, dataset, str(out_dir / dataset["name"]), configs[dataset["config"]], options
+        )
+
+    results: Dict[str, Dict[str, Any]] = {}
+    crashed: List[Dict[str, str]] = []
+    with ProcessPoolExecutor(max_workers=max(min(concurrency, len(datasets)), 1), initializer=warm_up) as executor:
+        futures = {submit(executor, dataset): dataset for dataset in datasets}
+        for future in as_completed(futures):
+            dataset = futures[future]
+            try:
+                results[dataset["name"]] = future.result()
+            except BrokenProcessPool:
+                crashed.append(dataset)
+                continue
+            log_result(results[dataset["name"]], logger)
+
+    # A worker died and took the pool's pending jobs with it: rerun each
+    # of them alone to find the dataset responsible
+    for dataset in crashed:
+        with ProcessPoolExecutor(max_workers=1) as executor:
+            try:
+                results[dataset["name"]] = submit(executor, dataset).result()
+            except BrokenProcessPool:
+                results[dataset["name"]] = {
+                    "name": dataset["name"],
+                    "data": dataset["data"],
+                    "output": str(out_dir / dataset["name"]),
+                    "status": "failed",
+                    "error": "Worker process died (e.g. killed for running out of memory)",
+                }
+        log_result(results[dataset["name"]], logger)
+
+    ordered = [results[dataset["name"]] for dataset in datasets]
+    write_index(ordered, out_dir, started_at)
+    logger.info("Batch index written to %s", out_dir / INDEX_HTML)
+    return ordered
+
+
+def log_result(result: Dict[str, Any], logger: logging.Logger) -> None:
+    if result["status"] == "succeeded":
+        logger.info("%s: succeeded in %.2fs", result["name"], result["seconds"])
+    else:
+        logger.error("%s: %s", result["name"], result["error"])
+
+
+INDEX_TEMPLATE = """<!DOCTYPE html>
+<html>
+<head>
+    <meta charset="UTF-8">
+    <title>Batch Quality Index</title>
+    <style>
+        body { font-family: Arial, sans-serif; margin: 20px; background-color: #f5f5f5; }
+        .container { max-width: 1200px; margin: 0 auto; background-color: white; padding: 30px; }
+        h1 { color: #2c3e50; border-bottom: 3px solid #3498db; padding-bottom: 10px; }
+        table { width: 100%; border-collapse: collapse; margin: 20px 0; }
+        th { background-color: #3498db; color: white; padding: 10px; text-align: left; }
+        td { padding: 8px 10px; border-bottom: 1px solid #ddd; }
+        .failed { color: #dc3545; font-weight: bold; }
+        .succeeded { color: #28a745; font-weight: bold; }
+    </style>
+</head>
+<body>
+    <div class="container">
+        <h1>Batch Quality Index</h1>
+        <p>Started {{ started_at }}: {{ datasets | length }} datasets, {{ failed }} failed.</p>
+        <table>
+            <thead>
+                <tr>
+                    <th>Dataset</th>
+                    <th>Status</th>
+                    <th>Rows</th>
+                    <th>Completeness</th>
+                    <th>Rule Violations</th>
+                    <th>FHIR Errors</th>
+                    <th>Time (s)</th>
+                </tr>
+            </thead>
+            <tbody>
+            {% for d in datasets %}
+                <tr>
+                    {% if d.status == "succeeded" %}
+                    <td><a href="{{ d.name }}/quality_report.html">{{ d.name }}</a>{% if d.summary.sample %} (sample){% endif %}</td>
+                    <td class="succeeded">✓ succeeded</td>
+                    <td>{{ d.summary.rows }}</td>
+                    <td>{{ d.summary.completeness_pct }}%</td>
+                    <td>{{ d.summary.violations.values() | sum }}</td>
+                    <td>{{ (d.summary.fhir.patient_errors or 0) + (d.summary.fhir.observation_errors or 0) }}</td>
+                    {% else %}
+                    <td>{{ d.name }}</td>
+                    <td class="failed">✗ failed</td>
+                    <td colspan="4">{{ d.error }}</td>
+                    {% endif %}
+                    <td>{{ d.seconds if d.seconds is defined else "-" }}</td>
+                </tr>
+            {% endfor %}
+            </tbody>
+        </table>
+    </div>
+</body>
+</html>
+"""
+
+
+def write_index(results: List[Dict[str, Any]], output_dir: Path, started_at: str) -> None:
+    """Write index.json and index.html summarising a batch."""
+    from jinja2 import Template
+
+    failed = sum(r["status"] != "succeeded" for r in results)
+    with open(output_dir / INDEX_JSON, "w", encoding="utf-8") as f:
+        json.dump({"started_at": started_at, "failed": failed, "datasets": results}, f, indent=2)
+    html = Template(INDEX_TEMPLATE, autoescape=True).render(started_at=started_at, datasets=results, failed=failed)
+    (output_dir / INDEX_HTML).write_text(html, encoding="utf-8")
@@ -0,0 +1,311 @@
+"""
+FHIR Bulk Data (NDJSON) ingestion.
+
+A Bulk Data export is a directory of NDJSON files, one resource per line
+(Patient.ndjson, Observation.ndjson, ...; optionally gzipped). Instead of
+reading a flat CSV and validating a row-to-payload mapping, the loader:
+- streams each file line by line and validates batch_lines lines at a
+  time with one TypeAdapter.validate_json call against Patient,
+  VitalSigns (Observations with a vital sign code) or Observation; each
+  line's errors are captured inside the batch, so only malformed JSON
+  falls back to line-by-line parsing
+- keeps nothing of a batch but its flattened values, so memory is bound
+  by the resulting frame, not by the size of the export
+- flattens valid resources into the columns the existing rules expect:
+  one row per patient and effectiveDateTime, with a column per known
+  Observation code (LOINC_COLUMNS) and the patient's gender, birth date
+  and age at the time of the reading
+
+The validation counts and errors are returned in the shape of
+quality.fhir_validation_summary, with rows numbered across the export's
+lines. Other resource types (Encounter, Condition, ...) are counted as
+skipped.
+"""
+
+import gzip
+import logging
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Annotated, Any, Callable, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+from pydantic import (
+    BaseModel,
+    Discriminator,
+    Tag,
+    TypeAdapter,
+    ValidationError,
+    ValidatorFunctionWrapHandler,
+    WrapValidator,
+)
+
+from healthcli.fhir_models import (
+    LOINC_COLUMNS,
+    Observation,
+    Patient,
+    VitalSigns,
+    observation_code,
+    vital_sign_column,
+)
+from healthcli.quality import LAB_COLUMNS, VITAL_SIGN_UNITS, _record_error
+
+NDJSON_SUFFIXES = (".ndjson", ".ndjson.gz")
+DEFAULT_BATCH_LINES = 5_000
+
+VALUE_COLUMNS = list(VITAL_SIGN_UNITS) + LAB_COLUMNS
+
+
+def column_for_code(code: Optional[str]) -> Optional[str]:
+    """
+    Frame column of an Observation code: a LOINC code, a vital sign code
+    the VitalSigns registry resolves (fhir_models.vital_sign_column) or a
+    lab column name.
+    """
+    if not code:
+        return None
+    if code in LOINC_COLUMNS:
+        return LOINC_COLUMNS[code]
+    return vital_sign_column(code) or (code if code in LAB_COLUMNS else None)
+
+
+class OtherResource(BaseModel):
+    """Any other resource type: counted, not validated further."""
+    resourceType: str
+
+
+def _resource_tag(value: Any) -> Optional[str]:
+    if not isinstance(value, dict) or not isinstance(value.get("resourceType"), str):
+        return None
+    resource_type = value["resourceType"]
+    if resource_type == "Observation":
+        column = column_for_code(observation_code(value.get("code")))
+        return "VitalSigns" if column in VITAL_SIGN_UNITS else "Observation"
+    return resource_type if resource_type == "Patient" else "Other"
+
+
+Resource = Annotated[
+    Union[
+        Annotated[Patient, Tag("Patient")],
+        Annotated[VitalSigns, Tag("VitalSigns")],
+        Annotated[Observation, Tag("Observation")],
+        Annotated[OtherResource, Tag("Other")],
+    ],
+    Discriminator(_resource_tag),
+]
+# One validated resource, or the errors of its line
+Outcome = Union[BaseModel, List[Dict[str, Any]]]
+
+
+def _capture_errors(value: Any, handler: ValidatorFunctionWrapHandler) -> Outcome:
+    try:
+        return handler(value)
+    except ValidationError as exc:
+        return exc.errors()
+
+
+# Each item's errors are captured, so one failing line does not fail its batch
+_BATCH = TypeAdapter(List[Annotated[Resource, WrapValidator(_capture_errors)]])
+_ONE = TypeAdapter(Resource)
+
+
+@dataclass
+class BulkFhir:
+    """Flattened frame and validation summary of an NDJSON export."""
+    frame: pd.DataFrame
+    summary: Dict[str, Any]
+    files: List[str]
+
+
+def is_fhir_ndjson(data_path: str) -> bool:
+    """True for an NDJSON file or a directory containing NDJSON files."""
+    return bool(ndjson_files(data_path))
+
+
+def ndjson_files(data_path: str) -> List[Path]:
+    path = Path(data_path)
+    if path.is_dir():
+        return sorted(p for p in path.iterdir() if p.is_file() and p.name.endswith(NDJSON_SUFFIXES))
+    return [path] if path.name.endswith(NDJSON_SUFFIXES) else []
+
+
+def _open(path: Path):
+    return gzip.open(path, "rb") if path.name.endswith(".gz") else open(path, "rb")
+
+
+def _batches(path: Path, batch_lines: int):
+    """(line number, line) batches of the non-blank lines of a file."""
+    batch: List[Tuple[int, bytes]] = []
+    with _open(path) as f:
+        for number, line in enumerate(f, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            batch.append((number, line))
+            if len(batch) >= batch_lines:
+                yield batch
+                batch = []
+    if batch:
+        yield batch
+
+
+def validate_lines(lines: List[bytes]) -> List[Outcome]:
+    """Validate NDJSON lines in one call; each outcome is a model or the line's errors."""
+    try:
+        return _BATCH.validate_json(b"[" + b",".join(lines) + b"]")
+    except ValidationError:
+        # Malformed JSON fails the whole array: check each line alone
+        return [_validate_one(line) for line in lines]
+
+
+def _validate_one(line: bytes) -> Outcome:
+    try:
+        return _ONE.validate_json(line)
+    except ValidationError as exc:
+        return exc.errors()
+
+
+def _describe(errors: List[Dict[str, Any]]) -> Tuple[str, str, str]:
+    """
+    (resource, error class, message) of a line's validation errors.
+
+    Errors are located under the resource's tag; lines that are not JSON
+    or lack a resourceType are reported as resource "NDJSON".
+    """
+    first = errors[0]
+    tagged = bool(first["loc"]) and first["loc"][0] in ("Patient", "VitalSigns", "Observation")
+    resource = first["loc"][0] if tagged else "NDJSON"
+    parts = []
+    for error in errors:
+        field = ".".join(str(part) for part in error["loc"][1 if tagged else 0:])
+        parts.append(f"{field}: {error['msg']}" if field else error["msg"])
+    return resource, first["type"], "; ".join(parts)
+
+
+def load_fhir_ndjson(
+    data_path: str,
+    batch_lines: int = DEFAULT_BATCH_LINES,
+    logger: Optional[logging.Logger] = None,
+    sink: Optional[Callable[[BaseModel], None]] = None,
+) -> BulkFhir:
+    """
+    Stream, validate and flatten the NDJSON file(s) at data_path.
+
+    Each valid Patient and Observation is passed to sink, if given.
+    """
+    logger = logger or logging.getLogger("healthcli.bulk_fhir")
+    files = ndjson_files(data_path)
+    if not files:
+        raise FileNotFoundError(f"No NDJSON files found: {data_path}")
+
+    summary: Dict[str, Any] = {
+        "patients_validated": 0,
+        "patient_errors": 0,
+        "observations_validated": 0,
+        "observation_errors": 0,
+        "invalid_lines": 0,
+        "resources_skipped": 0,
+        "unmapped_observations": 0,
+        "errors": [],
+        "error_details": [],
+    }
+    patients: List[pd.DataFrame] = []
+    readings: List[pd.DataFrame] = []
+    row = 0  # Line ordinal across the export, used as the error row
+
+    for path in files:
+        for batch in _batches(path, batch_lines):
+            patient_rows: Dict[str, list] = {"patient_id": [], "gender": [], "birthDate": []}
+            reading_rows: Dict[str, list] = {"patient_id": [], "timestamp": [], "column": [], "value": []}
+
+            for (number, _), outcome in zip(batch, validate_lines([line for _, line in batch])):
+                if isinstance(outcome, list):
+                    resource, error_class, message = _describe(outcome)
+                    if resource == "Patient":
+                        summary["patient_errors"] += 1
+                    elif resource == "NDJSON":
+                        summary["invalid_lines"] += 1
+                    else:
+                        summary["observation_errors"] += 1
+                    _record_error(
+                        summary, f"{resource} {path.name} line {number}: {message}",
+                        resource, row, None, error_class,
+                    )
+                elif isinstance(outcome, Patient):
+                    summary["patients_validated"] += 1
+                    if sink is not None:
+                        sink(outcome)
+                    patient_rows["patient_id"].append(outcome.id)
+                    patient_rows["gender"].append(outcome.gender)
+                    patient_rows["birthDate"].append(outcome.birthDate)
+                elif isinstance(outcome, Observation):
+                    summary["observations_validated"] += 1
+                    if sink is not None:
+                        sink(outcome)
+                    column = column_for_code(outcome.code)
+                    if column is None or outcome.value is None:
+                        summary["unmapped_observations"] += 1
+                    else:
+                        reading_rows["patient_id"].append(outcome.subject)
+                        reading_rows["timestamp"].append(outcome.effectiveDateTime)
+                        reading_rows["column"].append(column)
+                        reading_rows["value"].append(outcome.value.value)
+                else:
+                    summary["resources_skipped"] += 1
+                row += 1
+
+            if patient_rows["patient_id"]:
+                patients.append(pd.DataFrame(patient_rows))
+            if reading_rows["patient_id"]:
+                readings.append(pd.DataFrame(reading_rows).astype({"column": "category"}))
+
+    logger.info(
+        "Read %d lines from %d NDJSON file(s): %d patients, %d observations, %d errors, %d other resources",
+        row,
+        len(files),
+        summary["patients_validated"],
+        summary["observations_validated"],
+        summary["patient_errors"] + summary["observation_errors"] + summary["invalid_lines"],
+        summary["resources_skipped"],
+    )
+    if summary["unmapped_observations"]:
+        logger.info("%d valid observations have codes without a column", summary["unmapped_observations"])
+
+    frame = flatten(patients, readings)
+    if frame.empty:
+        raise ValueError(f"Dataset is empty: no valid Patient or Observation resources in {data_path}")
+    return BulkFhir(frame=frame, summary=summary, files=[str(p) for p in files])
+
+
+def flatten(patients: List[pd.DataFrame], readings: List[pd.DataFrame]) -> pd.DataFrame:
+    """
+    One row per patient and reading time, with a column per observed code.
+
+    Readings of the same code at the same time keep the last one. Patients
+    without readings get a row of their own.
+    """
+    people = pd.DataFrame(columns=["patient_id", "gender", "birthDate"])
+    if patients:
+        people = pd.concat(patients, ignore_index=True).drop_duplicates("patient_id", keep="last")
+    people["birthDate"] = pd.to_datetime(people["birthDate"])
+
+    if readings:
+        long = pd.concat(readings, ignore_index=True)
+        long["timestamp"] = pd.to_datetime(long["timestamp"], utc=True)
+        long = long.drop_duplicates(["patient_id", "timestamp", "column"], keep="last")
+        wide = long.pivot(index=["patient_id", "timestamp"], columns="column", values="value")
+        wide = wide.reindex(columns=[c for c in VALUE_COLUMNS if c in wide.columns]).reset_index()
+        wide.columns.name = None
+        frame = wide.merge(people, on="patient_id", how="left")
+        unseen = people[~people["patient_id"].isin(frame["patient_id"])]
+        frame = pd.concat([frame, unseen], ignore_index=True) if len(unseen) else frame
+    else:
+        frame = people.assign(timestamp=pd.NaT)
+
+    # Age in whole years at the time of each reading
+    reading_time = frame["timestamp"].dt.tz_localize(None)
+    frame["age"] = np.floor((reading_time - frame["birthDate"]).dt.days / 365.25)
+
+    leading = ["patient_id", "timestamp", "gender", "birthDate", "age"]
+    frame = frame[leading + [c for c in frame.columns if c not in leading]]
+    return frame.sort_values(["patient_id", "timestamp"], kind="stable", ignore_index=True)
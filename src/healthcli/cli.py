@@ -44,6 +44,22 @@ def build_parser():
         help="Path to the analysis configuration file (YAML)"
     )
 
+    quality_parser.add_argument(
+        "--sample",
+        type=int,
+        default=None,
+        help="Quick look: validate a sample of about this many rows and report "
+             "estimated rates with confidence intervals"
+    )
+
+    quality_parser.add_argument(
+        "--sample-by",
+        default=None,
+        help="Sample whole groups of this column (e.g. patient_id) instead of individual rows. "
+             "This is cluster sampling, not stratification: a few groups are kept entirely and "
+             "the others are left out, so --sample-by site covers only some sites"
+    )
+
     # pipeline command
     pipeline_parser = subparsers.add_parser(
         "pipeline",
@@ -53,7 +69,7 @@ def build_parser():
     pipeline_parser.add_argument(
         "--data",
         required=True,
-        help="Path to the clinical CSV dataset"
+        help="Path to the clinical CSV dataset, or to FHIR Bulk Data NDJSON file(s)"
     )
 
     pipeline_parser.add_argument(
@@ -67,4 +83,327 @@ def build_parser():
         default="./output"
     )
 
+    pipeline_parser.add_argument(
+        "--async-pdf",
+        action="store_true",
+        default=None,
+        help="Return before the PDF report is finished; "
+             "quality_report.pdf.done is written when it completes"
+    )
+
+    pipeline_parser.add_argument(
+        "--incremental",
+        action="store_true",
+        default=None,
+        help="Only validate rows appended since the last run in this output directory "
+             "and merge them into the cumulative report (append-only data)"
+    )
+
+    pipeline_parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Validate in this many patient-hash partitions in parallel worker processes "
+             "(default: parallel.workers from the config, or 1)"
+    )
+
+    pipeline_parser.add_argument(
+        "--memory-budget",
+        default=None,
+        help="Peak memory to plan the run for, e.g. 512M or 2G: workers, render process "
+             "and chunk sizes are reduced to fit (default: memory.budget from the config)"
+    )
+
+    pipeline_parser.add_argument(
+        "--sample",
+        type=int,
+        default=None,
+        help="Quick look: validate a sample of about this many rows and report "
+             "estimated rates with confidence intervals"
+    )
+
+    pipeline_parser.add_argument(
+        "--sample-by",
+        default=None,
+        help="Sample whole groups of this column (e.g. patient_id) instead of individual rows. "
+             "This is cluster sampling, not stratification: a few groups are kept entirely and "
+             "the others are left out, so --sample-by site covers only some sites"
+    )
+
+    pipeline_parser.add_argument(
+        "--export-fhir",
+        action="store_true",
+        default=None,
+        help="Also write the validated FHIR resources to <output>/fhir as NDJSON "
+             "(Patient, Observation; default: export.fhir_ndjson from the config)"
+    )
+
+    pipeline_parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Regenerate every artifact even if inputs are unchanged since the last run"
+    )
+
+    # profile command
+    profile_parser = subparsers.add_parser(
+        "profile",
+        help="Profile the quality or pipeline command (cProfile, stack samples, allocations)"
+    )
+
+    profile_parser.add_argument(
+        "target",
+        choices=["quality", "pipeline"],
+        help="Command to run under the profilers"
+    )
+
+    profile_parser.add_argument(
+        "--data",
+        required=True,
+        help="Path to the clinical CSV dataset"
+    )
+
+    profile_parser.add_argument(
+        "--config",
+        help="Path to the configuration file (YAML)"
+    )
+
+    profile_parser.add_argument(
+        "--output",
+        help="Directory for pipeline outputs when profiling the pipeline",
+        default="./output"
+    )
+
+    profile_parser.add_argument(
+        "--profile-dir",
+        help="Directory to write profile.pstats, profile.collapsed and allocation reports",
+        default="./profile"
+    )
+
+    profile_parser.add_argument(
+        "--top-n",
+        type=int,
+        default=10,
+        help="Number of allocation sites to report per stage"
+    )
+
+    profile_parser.add_argument(
+        "--sample-interval",
+        type=float,
+        default=5.0,
+        help="Stack sampling interval in milliseconds"
+    )
+
+    # history command
+    history_parser = subparsers.add_parser(
+        "history",
+        help="Show trends of past pipeline runs from the run history store"
+    )
+
+    history_parser.add_argument(
+        "view",
+        nargs="?",
+        choices=["runs", "columns", "rules"],
+        default="runs",
+        help="Trend table to show: runs, per-column missingness or per-rule violations"
+    )
+
+    history_parser.add_argument(
+        "--dataset",
+        help="Only show runs of this dataset (input file name without extension)"
+    )
+
+    history_parser.add_argument(
+        "--column",
+        help="Only show this column (columns view)"
+    )
+
+    history_parser.add_argument(
+        "--rule",
+        help="Only show this rule (rules view)"
+    )
+
+    history_parser.add_argument(
+        "--since",
+        help="Only show runs at or after this ISO date/time, e.g. 2026-01-01"
+    )
+
+    history_parser.add_argument(
+        "--until",
+        help="Only show runs before this ISO date/time"
+    )
+
+    history_parser.add_argument(
+        "--limit",
+        type=int,
+        default=20,
+        help="Number of most recent runs to include"
+    )
+
+    history_parser.add_argument(
+        "--config",
+        help="Path to the configuration file (YAML) that locates the history store"
+    )
+
+    # batch command
+    batch_parser = subparsers.add_parser(
+        "batch",
+        help="Run the pipeline for many datasets on a pool of warm worker processes"
+    )
+
+    batch_parser.add_argument(
+        "datasets",
+        nargs="*",
+        help="Dataset paths or glob patterns, e.g. 'drops/*.csv'"
+    )
+
+    batch_parser.add_argument(
+        "--manifest",
+        help="YAML list of datasets (paths, globs or {data, name, config} entries)"
+    )
+
+    batch_parser.add_argument(
+        "--config",
+        help="Configuration file (YAML) for datasets without their own config"
+    )
+
+    batch_parser.add_argument(
+        "--output",
+        default="./output/batch",
+        help="Directory for per-dataset outputs and the index report"
+    )
+
+    batch_parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=None,
+        help="Number of datasets processed at once (default: batch.concurrency from the config, or 2)"
+    )
+
+    batch_parser.add_argument(
+        "--sample",
+        type=int,
+        default=None,
+        help="Validate a sample of about this many rows of each dataset"
+    )
+
+    batch_parser.add_argument(
+        "--sample-by",
+        default=None,
+        help="Sample whole groups of this column instead of individual rows "
+             "(cluster sampling: unsampled groups are left out entirely)"
+    )
+
+    batch_parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Regenerate every artifact even if inputs are unchanged since the last run"
+    )
+
+    # serve command
+    serve_parser = subparsers.add_parser(
+        "serve",
+        help="Run a resident server that executes pipeline jobs on warm worker processes"
+    )
+
+    serve_parser.add_argument(
+        "--host",
+        default=None,
+        help="Address to listen on (default: serve.host from the config, or 127.0.0.1)"
+    )
+
+    serve_parser.add_argument(
+        "--port",
+        type=int,
+        default=None,
+        help="Port to listen on (default: serve.port from the config, or 8765)"
+    )
+
+    serve_parser.add_argument(
+        "--socket",
+        default=None,
+        help="Listen on this Unix socket instead of a TCP port"
+    )
+
+    serve_parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Number of warm worker processes running jobs (default: serve.workers, or 1)"
+    )
+
+    serve_parser.add_argument(
+        "--queue-size",
+        type=int,
+        default=None,
+        help="Maximum number of pending jobs before submissions are refused "
+             "(default: serve.queue_size, or 32)"
+    )
+
+    serve_parser.add_argument(
+        "--config",
+        help="Configuration file (YAML) for the server and the default for submitted jobs"
+    )
+
+    # watch command
+    watch_parser = subparsers.add_parser(
+        "watch",
+        help="Validate files as they land in a drop directory"
+    )
+
+    watch_parser.add_argument(
+        "directory",
+        help="Drop directory to watch"
+    )
+
+    watch_parser.add_argument(
+        "--pattern",
+        default=None,
+        help="Only validate file names matching this glob (default: watch.pattern, or *.csv)"
+    )
+
+    watch_parser.add_argument(
+        "--output",
+        default="./output/watch",
+        help="Directory for per-file outputs and the index report"
+    )
+
+    watch_parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Number of warm worker processes validating files (default: watch.workers, or 1)"
+    )
+
+    watch_parser.add_argument(
+        "--settle",
+        type=float,
+        default=None,
+        help="Seconds a completed file must stay unchanged before it is validated "
+             "(default: watch.settle_seconds, or 2)"
+    )
+
+    watch_parser.add_argument(
+        "--max-pending",
+        type=int,
+        default=None,
+        help="Maximum number of completed files waiting for a worker (default: watch.max_pending, or 100)"
+    )
+
+    watch_parser.add_argument(
+        "--existing",
+        action="store_true",
+        help="Also validate files already in the directory when the watch starts"
+    )
+
+    watch_parser.add_argument(
+        "--polling",
+        action="store_true",
+        help="Poll the directory instead of using inotify"
+    )
+
+    watch_parser.add_argument(
+        "--config",
+        help="Configuration file (YAML) for the watch and the validated files"
+    )
+
     return parser
\ No newline at end of file
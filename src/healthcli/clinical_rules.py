@@ -4,6 +4,8 @@ from typing import List, Optional
 
 import pandas as pd
 
+from healthcli.factorized import FactorizedFrame, distinct_per_group
+
 
 @dataclass
 class RuleResult:
@@ -34,8 +36,12 @@ class ClinicalRule(ABC):
     @abstractmethod is used to enforce that:
     - every subclass MUST implement apply()
     - incomplete rule implementations fail fast at runtime
+
+    priority orders rules when RuleRunner runs in gating mode:
+    lower values run first, so cheap rules should use small numbers.
     """
     name: str  # Identifier used for reporting and logging
+    priority: int = 100  # Execution order in gating mode (lower runs first)
 
     @abstractmethod
     def apply(self, df: pd.DataFrame) -> List[RuleResult]:
@@ -56,10 +62,14 @@ class PatientSexConsistencyRule(ClinicalRule):
     with multiple recorded sex values, which may indicate data entry or linkage errors.
     """
     name = "patient_sex_consistency"
+    priority = 50  # Requires a groupby over the full dataset
 
-    def apply(self, df: pd.DataFrame) -> List[RuleResult]:
+    def apply(self, df: pd.DataFrame, codes: Optional[FactorizedFrame] = None) -> List[RuleResult]:
         """
         Implements the rule-specific logic defined by the ClinicalRule contract.
+
+        codes may carry integer codes already factorized for this DataFrame,
+        so the patient key is not re-hashed for every per-patient rule.
         """
         if "patient_id" not in df.columns or "sex" not in df.columns:
             return [
@@ -70,14 +80,19 @@ class PatientSexConsistencyRule(ClinicalRule):
                 )
             ]
 
-        # Count number of unique sex values per patient
-        inconsistent = (
-            df.groupby("patient_id")["sex"]
-            .nunique(dropna=True)
-            .loc[lambda x: x > 1]
+        if codes is None:
+            codes = FactorizedFrame(df, key="patient_id")
+
+        # Count number of unique sex values per patient over integer codes
+        distinct = distinct_per_group(
+            codes.key_codes,
+            codes.n_groups,
+            codes.codes("sex"),
+            codes.cardinality("sex"),
         )
+        inconsistent = distinct[distinct > 1]
 
-        if inconsistent.empty:
+        if inconsistent.size == 0:
             return [
                 RuleResult(
                     rule=self.name,
@@ -102,6 +117,7 @@ class AgePlausibilityRule(ClinicalRule):
     This is a general sanity check and does not encode dataset or disease specific clinical criteria.
     """
     name = "age_plausibility"
+    priority = 10  # Single vectorised comparison
 
     def apply(self, df: pd.DataFrame) -> List[RuleResult]:
         """
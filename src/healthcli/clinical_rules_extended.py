@@ -9,8 +9,13 @@ structured RuleResult objects for analysis and reporting.
 import logging
 from dataclasses import dataclass, field
 from typing import Dict, List, Optional
+import numpy as np
 import pandas as pd
 
+from healthcli.factorized import FactorizedFrame
+from healthcli.logging_utils import event
+from healthcli.metrics import MetricsRecorder
+
 
 @dataclass
 class RuleResult:
@@ -67,15 +72,22 @@ class ClinicalCoherenceRule:
             )
             violations.extend(df[geriatric_renal].index.tolist())
         
-        result.violations = list(set(violations))  # Remove duplicates
+        result.violations = sorted(set(violations))  # Remove duplicates
         result.count = len(result.violations)
         
         if logger:
-            logger.warning(
-                f"{result.rule_name}: found {result.count} age/lab coherence violations"
-            )
+            self.log(result, logger)
         
         return result
+    
+    def log(self, result: RuleResult, logger: logging.Logger) -> None:
+        """Log a result of this rule (also used for merged partition results)."""
+        logger.warning(
+            "%s: found %d age/lab coherence violations",
+            result.rule_name,
+            result.count,
+            extra=event("rule", rule=result.rule_name, violations=result.count),
+        )
 
 
 class VitalSignAnomalyRule:
@@ -92,65 +104,97 @@ class VitalSignAnomalyRule:
     NOTE: Requires data sorted by patient_id and timestamp.
     """
     
+    VITAL_COLUMNS = ["systolic_bp", "heart_rate", "temperature", "spo2"]
+    
     def detect_spike(
-        self, df: pd.DataFrame, vital_column: str, threshold_pct: float = 50.0
+        self,
+        df: pd.DataFrame,
+        vital_column: str,
+        threshold_pct: float = 50.0,
+        codes: Optional[FactorizedFrame] = None,
     ) -> List[int]:
         """
         Detect > 50% change in a vital sign within same patient.
         
+        Rows are ordered once by (patient code, timestamp) and consecutive
+        readings are compared as a single vectorised pass; pairs that cross
+        a patient boundary are masked out.
+        
         Returns list of row indices with anomalies.
         """
         if vital_column not in df.columns:
             return []
         
-        anomalies = []
-        
-        # Group by patient_id, sort by timestamp
         if "patient_id" not in df.columns:
-            return anomalies
+            return []
         
-        for patient_id, group in df.groupby("patient_id", sort=False):
-            if "timestamp" in group.columns:
-                group = group.sort_values("timestamp")
-            
-            values = pd.to_numeric(group[vital_column], errors="coerce").values
-            indices = group.index.tolist()
-            
-            # Compare consecutive measurements
-            for i in range(1, len(values)):
-                prev_val = values[i - 1]
-                curr_val = values[i]
-                
-                # Skip if either value is NaN or zero
-                if pd.isna(prev_val) or pd.isna(curr_val) or prev_val == 0:
-                    continue
-                
-                # Calculate percentage change
-                pct_change = abs((curr_val - prev_val) / prev_val) * 100
-                
-                if pct_change > threshold_pct:
-                    anomalies.append(indices[i])
+        if codes is None:
+            codes = FactorizedFrame(df, key="patient_id")
+        
+        # Sorted segments: one contiguous run of rows per patient, by timestamp
+        order = codes.group_order("timestamp")
+        patient = codes.key_codes[order]
+        values = (
+            pd.to_numeric(df[vital_column], errors="coerce")
+            .to_numpy(dtype=float, na_value=np.nan)[order]
+        )
+        
+        prev_val = values[:-1]
+        curr_val = values[1:]
+        
+        # Compare consecutive measurements of the same patient, skipping
+        # pairs where either value is NaN or the previous value is zero
+        comparable = (
+            (patient[1:] == patient[:-1])
+            & (patient[1:] >= 0)
+            & ~np.isnan(prev_val)
+            & ~np.isnan(curr_val)
+            & (prev_val != 0)
+        )
+        
+        with np.errstate(divide="ignore", invalid="ignore"):
+            pct_change = np.abs((curr_val - prev_val) / prev_val) * 100
+        
+        spikes = comparable & (pct_change > threshold_pct)
         
-        return anomalies
+        return df.index[order[1:][spikes]].tolist()
     
-    def apply(self, df: pd.DataFrame, logger: logging.Logger = None) -> RuleResult:
+    def apply(
+        self,
+        df: pd.DataFrame,
+        logger: logging.Logger = None,
+        codes: Optional[FactorizedFrame] = None,
+    ) -> RuleResult:
         """
         Check for vital sign anomalies (spikes > 50%) in systolic BP, heart rate, etc.
         """
         result = RuleResult(rule_name="VitalSignAnomalyRule", severity="WARNING")
         violations = []
         
+        # Factorize the patient key once for all vital columns
+        if codes is None:
+            codes = FactorizedFrame(df, key="patient_id")
+        
         # Check common vital signs
-        for vital in ["systolic_bp", "heart_rate", "temperature", "spo2"]:
-            violations.extend(self.detect_spike(df, vital))
+        for vital in self.VITAL_COLUMNS:
+            violations.extend(self.detect_spike(df, vital, codes=codes))
         
-        result.violations = list(set(violations))
+        result.violations = sorted(set(violations))
         result.count = len(result.violations)
         
         if logger:
-            logger.warning(f"{result.rule_name}: found {result.count} vital sign anomalies")
+            self.log(result, logger)
         
         return result
+    
+    def log(self, result: RuleResult, logger: logging.Logger) -> None:
+        """Log a result of this rule (also used for merged partition results)."""
+        logger.warning(
+            "%s: found %d vital sign anomalies",
+            result.rule_name,
+            result.count,
+            extra=event("rule", rule=result.rule_name, violations=result.count),
+        )
 
 
 class MissingDataThresholdRule:
@@ -188,6 +232,20 @@ class MissingDataThresholdRule:
         
         Returns violations for columns exceeding threshold.
         """
+        return self.apply_counts(df.isna().sum().to_dict(), len(df), thresholds, logger)
+    
+    def apply_counts(
+        self,
+        missing_counts: Dict[str, int],
+        total_rows: int,
+        thresholds: Optional[Dict[str, float]] = None,
+        logger: logging.Logger = None,
+    ) -> RuleResult:
+        """
+        Same check from per-column missing counts and the total row count,
+        so counts merged across incremental runs can be checked without
+        the full DataFrame.
+        """
         result = RuleResult(rule_name="MissingDataThresholdRule", severity="WARNING")
         
         if thresholds is None:
@@ -196,8 +254,8 @@ class MissingDataThresholdRule:
         violations = []
         details_by_column = {}
         
-        for col in df.columns:
-            missing_pct = (df[col].isna().sum() / len(df)) * 100
+        for col, missing in missing_counts.items():
+            missing_pct = (missing / total_rows) * 100
             threshold = thresholds.get(col, 50.0)  # Default 50% if not specified
             
             details_by_column[col] = {
@@ -215,24 +273,34 @@ class MissingDataThresholdRule:
         
         if logger:
             logger.warning(
-                f"{result.rule_name}: {result.count} column(s) exceed missing data threshold"
+                "%s: %d column(s) exceed missing data threshold",
+                result.rule_name,
+                result.count,
+                extra=event("rule", rule=result.rule_name, violations=result.count, columns=violations),
             )
             for col in violations:
                 info = details_by_column[col]
                 logger.warning(
-                    f"  {col}: {info['missing_pct']}% missing (threshold: {info['threshold_pct']}%)"
+                    "  %s: %s%% missing (threshold: %s%%)", col, info["missing_pct"], info["threshold_pct"]
                 )
         
         return result
 
 
 def run_clinical_rules(
-    df: pd.DataFrame, logger: logging.Logger = None
+    df: pd.DataFrame,
+    logger: logging.Logger = None,
+    recorder: Optional[MetricsRecorder] = None,
+    missing_counts: Optional[Dict[str, int]] = None,
+    total_rows: Optional[int] = None,
 ) -> Dict[str, RuleResult]:
     """
     Execute all clinical validation rules on the DataFrame.
     
     Returns dict mapping rule_name -> RuleResult for further analysis.
+    If a MetricsRecorder is given, each rule is timed as its own stage.
+    If missing_counts and total_rows are given (cumulative counts from
+    incremental runs), the missing data rule checks those instead of df.
     
     Usage:
         results = run_clinical_rules(df, logger)
@@ -241,17 +309,31 @@ def run_clinical_rules(
     """
     if logger is None:
         logger = logging.getLogger("healthcli.clinical_rules_extended")
+    if recorder is None:
+        recorder = MetricsRecorder(enabled=False)
     
     results = {}
+    rows = len(df)
+    
+    # Integer codes shared by the per-patient rules
+    codes = FactorizedFrame(df, key="patient_id")
     
     # Run each rule
     coherence_rule = ClinicalCoherenceRule()
-    results["ClinicalCoherenceRule"] = coherence_rule.apply(df, logger)
+    with recorder.stage("rule:ClinicalCoherenceRule", rows=rows):
+        results["ClinicalCoherenceRule"] = coherence_rule.apply(df, logger)
     
     vital_anomaly_rule = VitalSignAnomalyRule()
-    results["VitalSignAnomalyRule"] = vital_anomaly_rule.apply(df, logger)
+    with recorder.stage("rule:VitalSignAnomalyRule", rows=rows):
+        results["VitalSignAnomalyRule"] = vital_anomaly_rule.apply(df, logger, codes=codes)
     
     missing_rule = MissingDataThresholdRule()
-    results["MissingDataThresholdRule"] = missing_rule.apply(df, logger=logger)
+    with recorder.stage("rule:MissingDataThresholdRule", rows=rows):
+        if missing_counts is not None:
+            results["MissingDataThresholdRule"] = missing_rule.apply_counts(
+                missing_counts, total_rows, logger=logger
+            )
+        else:
+            results["MissingDataThresholdRule"] = missing_rule.apply(df, logger=logger)
     
     return results
@@ -0,0 +1,113 @@
+"""
+Factorized integer-code engine for per-patient rules.
+
+Grouping on raw object columns (e.g. string patient identifiers) hashes
+every value on every groupby. Per-patient rules instead factorize the
+patient key and low-cardinality clinical attributes once into dense
+integer codes, then run their checks as np.bincount / sorted-segment
+operations over those codes.
+
+Codes follow pandas.factorize conventions: values map to 0..n-1 and
+missing values map to -1.
+"""
+
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+# Above this many (group, value) cells the bincount presence matrix
+# would outgrow the input itself, so distinct counts fall back to np.unique.
+_PRESENCE_MATRIX_FACTOR = 4
+
+
+class FactorizedFrame:
+    """
+    Lazily computed, cached integer codes for columns of a DataFrame.
+
+    Each column is factorized at most once per FactorizedFrame, so several
+    rules (or several vital columns within one rule) share the same codes.
+    The DataFrame must not be modified while the codes are in use.
+
+    Usage:
+        codes = FactorizedFrame(df)
+        patient_codes = codes.key_codes
+        sex_codes = codes.codes("sex")
+    """
+
+    def __init__(self, df: pd.DataFrame, key: str = "patient_id"):
+        self.df = df
+        self.key = key
+        self._cache: Dict[Tuple[str, bool], Tuple[np.ndarray, int]] = {}
+
+    def _factorize(self, column: str, sort: bool) -> Tuple[np.ndarray, int]:
+        cache_key = (column, sort)
+        if cache_key not in self._cache:
+            codes, uniques = pd.factorize(self.df[column], sort=sort)
+            # int32 halves the footprint of the default intp codes
+            if len(uniques) < np.iinfo(np.int32).max:
+                codes = codes.astype(np.int32, copy=False)
+            self._cache[cache_key] = (codes, len(uniques))
+        return self._cache[cache_key]
+
+    def codes(self, column: str, sort: bool = False) -> np.ndarray:
+        """
+        Dense integer codes for a column (-1 for missing values).
+
+        With sort=True the codes follow the sorted order of the values,
+        so they can stand in for the column when ordering rows.
+        """
+        return self._factorize(column, sort)[0]
+
+    def cardinality(self, column: str, sort: bool = False) -> int:
+        """Number of distinct non-missing values in a column."""
+        return self._factorize(column, sort)[1]
+
+    @property
+    def key_codes(self) -> np.ndarray:
+        return self.codes(self.key)
+
+    @property
+    def n_groups(self) -> int:
+        return self.cardinality(self.key)
+
+    def group_order(self, order_by: Optional[str] = None) -> np.ndarray:
+        """
+        Row positions sorted by group, then by order_by within each group.
+
+        The sort is stable, so rows with equal keys keep their original
+        order. Missing order_by values sort last, as in sort_values().
+        """
+        group_codes = self.key_codes
+        if order_by is None or order_by not in self.df.columns:
+            return np.argsort(group_codes, kind="stable")
+
+        order_codes = self.codes(order_by, sort=True)
+        n_values = self.cardinality(order_by, sort=True)
+        order_codes = np.where(order_codes < 0, n_values, order_codes)
+        return np.lexsort((order_codes, group_codes))
+
+
+def distinct_per_group(
+    group_codes: np.ndarray,
+    n_groups: int,
+    value_codes: np.ndarray,
+    n_values: int,
+) -> np.ndarray:
+    """
+    Count distinct non-missing values per group.
+
+    Equivalent to groupby(group)[value].nunique(dropna=True), returned
+    as an array indexed by group code.
+    """
+    valid = (group_codes >= 0) & (value_codes >= 0)
+    combined = group_codes[valid].astype(np.int64) * n_values + value_codes[valid]
+
+    n_cells = n_groups * n_values
+    if n_cells <= _PRESENCE_MATRIX_FACTOR * max(len(group_codes), 1):
+        present = np.bincount(combined, minlength=n_cells) > 0
+        return present.reshape(n_groups, n_values).sum(axis=1)
+
+    pairs = np.unique(combined)
+    return np.bincount(pairs // n_values, minlength=n_groups)
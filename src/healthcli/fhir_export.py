@@ -0,0 +1,174 @@
+"""
+Export of validated FHIR resources as NDJSON (one file per resource type).
+
+The resources fhir_validation_summary (or the NDJSON loader) validates
+are handed to an NdjsonExporter as they are built, so one pass produces
+both the quality report and the publishable resources:
+- each resource is serialized with model_dump_json and buffered per
+  resource type; a buffer is written in one call every batch_size
+  resources, so memory is bound by the batch size, not the dataset
+- files are written through gzip (or a plain buffered file) as
+  <output>/fhir/Patient.ndjson.gz and Observation.ndjson.gz; VitalSigns
+  are Observations
+- tabular data repeats a patient on each of their rows, so Patients are
+  written once per id (the ids seen are the only state that grows)
+
+Parallel runs export one part file per partition (Patient.part0.ndjson.gz,
+...), which merge_parts joins: Observation parts are appended byte for
+byte (concatenated gzip members are a valid gzip file) and Patient parts
+are streamed line by line, dropping ids already written.
+"""
+
+import gzip
+import json
+import logging
+import shutil
+from pathlib import Path
+from typing import Dict, IO, List, Optional, Set
+
+from pydantic import BaseModel
+
+from healthcli.fhir_models import Observation, Patient
+
+EXPORT_DIR = "fhir"
+DEFAULT_BATCH_SIZE = 1_000
+RESOURCE_TYPES = ("Patient", "Observation")
+
+
+def export_file_name(resource_type: str, compress: bool = True, part: Optional[int] = None) -> str:
+    suffix = ".ndjson.gz" if compress else ".ndjson"
+    return f"{resource_type}{'' if part is None else f'.part{part}'}{suffix}"
+
+
+def clear_export(directory: str) -> None:
+    """Remove NDJSON files left over from an earlier export in directory."""
+    path = Path(directory)
+    if path.is_dir():
+        for stale in path.glob("*.ndjson*"):
+            stale.unlink()
+
+
+class NdjsonExporter:
+    """
+    Sink for validated resources, writing NDJSON per resource type.
+
+    Usage:
+        with NdjsonExporter("output/fhir") as exporter:
+            fhir_validation_summary(df, logger, sink=exporter)
+        exporter.files  # file names written, relative to the directory
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        compress: bool = True,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        part: Optional[int] = None,
+    ):
+        self.directory = Path(directory)
+        self.compress = compress
+        self.batch_size = max(int(batch_size), 1)
+        self.part = part
+        self.counts: Dict[str, int] = {t: 0 for t in RESOURCE_TYPES}
+        self.files: List[str] = []
+        self._buffers: Dict[str, List[str]] = {t: [] for t in RESOURCE_TYPES}
+        self._writers: Dict[str, IO[bytes]] = {}
+        self._patient_ids: Set[str] = set()
+
+    def __call__(self, resource: BaseModel) -> None:
+        if isinstance(resource, Patient):
+            if resource.id in self._patient_ids:
+                return
+            self._patient_ids.add(resource.id)
+            resource_type = "Patient"
+        elif isinstance(resource, Observation):
+            resource_type = "Observation"
+        else:
+            return
+
+        buffer = self._buffers[resource_type]
+        buffer.append(resource.model_dump_json(exclude_none=True))
+        if len(buffer) >= self.batch_size:
+            self._flush(resource_type)
+
+    def _flush(self, resource_type: str) -> None:
+        buffer = self._buffers[resource_type]
+        if not buffer:
+            return
+        writer = self._writers.get(resource_type)
+        if writer is None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            name = export_file_name(resource_type, self.compress, self.part)
+            path = self.directory / name
+            writer = gzip.open(path, "wb", compresslevel=6) if self.compress else open(path, "wb")
+            self._writers[resource_type] = writer
+            self.files.append(name)
+        writer.write(("\n".join(buffer) + "\n").encode("utf-8"))
+        self.counts[resource_type] += len(buffer)
+        buffer.clear()
+
+    def close(self) -> List[str]:
+        """Write what is buffered and close the files; returns the file names."""
+        try:
+            for resource_type in RESOURCE_TYPES:
+                self._flush(resource_type)
+        finally:
+            for writer in self._writers.values():
+                writer.close()
+            self._writers.clear()
+        return self.files
+
+    def __enter__(self) -> "NdjsonExporter":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def merge_parts(
+    directory: str,
+    parts: List[List[str]],
+    compress: bool = True,
+    logger: Optional[logging.Logger] = None,
+) -> List[str]:
+    """
+    Join the part files of a parallel export into one file per resource type.
+
+    parts holds each partition's file names, in partition order. The part
+    files are removed; returns the merged file names.
+    """
+    logger = logger or logging.getLogger("healthcli.fhir_export")
+    path = Path(directory)
+    merged = []
+    for resource_type in RESOURCE_TYPES:
+        prefix = f"{resource_type}.part"
+        names = [name for files in parts for name in files if name.startswith(prefix)]
+        if not names:
+            continue
+        target = export_file_name(resource_type, compress)
+        with open(path / target, "wb") as out:
+            if resource_type == "Patient":
+                _merge_patients(path, names, out, compress)
+            else:
+                for name in names:
+                    with open(path / name, "rb") as part:
+                        shutil.copyfileobj(part, out)
+        for name in names:
+            (path / name).unlink()
+        merged.append(target)
+    logger.debug("Merged %d FHIR export parts into %s", sum(map(len, parts)), ", ".join(merged))
+    return merged
+
+
+def _merge_patients(path: Path, names: List[str], out: IO[bytes], compress: bool) -> None:
+    # Rows of one patient can be validated in different partitions
+    seen: Set[str] = set()
+    opener = gzip.open if compress else open
+    with (gzip.open(out, "wb", compresslevel=6) if compress else out) as writer:
+        for name in names:
+            with opener(path / name, "rb") as part:
+                for line in part:
+                    patient_id = json.loads(line)["id"]
+                    if patient_id not in seen:
+                        seen.add(patient_id)
+                        writer.write(line)
@@ -6,9 +6,108 @@ without requiring full FHIR compliance. They capture core clinical fields
 and enforce basic medical plausibility constraints.
 """
 
+import re
 from datetime import datetime, date
-from typing import Optional, List, Literal
-from pydantic import BaseModel, Field, field_validator
+from functools import lru_cache
+from typing import Any, Dict, NamedTuple, Optional, List, Literal
+from pydantic import BaseModel, Field, field_validator, model_serializer, model_validator
+
+LOINC_SYSTEM = "http://loinc.org"
+UCUM_SYSTEM = "http://unitsofmeasure.org"
+
+# LOINC codes of the vital sign and lab columns of the tabular datasets
+LOINC_COLUMNS = {
+    "8480-6": "systolic_bp",
+    "8867-4": "heart_rate",
+    "8310-5": "temperature",
+    "59408-5": "spo2",
+    "2708-6": "spo2",
+    "2345-7": "max_glu_serum",
+    "4548-4": "A1Cresult",
+}
+# Preferred LOINC code of each column (the first listed)
+COLUMN_LOINC = {}
+for _loinc, _column in LOINC_COLUMNS.items():
+    COLUMN_LOINC.setdefault(_column, _loinc)
+
+
+class VitalRange(NamedTuple):
+    """Physiologically plausible range of a vital sign."""
+    low: float
+    high: float
+    unit: str
+    ucum: str  # UCUM code of unit
+    message: str  # Error message, formatted with the value
+
+
+# Ranges enforced by VitalSigns (and transform.null_out_of_range), by column
+VITAL_SIGN_RANGES: Dict[str, VitalRange] = {
+    "systolic_bp": VitalRange(50.0, 250.0, "mmHg", "mm[Hg]", "Systolic BP {value} mmHg implausible (normal: 90–120)"),
+    "heart_rate": VitalRange(30.0, 200.0, "bpm", "/min", "Heart rate {value} bpm implausible (normal: 60–100)"),
+    "temperature": VitalRange(35.0, 42.0, "C", "Cel", "Body temperature {value} °C implausible (normal: 36.5–37.5)"),
+    "spo2": VitalRange(50.0, 100.0, "%", "%", "SpO2 {value}% implausible (normal: 95–100)"),
+}
+
+# Local codes of each vital sign besides its column name and LOINC codes
+VITAL_SIGN_ALIASES = {
+    "systolic_bp": ("systolic", "sbp"),
+    "heart_rate": ("pulse", "hr"),
+    "temperature": ("temp", "body_temperature"),
+    "spo2": ("o2sat", "oxygen", "oxygen_saturation"),
+}
+
+
+def _normalize_code(code: str) -> str:
+    # Case, and "-", "." or space separators, do not distinguish codes
+    return re.sub(r"[\s.\-]+", "_", code.strip().lower())
+
+
+_COLUMN_BY_CODE: Dict[str, str] = {
+    _normalize_code(code): column
+    for column, codes in (
+        *((column, (column,) + aliases) for column, aliases in VITAL_SIGN_ALIASES.items()),
+        *((column, (loinc,)) for loinc, column in LOINC_COLUMNS.items() if column in VITAL_SIGN_RANGES),
+    )
+    for code in codes
+}
+
+
+@lru_cache(maxsize=1024)
+def vital_sign_column(code: str) -> Optional[str]:
+    """
+    Vital sign column of a code, if it is a vital sign.
+
+    Codes are column names (heart_rate), LOINC codes (8867-4) or the
+    aliases in VITAL_SIGN_ALIASES, matched exactly up to case and
+    separators, so "heart-rate" and "Heart Rate" resolve but "threshold"
+    does not.
+    """
+    return _COLUMN_BY_CODE.get(_normalize_code(code))
+
+
+def vital_sign_range(code: str) -> Optional[VitalRange]:
+    """Range VitalSigns enforces for a code (see vital_sign_column), if any."""
+    column = vital_sign_column(code)
+    return VITAL_SIGN_RANGES[column] if column is not None else None
+
+
+def observation_code(code: Any) -> Optional[str]:
+    """
+    The code of an Observation given as a plain string or a FHIR
+    CodeableConcept: its LOINC coding if any, else its first coding, else
+    its text.
+    """
+    if code is None or isinstance(code, str):
+        return code
+    if isinstance(code, dict):
+        codings = [c for c in code.get("coding") or [] if isinstance(c, dict) and c.get("code")]
+        for coding in codings:
+            if coding.get("system") == LOINC_SYSTEM:
+                return coding["code"]
+        if codings:
+            return codings[0]["code"]
+        return code.get("text")
+    return code
 
 
 class Patient(BaseModel):
@@ -19,7 +118,10 @@ class Patient(BaseModel):
     - id: Unique patient identifier
     - gender: Biological sex (male/female/other/unknown)
     - birthDate: Date of birth for age calculation
+
+    Other FHIR Patient elements (name, address, ...) are ignored.
     """
+    resourceType: Literal["Patient"] = "Patient"
     id: str = Field(..., description="Patient unique identifier (e.g., MRN)")
     gender: Literal["male", "female", "other", "unknown"] = "unknown"
     birthDate: Optional[date] = Field(None, description="Date of birth")
@@ -49,7 +151,8 @@ class Quantity(BaseModel):
     """
     value: float = Field(..., description="Numeric measurement value")
     unit: str = Field(..., description="Unit of measurement")
-    code: str = Field(..., description="Unit code (e.g., mmHg, mg/dL)")
+    system: Optional[str] = Field(None, description="Unit code system (e.g., UCUM_SYSTEM)")
+    code: str = Field(..., description="Unit code (e.g., mm[Hg], mg/dL)")
 
 
 class Observation(BaseModel):
@@ -65,7 +168,13 @@ class Observation(BaseModel):
     - subject: Patient ID reference
     - value: The measured quantity
     - effectiveDateTime: When observation was taken
+
+    FHIR JSON shapes are accepted as well (as in Bulk Data exports): a
+    CodeableConcept code, a Reference subject ("Patient/123") and a
+    valueQuantity. Serialization (model_dump_json) produces that shape,
+    with the LOINC coding of known column codes.
     """
+    resourceType: Literal["Observation"] = "Observation"
     id: str = Field(..., description="Observation unique ID")
     status: Literal["preliminary", "final", "amended", "cancelled"] = "final"
     code: str = Field(..., description="Observation code (e.g., glucose, blood-pressure-systolic)")
@@ -73,6 +182,47 @@ class Observation(BaseModel):
     value: Optional[Quantity] = None
     effectiveDateTime: Optional[datetime] = Field(None, description="Observation timestamp")
 
+    @model_validator(mode="before")
+    @classmethod
+    def from_fhir_json(cls, data: Any) -> Any:
+        """Map FHIR Observation elements onto the simplified fields."""
+        if not isinstance(data, dict):
+            return data
+        data = dict(data)
+        if isinstance(data.get("code"), dict):
+            data["code"] = observation_code(data["code"])
+        subject = data.get("subject")
+        if isinstance(subject, dict) and "reference" in subject:
+            data["subject"] = str(subject["reference"]).rsplit("/", 1)[-1]
+        quantity = data.pop("valueQuantity", None)
+        if isinstance(quantity, dict) and "value" not in data:
+            unit = quantity.get("unit") or quantity.get("code")
+            data["value"] = {
+                "value": quantity.get("value"),
+                "unit": unit,
+                "system": quantity.get("system"),
+                "code": quantity.get("code") or unit,
+            }
+        return data
+
+    @model_serializer(mode="wrap")
+    def to_fhir_json(self, handler) -> dict:
+        """Serialize as a FHIR Observation resource."""
+        data = handler(self)
+        loinc = self.code if self.code in LOINC_COLUMNS else COLUMN_LOINC.get(self.code)
+        code: dict = {"coding": [{"system": LOINC_SYSTEM, "code": loinc}]} if loinc else {}
+        if loinc != self.code:
+            code["text"] = self.code
+
+        resource = {key: data[key] for key in ("resourceType", "id", "status") if key in data}
+        resource["code"] = code
+        resource["subject"] = {"reference": f"Patient/{self.subject}"}
+        if "effectiveDateTime" in data:
+            resource["effectiveDateTime"] = data["effectiveDateTime"]
+        if data.get("value") is not None:
+            resource["valueQuantity"] = data["value"]
+        return resource
+
 
 class VitalSigns(Observation):
     """
@@ -93,27 +243,8 @@ class VitalSigns(Observation):
         if not v:
             return v
         
-        code = info.data.get("code", "").lower()
-        val = v.value
-        
-        # Systolic blood pressure: 50–250 mmHg
-        if "systolic" in code or "sbp" in code:
-            if val < 50 or val > 250:
-                raise ValueError(f"Systolic BP {val} mmHg implausible (normal: 90–120)")
-        
-        # Heart rate: 30–200 bpm
-        elif "heart.rate" in code or "pulse" in code or "hr" in code:
-            if val < 30 or val > 200:
-                raise ValueError(f"Heart rate {val} bpm implausible (normal: 60–100)")
-        
-        # Body temperature: 35–42 °C
-        elif "temperature" in code or "temp" in code:
-            if val < 35 or val > 42:
-                raise ValueError(f"Body temperature {val} °C implausible (normal: 36.5–37.5)")
-        
-        # Oxygen saturation: 50–100%
-        elif "oxygen" in code or "spo2" in code or "o2sat" in code:
-            if val < 50 or val > 100:
-                raise ValueError(f"SpO2 {val}% implausible (normal: 95–100)")
+        bounds = vital_sign_range(info.data.get("code", ""))
+        if bounds is not None and not bounds.low <= v.value <= bounds.high:
+            raise ValueError(bounds.message.format(value=v.value))
         
         return v
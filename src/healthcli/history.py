@@ -0,0 +1,249 @@
+"""
+Persistent run history.
+
+Every pipeline run appends its results to an embedded SQLite database so
+missingness and violation counts can be trended across runs without
+scraping log files:
+- runs: one row per run (dataset, input path, time, row/column counts,
+  FHIR validation counters)
+- column_metrics: one row per column per run (missing count and ratio)
+- rule_metrics: one row per clinical rule per run (severity, count)
+
+All rows of a run are written in one transaction with executemany.
+Queries go through indexes on (dataset, run_at), so `healthcli history`
+reads only the runs it reports on.
+"""
+
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+DEFAULT_HISTORY_PATH = "history/healthcli.db"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    dataset TEXT NOT NULL,
+    data_path TEXT NOT NULL,
+    run_at TEXT NOT NULL,
+    rows INTEGER NOT NULL,
+    columns INTEGER NOT NULL,
+    inputs_key TEXT,
+    patients_validated INTEGER,
+    patient_errors INTEGER,
+    observations_validated INTEGER,
+    observation_errors INTEGER
+);
+CREATE TABLE IF NOT EXISTS column_metrics (
+    run_id INTEGER NOT NULL REFERENCES runs(run_id) ON DELETE CASCADE,
+    column_name TEXT NOT NULL,
+    missing_count INTEGER NOT NULL,
+    missing_ratio REAL NOT NULL,
+    PRIMARY KEY (run_id, column_name)
+);
+CREATE TABLE IF NOT EXISTS rule_metrics (
+    run_id INTEGER NOT NULL REFERENCES runs(run_id) ON DELETE CASCADE,
+    rule TEXT NOT NULL,
+    severity TEXT NOT NULL,
+    violations INTEGER NOT NULL,
+    PRIMARY KEY (run_id, rule)
+);
+CREATE INDEX IF NOT EXISTS idx_runs_dataset_time ON runs (dataset, run_at);
+CREATE INDEX IF NOT EXISTS idx_runs_time ON runs (run_at);
+CREATE INDEX IF NOT EXISTS idx_column_metrics_column ON column_metrics (column_name, run_id);
+CREATE INDEX IF NOT EXISTS idx_rule_metrics_rule ON rule_metrics (rule, run_id);
+"""
+
+FHIR_COUNTERS = ("patients_validated", "patient_errors", "observations_validated", "observation_errors")
+
+
+def dataset_name(data_path: str) -> str:
+    """Default dataset label: the input file name without extension."""
+    return Path(data_path).stem
+
+
+class HistoryStore:
+    """
+    SQLite-backed store of per-run, per-column and per-rule metrics.
+
+    Usage:
+        with HistoryStore("history/healthcli.db") as store:
+            store.record_run("diabetic", "data/diabetic.csv", rows, columns,
+                             missing_summary=ms, clinical_violations=cv)
+            header, rows = store.rule_trend(dataset="diabetic")
+    """
+
+    def __init__(self, path: str = DEFAULT_HISTORY_PATH):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.path))
+        self.conn.execute("PRAGMA foreign_keys = ON")
+        self.conn.execute("PRAGMA journal_mode = WAL")
+        self.conn.executescript(SCHEMA)
+
+    def __enter__(self) -> "HistoryStore":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def record_run(
+        self,
+        dataset: str,
+        data_path: str,
+        rows: int,
+        columns: int,
+        missing_summary=None,
+        clinical_violations: Optional[Dict] = None,
+        fhir_summary: Optional[Dict] = None,
+        inputs_key: Optional[str] = None,
+        run_at: Optional[str] = None,
+    ) -> int:
+        """
+        Store one run and its column and rule metrics in a single transaction.
+
+        missing_summary is the DataFrame returned by quality.missing_summary
+        (index = column, with missing_count and missing_ratio). Returns the
+        new run_id.
+        """
+        run_at = run_at or datetime.now().isoformat(timespec="seconds")
+        fhir_summary = fhir_summary or {}
+
+        column_rows: List[Tuple] = []
+        if missing_summary is not None and len(missing_summary):
+            column_rows = [
+                (str(col), int(count), float(ratio))
+                for col, count, ratio in zip(
+                    missing_summary.index,
+                    missing_summary["missing_count"],
+                    missing_summary["missing_ratio"],
+                )
+            ]
+        rule_rows = [
+            (name, result.severity, int(result.count))
+            for name, result in (clinical_violations or {}).items()
+        ]
+
+        with self.conn:
+            cursor = self.conn.execute(
+                "INSERT INTO runs (dataset, data_path, run_at, rows, columns, inputs_key, "
+                + ", ".join(FHIR_COUNTERS)
+                + ") VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    dataset,
+                    str(data_path),
+                    run_at,
+                    int(rows),
+                    int(columns),
+                    inputs_key,
+                    *(fhir_summary.get(name) for name in FHIR_COUNTERS),
+                ),
+            )
+            run_id = cursor.lastrowid
+            self.conn.executemany(
+                "INSERT INTO column_metrics (run_id, column_name, missing_count, missing_ratio) "
+                "VALUES (?, ?, ?, ?)",
+                [(run_id, *row) for row in column_rows],
+            )
+            self.conn.executemany(
+                "INSERT INTO rule_metrics (run_id, rule, severity, violations) VALUES (?, ?, ?, ?)",
+                [(run_id, *row) for row in rule_rows],
+            )
+        return run_id
+
+    def _query(self, sql: str, params: Sequence[Any]) -> Tuple[List[str], List[Tuple]]:
+        cursor = self.conn.execute(sql, params)
+        header = [d[0] for d in cursor.description]
+        return header, cursor.fetchall()
+
+    @staticmethod
+    def _run_filter(
+        dataset: Optional[str], since: Optional[str], until: Optional[str]
+    ) -> Tuple[str, List[Any]]:
+        clauses, params = [], []
+        if dataset is not None:
+            clauses.append("r.dataset = ?")
+            params.append(dataset)
+        if since is not None:
+            clauses.append("r.run_at >= ?")
+            params.append(since)
+        if until is not None:
+            clauses.append("r.run_at < ?")
+            params.append(until)
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def run_trend(
+        self,
+        dataset: Optional[str] = None,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+        limit: int = 50,
+    ) -> Tuple[List[str], List[Tuple]]:
+        """Most recent runs with row counts, total violations and FHIR counters."""
+        where, params = self._run_filter(dataset, since, until)
+        sql = (
+            "SELECT r.run_id, r.dataset, r.run_at, r.rows, r.columns, "
+            "(SELECT COALESCE(SUM(m.violations), 0) FROM rule_metrics m WHERE m.run_id = r.run_id) "
+            "AS violations, r.patient_errors, r.observation_errors "
+            f"FROM runs r{where} ORDER BY r.run_at DESC, r.run_id DESC LIMIT ?"
+        )
+        return self._query(sql, params + [limit])
+
+    def column_trend(
+        self,
+        dataset: Optional[str] = None,
+        column: Optional[str] = None,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+        limit: int = 50,
+    ) -> Tuple[List[str], List[Tuple]]:
+        """Missingness per column over the most recent runs."""
+        # The run filter and LIMIT apply to runs; the column filter to the joined rows
+        inner_where, inner_params = self._run_filter(dataset, since, until)
+        sql = (
+            "SELECT r.run_id, r.dataset, r.run_at, c.column_name, c.missing_count, c.missing_ratio "
+            f"FROM (SELECT * FROM runs r{inner_where} "
+            "ORDER BY r.run_at DESC, r.run_id DESC LIMIT ?) r "
+            "JOIN column_metrics c ON c.run_id = r.run_id"
+        )
+        sql += " WHERE c.column_name = ?" if column is not None else ""
+        sql += " ORDER BY r.run_at DESC, r.run_id DESC, c.missing_ratio DESC"
+        query_params = inner_params + [limit] + ([column] if column is not None else [])
+        return self._query(sql, query_params)
+
+    def rule_trend(
+        self,
+        dataset: Optional[str] = None,
+        rule: Optional[str] = None,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+        limit: int = 50,
+    ) -> Tuple[List[str], List[Tuple]]:
+        """Violation counts per clinical rule over the most recent runs."""
+        inner_where, inner_params = self._run_filter(dataset, since, until)
+        sql = (
+            "SELECT r.run_id, r.dataset, r.run_at, m.rule, m.severity, m.violations "
+            f"FROM (SELECT * FROM runs r{inner_where} "
+            "ORDER BY r.run_at DESC, r.run_id DESC LIMIT ?) r "
+            "JOIN rule_metrics m ON m.run_id = r.run_id"
+        )
+        sql += " WHERE m.rule = ?" if rule is not None else ""
+        sql += " ORDER BY r.run_at DESC, r.run_id DESC, m.rule"
+        query_params = inner_params + [limit] + ([rule] if rule is not None else [])
+        return self._query(sql, query_params)
+
+
+def format_table(header: List[str], rows: List[Tuple]) -> str:
+    """Plain-text table for terminal output."""
+    cells = [[str(h) for h in header]] + [
+        [f"{v:.4f}" if isinstance(v, float) else ("" if v is None else str(v)) for v in row]
+        for row in rows
+    ]
+    widths = [max(len(line[i]) for line in cells) for i in range(len(header))]
+    lines = ["  ".join(value.ljust(width) for value, width in zip(line, widths)).rstrip() for line in cells]
+    lines.insert(1, "  ".join("-" * width for width in widths))
+    return "\n".join(lines)
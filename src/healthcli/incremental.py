@@ -0,0 +1,419 @@
+"""
+Incremental processing of append-only datasets.
+
+A nightly run over an append-only feed (e.g. vital sign readings) only
+needs to look at the rows added since the previous run. The state kept
+in <output_dir>/incremental/ makes that possible:
+- a watermark: the byte offset of the last complete line processed, plus
+  a hash of the bytes just before it to detect rewritten files
+- mergeable aggregates: row count and, per column, missing count and a
+  profile sketch (non-null count, sum, min, max, distinct values up to
+  DISTINCT_CAP)
+- cumulative violation row ids of row-level rules and FHIR counters;
+  FHIR error details are appended to a JSON-lines file
+- the last reading per patient, so VitalSignAnomalyRule can compare the
+  first new reading of a patient with the previous one
+
+Row ids continue from the previous run, so the cumulative report equals
+that of a full rerun as long as rows are only ever appended and each
+patient's readings arrive in timestamp order. If the data file no longer
+matches the watermark or the configuration changed, the state is rebuilt
+from the start of the file.
+
+A trailing line without a newline is treated as still being written and
+is left for the next run.
+"""
+
+import hashlib
+import io
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from healthcli.clinical_rules_extended import MissingDataThresholdRule, RuleResult, VitalSignAnomalyRule
+from healthcli.factorized import FactorizedFrame
+from healthcli.history import FHIR_COUNTERS
+from healthcli.quality import fhir_error_order
+
+STATE_DIR = "incremental"
+STATE_NAME = "state.json"
+FHIR_ERRORS_NAME = "fhir_errors.jsonl"
+
+# Bytes before the watermark hashed to detect a rewritten (not appended) file
+TAIL_BYTES = 4096
+
+# Distinct values kept per column; beyond this the distinct count is unknown
+DISTINCT_CAP = 10_000
+
+# Rules computed from merged aggregates rather than from new rows; their
+# results replace the previous ones instead of being appended to
+CUMULATIVE_RULES = {"MissingDataThresholdRule"}
+
+
+def _tail_sha256(path: str, offset: int) -> str:
+    with open(path, "rb") as f:
+        start = max(0, offset - TAIL_BYTES)
+        f.seek(start)
+        return hashlib.sha256(f.read(offset - start)).hexdigest()
+
+
+def _is_numeric_dtype(dtype: str) -> bool:
+    try:
+        return np.dtype(dtype).kind in "biuf"
+    except TypeError:
+        return False
+
+
+def _merge_dtype(old: Optional[str], new: str) -> str:
+    """dtype a full read would infer, given the dtypes inferred per chunk."""
+    if old is None or old == new:
+        return new
+    if _is_numeric_dtype(old) and _is_numeric_dtype(new):
+        return str(np.promote_types(old, new))
+    return new if not _is_numeric_dtype(new) else old
+
+
+class _ErrorDetails:
+    """
+    Re-iterable view of persisted plus pending FHIR error details, in the
+    order a full run reports them (see quality.fhir_error_order).
+    """
+
+    def __init__(self, path: Path, size: int, pending: List[Dict]):
+        self.path = path
+        self.size = size
+        self.pending = pending
+
+    def __iter__(self) -> Iterator[Dict]:
+        details = list(self.pending)
+        if self.size and self.path.exists():
+            with open(self.path, "rb") as f:
+                details.extend(json.loads(line) for line in io.BytesIO(f.read(self.size)))
+        return iter(sorted(details, key=fhir_error_order))
+
+
+class IncrementalState:
+    """
+    Watermark and merged aggregates of the rows processed so far.
+
+    Usage:
+        state = IncrementalState(out_dir)
+        if not state.matches(data_path, config_key):
+            state.reset(data_path, config_key)
+        chunk = state.read_new_rows(data_path)
+        if chunk is not None:
+            state.update_profile(chunk)
+            combined = state.with_context(chunk)
+            ...  # run rules on combined, FHIR validation on chunk
+            results = state.merge(rule_results, fhir_summary, chunk)
+            state.update_last_readings(combined)
+        state.save()
+    """
+
+    def __init__(self, output_dir: str):
+        self.dir = Path(output_dir) / STATE_DIR
+        self.path = self.dir / STATE_NAME
+        # Generations only increase, so a save never overwrites files the
+        # current state JSON still refers to
+        self.generation = 0
+        self.reset()
+
+        if self.path.exists():
+            try:
+                self._load()
+            except (OSError, ValueError, KeyError):
+                # A corrupt state only costs a full rebuild
+                self.reset()
+
+    def reset(self, source: Optional[str] = None, config_key: Optional[str] = None) -> None:
+        """Forget all processed rows; the next read starts at the top of the file."""
+        self.source = str(Path(source).resolve()) if source else None
+        self.config_key = config_key
+        self.offset = 0
+        self.tail_sha256: Optional[str] = None
+        self.header: Optional[str] = None
+        self.rows = 0
+        self.columns: Dict[str, Dict[str, Any]] = {}
+        self.rules: Dict[str, str] = {}  # rule name -> severity
+        self.fhir: Dict[str, Any] = {name: 0 for name in FHIR_COUNTERS}
+        self.fhir["first_error"] = None
+        self.fhir["first_error_order"] = None
+        self.fhir_errors_bytes = 0
+        self.violations: Dict[str, np.ndarray] = {}
+        self.last_readings: Optional[pd.DataFrame] = None
+        self._pending_errors: List[Dict] = []
+
+    def _file(self, name: str) -> Path:
+        return self.dir / f"{name}_{self.generation:06d}"
+
+    def _load(self) -> None:
+        with open(self.path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+
+        self.source = data["source"]
+        self.config_key = data["config_key"]
+        self.offset = data["offset"]
+        self.tail_sha256 = data["tail_sha256"]
+        self.header = data["header"]
+        self.rows = data["rows"]
+        self.generation = data["generation"]
+        self.columns = data["columns"]
+        self.rules = data["rules"]
+        self.fhir = data["fhir"]
+        self.fhir_errors_bytes = data["fhir_errors_bytes"]
+        errors_path = self.dir / FHIR_ERRORS_NAME
+        if self.fhir_errors_bytes and (
+            not errors_path.exists() or errors_path.stat().st_size < self.fhir_errors_bytes
+        ):
+            raise ValueError(f"{errors_path} is shorter than recorded")
+
+        with np.load(self._file("violations").with_suffix(".npz")) as arrays:
+            self.violations = {name: arrays[name] for name in arrays.files}
+        readings = self._file("last_readings").with_suffix(".csv")
+        if readings.exists():
+            self.last_readings = pd.read_csv(readings)
+
+    def matches(self, data_path: str, config_key: str) -> bool:
+        """True if data_path is the file processed so far, unchanged up to the watermark."""
+        if self.source != str(Path(data_path).resolve()) or self.config_key != config_key:
+            return False
+        if self.offset == 0:
+            return True
+        try:
+            if os.path.getsize(data_path) < self.offset:
+                return False
+            return _tail_sha256(data_path, self.offset) == self.tail_sha256
+        except OSError:
+            return False
+
+    def read_new_rows(self, data_path: str) -> Optional[pd.DataFrame]:
+        """
+        Parse the complete lines appended since the watermark and advance it.
+
+        Returns the new rows indexed by their row number in the whole file,
+        or None if nothing new has been appended.
+        """
+        with open(data_path, "rb") as f:
+            if self.offset == 0:
+                header = f.readline()
+                if not header.endswith(b"\n"):
+                    return None
+                self.header = header.decode("utf-8")
+                start = f.tell()
+            else:
+                f.seek(self.offset)
+                start = self.offset
+            data = f.read()
+
+        end = data.rfind(b"\n")
+        if end < 0:
+            return None
+        data = data[:end + 1]
+        self.offset = start + len(data)
+        self.tail_sha256 = _tail_sha256(data_path, self.offset)
+
+        chunk = pd.read_csv(io.BytesIO(self.header.encode("utf-8") + data))
+        if chunk.empty:
+            return None
+        chunk.index = pd.RangeIndex(self.rows, self.rows + len(chunk))
+        return chunk
+
+    def update_profile(self, chunk: pd.DataFrame) -> None:
+        """Fold the new rows into the row count and per-column sketches."""
+        missing = chunk.isna().sum()
+        for col in chunk.columns:
+            series = chunk[col]
+            dtype = str(series.dtype)
+            sketch = self.columns.setdefault(
+                str(col),
+                {"dtype": None, "missing": 0, "count": 0, "numeric": True,
+                 "sum": 0.0, "min": None, "max": None, "distinct": []},
+            )
+            sketch["dtype"] = _merge_dtype(sketch["dtype"], dtype)
+            sketch["missing"] += int(missing[col])
+            values = series.dropna()
+            sketch["count"] += len(values)
+
+            numeric = _is_numeric_dtype(dtype) and series.dtype.kind != "b"
+            sketch["numeric"] = sketch["numeric"] and (numeric or len(values) == 0)
+            if sketch["numeric"] and len(values):
+                low, high = float(values.min()), float(values.max())
+                sketch["sum"] += float(values.sum())
+                sketch["min"] = low if sketch["min"] is None else min(sketch["min"], low)
+                sketch["max"] = high if sketch["max"] is None else max(sketch["max"], high)
+
+            if sketch["distinct"] is not None and len(values):
+                uniques = values.unique()
+                if len(uniques) + len(sketch["distinct"]) > DISTINCT_CAP * 2:
+                    sketch["distinct"] = None
+                    continue
+                keys = {str(float(v)) if numeric else str(v) for v in uniques}
+                merged = keys.union(sketch["distinct"])
+                sketch["distinct"] = sorted(merged) if len(merged) <= DISTINCT_CAP else None
+
+        self.rows += len(chunk)
+
+    def missing_counts(self) -> Dict[str, int]:
+        return {col: sketch["missing"] for col, sketch in self.columns.items()}
+
+    def profile_records(self) -> List[Dict[str, Any]]:
+        """Column profile records (see artifacts.column_profile) from the sketches."""
+        records = []
+        for col, sketch in self.columns.items():
+            has_stats = sketch["numeric"] and sketch["count"] > 0
+            records.append({
+                "column": col,
+                "dtype": sketch["dtype"],
+                "rows": self.rows,
+                "missing_count": sketch["missing"],
+                "missing_ratio": sketch["missing"] / self.rows if self.rows else 0.0,
+                "distinct_count": len(sketch["distinct"]) if sketch["distinct"] is not None else None,
+                "min": sketch["min"] if has_stats else None,
+                "max": sketch["max"] if has_stats else None,
+                "mean": sketch["sum"] / sketch["count"] if has_stats else None,
+            })
+        return records
+
+    def with_context(self, chunk: pd.DataFrame) -> pd.DataFrame:
+        """
+        New rows preceded by the last stored reading of each patient.
+
+        Context rows carry negative row ids, so violations found on them
+        can be told apart from violations on new rows.
+        """
+        if self.last_readings is None or self.last_readings.empty:
+            return chunk
+        context = self.last_readings.copy()
+        context.index = pd.RangeIndex(-len(context), 0)
+        return pd.concat([context, chunk])
+
+    def merge(self, rule_results: Dict[str, RuleResult], fhir_summary: Dict, chunk: pd.DataFrame) -> Dict:
+        """
+        Fold the results for the new rows into the cumulative results.
+
+        Returns {"clinical_violations", "fhir_summary"} covering every row
+        processed so far.
+        """
+        first_new = int(chunk.index[0])
+        clinical = {}
+        for name, result in rule_results.items():
+            self.rules[name] = result.severity
+            if name in CUMULATIVE_RULES:
+                clinical[name] = result
+                continue
+            new = np.asarray(result.violations, dtype=np.int64)
+            new = new[new >= first_new]
+            merged = np.concatenate([self.violations.get(name, np.empty(0, np.int64)), new])
+            self.violations[name] = merged
+            clinical[name] = RuleResult(
+                rule_name=name,
+                violations=merged.tolist(),
+                count=len(merged),
+                severity=result.severity,
+                details=result.details,
+            )
+
+        for name in FHIR_COUNTERS:
+            self.fhir[name] += fhir_summary.get(name, 0)
+        # Errors of one run are already in report order, so its first error
+        # only has to be compared with the earliest one seen so far
+        if fhir_summary.get("errors"):
+            order = list(fhir_error_order(fhir_summary["error_details"][0]))
+            if self.fhir["first_error"] is None or order < self.fhir["first_error_order"]:
+                self.fhir["first_error"] = fhir_summary["errors"][0]
+                self.fhir["first_error_order"] = order
+        self._pending_errors.extend(fhir_summary.get("error_details", []))
+
+        return {"clinical_violations": clinical, "fhir_summary": self.fhir_summary()}
+
+    def fhir_summary(self) -> Dict[str, Any]:
+        """
+        Cumulative FHIR summary in the shape of quality.fhir_validation_summary.
+
+        Only the first error message is kept; error_details streams every
+        structured error from the JSON-lines file.
+        """
+        summary = {name: self.fhir[name] for name in FHIR_COUNTERS}
+        summary["errors"] = [self.fhir["first_error"]] if self.fhir["first_error"] else []
+        summary["error_details"] = _ErrorDetails(
+            self.dir / FHIR_ERRORS_NAME, self.fhir_errors_bytes, self._pending_errors
+        )
+        return summary
+
+    def cumulative_results(self) -> Dict:
+        """Cumulative results from the stored state alone (no new rows)."""
+        clinical = {}
+        for name, severity in self.rules.items():
+            if name == "MissingDataThresholdRule":
+                clinical[name] = MissingDataThresholdRule().apply_counts(self.missing_counts(), self.rows)
+            else:
+                clinical[name] = RuleResult(
+                    rule_name=name,
+                    violations=self.violations[name].tolist(),
+                    count=len(self.violations[name]),
+                    severity=severity,
+                )
+        return {"clinical_violations": clinical, "fhir_summary": self.fhir_summary()}
+
+    def update_last_readings(self, combined: pd.DataFrame) -> None:
+        """Keep the last reading (in timestamp order) of every patient seen so far."""
+        vitals = [col for col in VitalSignAnomalyRule.VITAL_COLUMNS if col in combined.columns]
+        if not vitals or not {"patient_id", "timestamp"}.issubset(combined.columns):
+            return
+
+        codes = FactorizedFrame(combined, key="patient_id")
+        order = codes.group_order("timestamp")
+        patient = codes.key_codes[order]
+        is_last = np.append(patient[1:] != patient[:-1], True) & (patient >= 0)
+        self.last_readings = (
+            combined.iloc[order[is_last]][["patient_id", "timestamp"] + vitals].reset_index(drop=True)
+        )
+
+    def save(self) -> None:
+        """Persist the state; the JSON file is replaced last, so a crash keeps the old state."""
+        self.dir.mkdir(parents=True, exist_ok=True)
+        self.generation += 1
+
+        np.savez(self._file("violations").with_suffix(".npz"), **self.violations)
+        if self.last_readings is not None:
+            self.last_readings.to_csv(self._file("last_readings").with_suffix(".csv"), index=False)
+
+        # Drop error lines appended by a run that never saved its state
+        errors_path = self.dir / FHIR_ERRORS_NAME
+        errors_path.touch()
+        with open(errors_path, "r+b") as f:
+            f.seek(self.fhir_errors_bytes)
+            f.truncate()
+            for detail in self._pending_errors:
+                f.write(json.dumps(detail, default=str).encode("utf-8") + b"\n")
+            self.fhir_errors_bytes = f.tell()
+        self._pending_errors = []
+
+        tmp_path = self.path.with_suffix(".json.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "source": self.source,
+                    "config_key": self.config_key,
+                    "offset": self.offset,
+                    "tail_sha256": self.tail_sha256,
+                    "header": self.header,
+                    "rows": self.rows,
+                    "generation": self.generation,
+                    "columns": self.columns,
+                    "rules": self.rules,
+                    "fhir": self.fhir,
+                    "fhir_errors_bytes": self.fhir_errors_bytes,
+                },
+                f,
+            )
+        os.replace(tmp_path, self.path)
+
+        current = {self._file("violations").with_suffix(".npz"), self._file("last_readings").with_suffix(".csv")}
+        for stale in list(self.dir.glob("violations_*.npz")) + list(self.dir.glob("last_readings_*.csv")):
+            if stale not in current:
+                stale.unlink()
@@ -1,16 +1,117 @@
+import atexit
+import json
 import logging
+import logging.handlers
+import os
+import queue
+from contextlib import contextmanager
+from contextvars import ContextVar
 from datetime import datetime
 from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
+LOG_FORMATS = ("text", "json")
 
-def setup_logger(name: str = "healthcli", level: str = "INFO", log_dir: str = "logs") -> logging.Logger:
-    """ 
+# Loggers writing through a queue: name -> (QueueHandler, QueueListener)
+_QUEUED: Dict[str, Tuple[logging.handlers.QueueHandler, logging.handlers.QueueListener]] = {}
+
+# File handlers buffered in memory, emptied in forked children
+_BUFFERED: List[logging.handlers.MemoryHandler] = []
+
+# File handlers by path: the loggers of a process share one handler per file
+_FILE_HANDLERS: Dict[str, logging.Handler] = {}
+
+# Fields stamped on every record, e.g. run_id and dataset (see log_context)
+_CONTEXT: ContextVar[Dict[str, Any]] = ContextVar("healthcli_log_context", default={})
+
+
+@contextmanager
+def log_context(**fields) -> Iterator[None]:
+    """Add fields (e.g. run_id, dataset) to every record logged inside the block."""
+    token = _CONTEXT.set({**_CONTEXT.get(), **fields})
+    try:
+        yield
+    finally:
+        _CONTEXT.reset(token)
+
+
+def event(name: str, **fields) -> Dict[str, Any]:
+    """
+    extra= mapping that makes a log call a structured event.
+
+    Usage:
+        logger.info("%s: %d violations", rule, n, extra=event("rule", rule=rule, violations=n))
+
+    Text logs show the message; JSON logs add "event": name and the fields.
+    """
+    return {"event": name, "event_fields": fields}
+
+
+class ContextFilter(logging.Filter):
+    """Stamps the current log_context fields on each record, in the logging thread."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.context = _CONTEXT.get()
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record: time, level, logger, message, context and event fields."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload: Dict[str, Any] = {
+            "ts": datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        payload.update(getattr(record, "context", {}))
+        name = getattr(record, "event", None)
+        if name is not None:
+            payload["event"] = name
+            payload.update(getattr(record, "event_fields", {}))
+        if record.exc_info:
+            payload["exception"] = self.formatException(record.exc_info)
+        return json.dumps(payload, default=str)
+
+
+def setup_logger(
+    name: str = "healthcli",
+    level: str = "INFO",
+    log_dir: str = "logs",
+    queue_handler: bool = False,
+    max_bytes: Optional[int] = None,
+    backup_count: int = 5,
+    log_format: str = "text",
+    buffer_records: int = 0,
+) -> logging.Logger:
+    """
     Set up a logger that logs to both console and a file with timestamps.
+
+    With queue_handler, records are put on a queue and a background
+    QueueListener thread does the formatting and I/O, so logging never
+    blocks the caller. With max_bytes, the file rotates at that size,
+    keeping backup_count old files. Rotation renames the file, which only
+    works with a single writer, so each process then logs to its own file
+    (quality_<timestamp>_<pid>.log); batch, watch and serve workers
+    starting in the same second would otherwise rotate one file
+    independently.
+
+    With log_format="json", the file is JSON lines (quality_*.jsonl), one
+    object per record with the log_context fields and, for event() calls,
+    the event name and fields; the console stays text. With
+    buffer_records, file records are written in batches of that many
+    (and at once for errors and at exit).
     """
+    if log_format not in LOG_FORMATS:
+        raise ValueError(f"Unknown log format: {log_format} (expected one of {', '.join(LOG_FORMATS)})")
     Path(log_dir).mkdir(exist_ok=True)
 
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    log_file = Path(log_dir) / f"quality_{timestamp}.log"
+    if max_bytes:
+        timestamp = f"{timestamp}_{os.getpid()}"
+    suffix = "jsonl" if log_format == "json" else "log"
+    log_file = Path(log_dir) / f"quality_{timestamp}.{suffix}"
 
     logger = logging.getLogger(name)
     logger.setLevel(level)
@@ -19,15 +120,84 @@ def setup_logger(name: str = "healthcli", level: str = "INFO", log_dir: str = "l
 
     # Headers are only added once to avoid duplicate logs
     if not logger.handlers:
-        # File handler
-        file_handler = logging.FileHandler(log_file)
-        file_handler.setFormatter(formatter)
+        # File handler, shared with loggers set up earlier for the same file
+        file_handler = _FILE_HANDLERS.get(str(log_file))
+        if file_handler is None:
+            if max_bytes:
+                file_handler = logging.handlers.RotatingFileHandler(
+                    log_file, maxBytes=max_bytes, backupCount=backup_count
+                )
+            else:
+                file_handler = logging.FileHandler(log_file)
+            file_handler.setFormatter(JsonFormatter() if log_format == "json" else formatter)
+            if buffer_records:
+                file_handler = logging.handlers.MemoryHandler(
+                    buffer_records, flushLevel=logging.ERROR, target=file_handler
+                )
+                _BUFFERED.append(file_handler)
+            _FILE_HANDLERS[str(log_file)] = file_handler
 
         # Console handler
         console_handler = logging.StreamHandler()
         console_handler.setFormatter(formatter)
 
-        logger.addHandler(file_handler)
-        logger.addHandler(console_handler)
+        # Context is read where the record is created, not in the listener thread
+        logger.addFilter(ContextFilter())
+
+        handlers: List[logging.Handler] = [file_handler, console_handler]
+        if queue_handler:
+            records = queue.SimpleQueue()
+            listener = logging.handlers.QueueListener(records, *handlers, respect_handler_level=True)
+            listener.start()
+            handler = logging.handlers.QueueHandler(records)
+            _QUEUED[name] = (handler, listener)
+            logger.addHandler(handler)
+        else:
+            for handler in handlers:
+                logger.addHandler(handler)
 
     return logger
+
+
+def logger_from_config(name: str, config: dict) -> logging.Logger:
+    """setup_logger with the options of the config's logging section."""
+    options = config.get("logging", {})
+    return setup_logger(
+        name,
+        level=options.get("level", "INFO"),
+        log_dir=options.get("log_dir", "logs"),
+        queue_handler=options.get("queue", False),
+        max_bytes=options.get("max_bytes"),
+        backup_count=options.get("backup_count", 5),
+        log_format=options.get("format", "text"),
+        buffer_records=options.get("buffer_records", 0),
+    )
+
+
+def _write_directly(name: str) -> None:
+    handler, listener = _QUEUED.pop(name)
+    logger = logging.getLogger(name)
+    logger.removeHandler(handler)
+    for target in listener.handlers:
+        logger.addHandler(target)
+
+
+def stop_listeners() -> None:
+    """Flush and stop every queue listener; loggers write directly from then on."""
+    for name, (_, listener) in list(_QUEUED.items()):
+        listener.stop()
+        _write_directly(name)
+
+
+def _after_fork_in_child() -> None:
+    # The listener thread does not survive fork: forked workers write directly
+    for name in list(_QUEUED):
+        _write_directly(name)
+    # Records buffered by the parent are the parent's to write
+    for handler in _BUFFERED:
+        handler.buffer = []
+
+
+atexit.register(stop_listeners)
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
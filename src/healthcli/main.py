@@ -8,74 +8,301 @@ and logs results for transparency.
 This file does not contain analysis logic.
 All analysis steps are implemented in separate modules
 to keep the pipeline simple, reusable, and easy to test.
+
+Only the argument parser is imported at module level. Everything else
+(pandas, pydantic, matplotlib, Jinja2, WeasyPrint) is imported inside the
+subcommand that needs it, so `healthcli --help` and short `quality` jobs
+do not pay for report rendering libraries.
 """
 
+from typing import TYPE_CHECKING, Optional
+
 from healthcli.cli import build_parser
-from healthcli.config_loader import load_config
-from healthcli.data_loader import load_csv_data
-from healthcli.logging_utils import setup_logger
-from healthcli.pipeline import run_pipeline
-from healthcli.quality import (
-    categorical_summary,
-    dataset_overview,
-    exclusion_candidates,
-    missing_summary,
-    numeric_summary,
-)
-
-
-def run_quality(data_path: str, config_path: str) -> int:
-    """Run the quality analysis workflow with the provided dataset and config."""
-    config = load_config(config_path)
-    log_level = config["logging"]["level"]
-    log_dir = config["logging"]["log_dir"]
 
-    logger = setup_logger(__name__, level=log_level, log_dir=log_dir)
+if TYPE_CHECKING:
+    from healthcli.metrics import MetricsRecorder
+
+
+def run_quality(
+    data_path: str,
+    config_path: str,
+    recorder: "MetricsRecorder" = None,
+    sample: Optional[int] = None,
+    sample_by: Optional[str] = None,
+) -> int:
+    """
+    Run the quality analysis workflow with the provided dataset and config.
+
+    With sample, the summaries describe a sample of the rows (missing
+    counts stay exact) and estimated clinical rule and FHIR error rates
+    are printed with confidence intervals.
+    """
+    import pandas as pd
+
+    from healthcli.config_loader import load_config
+    from healthcli.data_loader import load_csv_data
+    from healthcli.logging_utils import logger_from_config
+    from healthcli.metrics import MetricsRecorder
+    from healthcli.quality import (
+        categorical_summary,
+        dataset_overview,
+        exclusion_candidates,
+        missing_summary,
+        missing_summary_from_counts,
+        numeric_summary,
+    )
+
+    config = load_config(config_path)
+    logger = logger_from_config(__name__, config)
     logger.info("Starting clinical data quality analysis")
     logger.info("Configuration loaded from: %s", config_path)
 
+    if recorder is None:
+        recorder = MetricsRecorder(enabled=False)
+
     logger.info("Loading dataset from: %s", data_path)
-    df = load_csv_data(data_path)
+    drawn = None
+    with recorder.stage("ingest") as stage:
+        if sample is None:
+            df = load_csv_data(data_path)
+            stage.rows = len(df)
+        else:
+            from healthcli.sampling import DEFAULT_CHUNK_ROWS, sample_csv
+
+            sampling_config = config.get("sampling", {})
+            drawn = sample_csv(
+                data_path,
+                sample,
+                by=sample_by,
+                seed=sampling_config.get("seed", 0),
+                chunk_rows=sampling_config.get("chunk_rows", DEFAULT_CHUNK_ROWS),
+            )
+            df = drawn.frame
+            stage.rows = drawn.total_rows
+    rows = len(df)
+    if drawn is not None:
+        print(f"=== Sample: {drawn.describe()} ===\n")
 
-    overview = dataset_overview(df, logger)
+    with recorder.stage("dataset_overview", rows=rows):
+        overview = dataset_overview(df, logger)
     print("=== Dataset Overview ===")
     print(overview)
 
-    missing = missing_summary(df, logger, config)
+    with recorder.stage("missing_summary", rows=rows):
+        if drawn is None:
+            missing = missing_summary(df, logger, config)
+        else:
+            missing = missing_summary_from_counts(
+                pd.Series(drawn.missing_counts, dtype="int64"), drawn.total_rows, logger, config
+            )
     print("\n=== Missing Value Summary (Top columns) ===")
     top_n = config["quality"]["missing"]["report_top_n_columns"]
     print(missing.head(top_n))
 
     if config["quality"]["numeric_summary"]["enabled"]:
-        numeric = numeric_summary(df, logger)
+        with recorder.stage("numeric_summary", rows=rows):
+            numeric = numeric_summary(df, logger)
         print("\n=== Numeric Summary (Top rows) ===")
         print(numeric.head())
 
-    candidates = exclusion_candidates(missing, logger, config)
+    with recorder.stage("exclusion_candidates"):
+        candidates = exclusion_candidates(missing, logger, config)
     print("\n=== Exclusion Candidates (Decision Support) ===")
     print(candidates)
 
-    categorical = categorical_summary(df, logger, config)
+    with recorder.stage("categorical_summary", rows=rows):
+        categorical = categorical_summary(df, logger, config)
     print("\n=== Categorical Summary (Top values per column) ===")
     for col, summary in categorical.items():
         print(f"\n[{col}]")
         print(summary)
 
+    if drawn is not None:
+        from healthcli.clinical_rules_extended import run_clinical_rules
+        from healthcli.quality import fhir_validation_summary
+        from healthcli.sampling import DEFAULT_CONFIDENCE, estimate_rates
+
+        with recorder.stage("run_clinical_rules", rows=rows):
+            clinical = run_clinical_rules(
+                df, logger, recorder=recorder, missing_counts=drawn.missing_counts, total_rows=drawn.total_rows
+            )
+        with recorder.stage("fhir_validation_summary", rows=rows):
+            fhir = fhir_validation_summary(df, logger)
+        confidence = config.get("sampling", {}).get("confidence", DEFAULT_CONFIDENCE)
+        with recorder.stage("estimate_rates", rows=rows):
+            estimates = estimate_rates(drawn, clinical, fhir, confidence=confidence)
+        print(f"\n=== Estimated Rates ({confidence:.0%} confidence intervals) ===")
+        columns = ["sample_count", "sample_rows", "rate", "ci_low", "ci_high", "estimated_count"]
+        print(estimates[columns].to_string(float_format=lambda v: f"{v:.4f}"))
+
     logger.info("Data quality analysis completed successfully")
     return 0
 
 
+def run_profile(args) -> int:
+    """Run the quality or pipeline workflow under the profilers."""
+    from healthcli.pipeline import run_pipeline
+    from healthcli.profiling import run_profiled
+
+    config_path = args.config or "config/config.yaml"
+
+    if args.target == "quality":
+        def workflow(recorder):
+            return run_quality(args.data, config_path, recorder=recorder)
+    else:
+        def workflow(recorder):
+            return run_pipeline(args.data, config_path, args.output, recorder=recorder)
+
+    return run_profiled(
+        workflow,
+        args.profile_dir,
+        top_n=args.top_n,
+        sample_interval=args.sample_interval / 1000,
+    )
+
+
+def run_history(args) -> int:
+    """Print a trend table from the run history store."""
+    from pathlib import Path
+
+    from healthcli.config_loader import load_config
+    from healthcli.history import DEFAULT_HISTORY_PATH, HistoryStore, format_table
+
+    config = load_config(args.config or "config/config.yaml")
+    history_path = config.get("storage", {}).get("history_path", DEFAULT_HISTORY_PATH)
+    if not Path(history_path).exists():
+        print(f"No run history at {history_path}; run the pipeline first.")
+        return 1
+
+    with HistoryStore(history_path) as store:
+        filters = {"dataset": args.dataset, "since": args.since, "until": args.until, "limit": args.limit}
+        if args.view == "columns":
+            header, rows = store.column_trend(column=args.column, **filters)
+        elif args.view == "rules":
+            header, rows = store.rule_trend(rule=args.rule, **filters)
+        else:
+            header, rows = store.run_trend(**filters)
+
+    print(format_table(header, rows))
+    return 0
+
+
+def run_batch(args) -> int:
+    """Run the pipeline for every dataset of a manifest or glob; 1 if any failed."""
+    from healthcli.batch import collect_datasets, validate_batch
+    from healthcli.config_loader import load_config
+    from healthcli.logging_utils import logger_from_config
+
+    config_path = args.config or "config/config.yaml"
+    config = load_config(config_path)
+    logger = logger_from_config("healthcli.batch", config)
+
+    datasets = collect_datasets(args.datasets, manifest=args.manifest, default_config=config_path)
+    if not datasets:
+        print("No datasets matched; pass paths, glob patterns or --manifest.")
+        return 1
+    concurrency = args.concurrency or config.get("batch", {}).get("concurrency", 2)
+    logger.info("Batch of %d datasets, %d at a time", len(datasets), concurrency)
+
+    results = validate_batch(
+        datasets,
+        args.output,
+        concurrency=concurrency,
+        options={"force": args.force or None, "sample": args.sample, "sample_by": args.sample_by},
+        logger=logger,
+    )
+    failed = [r["name"] for r in results if r["status"] != "succeeded"]
+    if failed:
+        logger.error("%d of %d datasets failed: %s", len(failed), len(results), ", ".join(failed))
+    return 1 if failed else 0
+
+
+def run_serve(args) -> int:
+    """Serve pipeline jobs from warm worker processes until interrupted."""
+    from healthcli.config_loader import load_config
+    from healthcli.logging_utils import logger_from_config
+    from healthcli.server import DEFAULT_HOST, DEFAULT_PORT, DEFAULT_QUEUE_SIZE, serve
+
+    config_path = args.config or "config/config.yaml"
+    config = load_config(config_path)
+    serve_config = config.get("serve", {})
+    logger = logger_from_config("healthcli.server", config)
+
+    return serve(
+        logger,
+        host=args.host or serve_config.get("host", DEFAULT_HOST),
+        port=args.port or serve_config.get("port", DEFAULT_PORT),
+        socket_path=args.socket or serve_config.get("socket"),
+        workers=args.workers or serve_config.get("workers", 1),
+        queue_size=args.queue_size or serve_config.get("queue_size", DEFAULT_QUEUE_SIZE),
+        default_config=config_path,
+    )
+
+
+def run_watch(args) -> int:
+    """Validate files landing in a directory until interrupted."""
+    from healthcli.config_loader import load_config
+    from healthcli.logging_utils import logger_from_config
+    from healthcli import watch
+
+    config_path = args.config or "config/config.yaml"
+    config = load_config(config_path)
+    watch_config = config.get("watch", {})
+    logger = logger_from_config("healthcli.watch", config)
+
+    return watch.watch_directory(
+        args.directory,
+        args.output,
+        config_path,
+        workers=args.workers or watch_config.get("workers", 1),
+        pattern=args.pattern or watch_config.get("pattern", watch.DEFAULT_PATTERN),
+        settle=args.settle if args.settle is not None
+        else watch_config.get("settle_seconds", watch.DEFAULT_SETTLE_SECONDS),
+        poll_interval=watch_config.get("poll_seconds", watch.DEFAULT_POLL_SECONDS),
+        max_pending=args.max_pending or watch_config.get("max_pending", watch.DEFAULT_MAX_PENDING),
+        existing=args.existing,
+        polling=args.polling or watch_config.get("polling", False),
+        logger=logger,
+    )
+
+
 def main(argv=None) -> int:
     parser = build_parser()
     args = parser.parse_args(argv)
+    if getattr(args, "sample_by", None) and args.sample is None:
+        parser.error("--sample-by requires --sample")
 
     if args.command == "quality":
         config_path = args.config or "config/config.yaml"
-        return run_quality(args.data, config_path)
+        return run_quality(args.data, config_path, sample=args.sample, sample_by=args.sample_by)
     if args.command == "pipeline":
+        from healthcli.pipeline import run_pipeline
+
         config_path = args.config or "config/config.yaml"
         output_dir = args.output or "output"
-        return run_pipeline(args.data, config_path, output_dir)
+        return run_pipeline(
+            args.data,
+            config_path,
+            output_dir,
+            async_pdf=args.async_pdf,
+            force=args.force,
+            incremental=args.incremental,
+            workers=args.workers,
+            memory_budget=args.memory_budget,
+            sample=args.sample,
+            sample_by=args.sample_by,
+            export_fhir=args.export_fhir,
+        )
+    if args.command == "profile":
+        return run_profile(args)
+    if args.command == "history":
+        return run_history(args)
+    if args.command == "batch":
+        return run_batch(args)
+    if args.command == "serve":
+        return run_serve(args)
+    if args.command == "watch":
+        return run_watch(args)
 
     parser.print_help()
     return 1
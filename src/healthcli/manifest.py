@@ -0,0 +1,130 @@
+"""
+Run manifest for incremental report regeneration.
+
+The manifest (run_manifest.json in the output directory) records, for
+each artifact the pipeline writes, a key derived from the content hashes
+of its inputs, the configuration and the package version. On the next
+run, stages whose key is unchanged and whose files still exist are
+skipped and their cached outputs reused.
+
+Content hashes of input files are cached in the manifest together with
+the file size and modification time, so unchanged multi-gigabyte inputs
+are not re-read just to prove they are unchanged.
+"""
+
+import hashlib
+import json
+import os
+from datetime import datetime
+from importlib.metadata import PackageNotFoundError, version
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+MANIFEST_NAME = "run_manifest.json"
+DISTRIBUTION_NAME = "clinical-data-quality-analysis"
+
+
+def package_version() -> str:
+    """Installed package version, recorded so upgrades invalidate cached artifacts."""
+    try:
+        return version(DISTRIBUTION_NAME)
+    except PackageNotFoundError:
+        return "unknown"
+
+
+def file_sha256(path: str, chunk_size: int = 1 << 20) -> str:
+    """SHA-256 of a file, read in fixed-size chunks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class RunManifest:
+    """
+    Artifact keys and input fingerprints for one output directory.
+
+    Usage:
+        manifest = RunManifest(out_dir)
+        key = manifest.key(data=manifest.fingerprint(data_path), config=...)
+        if not manifest.is_fresh("missing_summary", key):
+            ...  # regenerate
+            manifest.record("missing_summary", key, ["missing_summary.csv"])
+        manifest.save()
+    """
+
+    def __init__(self, output_dir: str):
+        self.output_dir = Path(output_dir)
+        self.path = self.output_dir / MANIFEST_NAME
+        self.inputs: Dict[str, Dict] = {}
+        self.artifacts: Dict[str, Dict] = {}
+
+        if self.path.exists():
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                self.inputs = data.get("inputs", {})
+                self.artifacts = data.get("artifacts", {})
+            except (OSError, ValueError):
+                # A corrupt manifest only costs a full regeneration
+                self.inputs, self.artifacts = {}, {}
+
+    def fingerprint(self, path: str) -> str:
+        """
+        Content hash of an input file, or of the files of a directory.
+
+        The hash is reused when size and modification time match the
+        previous run; otherwise the file is hashed again.
+        """
+        if Path(path).is_dir():
+            files = sorted(p for p in Path(path).iterdir() if p.is_file())
+            return self.key(**{p.name: self.fingerprint(str(p)) for p in files})
+        resolved = str(Path(path).resolve())
+        stat = os.stat(resolved)
+        cached = self.inputs.get(resolved)
+        if cached and cached["size"] == stat.st_size and cached["mtime_ns"] == stat.st_mtime_ns:
+            return cached["sha256"]
+
+        sha = file_sha256(resolved)
+        self.inputs[resolved] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": sha}
+        return sha
+
+    @staticmethod
+    def key(**parts: str) -> str:
+        """Combine named input hashes and the package version into one key."""
+        parts.setdefault("version", package_version())
+        payload = json.dumps(parts, sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def is_fresh(self, artifact: str, key: str) -> bool:
+        """True if the artifact was produced from the same key and its files still exist."""
+        entry = self.artifacts.get(artifact)
+        if not entry or entry.get("key") != key:
+            return False
+        return all((self.output_dir / name).exists() for name in entry.get("files", []))
+
+    def record(self, artifact: str, key: str, files: Iterable[str]) -> None:
+        """Record that files (relative to the output directory) were produced from key."""
+        self.artifacts[artifact] = {
+            "key": key,
+            "files": [str(name) for name in files],
+            "recorded_at": datetime.now().isoformat(timespec="seconds"),
+        }
+
+    def invalidate(self, artifact: Optional[str] = None) -> None:
+        if artifact is None:
+            self.artifacts.clear()
+        else:
+            self.artifacts.pop(artifact, None)
+
+    def save(self) -> None:
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".json.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(
+                {"version": package_version(), "inputs": self.inputs, "artifacts": self.artifacts},
+                f,
+                indent=2,
+            )
+        os.replace(tmp_path, self.path)
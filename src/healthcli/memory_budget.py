@@ -0,0 +1,217 @@
+"""
+Memory-budgeted execution.
+
+With a memory budget (--memory-budget or memory.budget), the pipeline
+plans its run before loading the data:
+- the first memory.sample_rows rows are parsed to measure in-memory bytes
+  per row, and the row count is extrapolated from the file size
+- the peak RSS of a run is estimated as the current process size plus
+  WORKING_SET_FACTOR times the size of the loaded frame
+- workers, the shared Arrow frame and the chart/PDF render process are
+  only kept while the estimate stays under the budget
+- transform.chunk_rows and artifacts.batch_size are capped so each
+  written slice is a small fraction of the remaining headroom
+
+The plan is logged, written to metrics.json, and every stage records its
+peak RSS against the budget.
+"""
+
+import copy
+import io
+import logging
+import os
+import re
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List, Optional
+
+import pandas as pd
+
+from healthcli.metrics import peak_rss_bytes
+
+DEFAULT_SAMPLE_ROWS = 10_000
+
+# Peak RSS growth of a serial run relative to the loaded frame: read_csv
+# buffers (~2x) plus FHIR validation messages and rule masks (measured on
+# the diabetic and vitals datasets)
+WORKING_SET_FACTOR = 6.0
+
+# Fresh interpreter with pandas imported, as used by each worker process
+WORKER_BASE_BYTES = 100 * 2**20
+
+# Render process with matplotlib loaded
+RENDER_PROCESS_BYTES = 80 * 2**20
+
+# Share of the headroom one written slice (CSV text or Arrow batch) may use
+CHUNK_HEADROOM_FRACTION = 0.1
+MIN_CHUNK_ROWS = 1_000
+
+_UNITS = {"": 1, "B": 1, "K": 2**10, "KB": 2**10, "M": 2**20, "MB": 2**20, "G": 2**30, "GB": 2**30}
+
+
+def parse_size(value) -> int:
+    """Bytes from a size such as 2G, 512MB or 1048576."""
+    if isinstance(value, (int, float)):
+        return int(value)
+    match = re.fullmatch(r"\s*(\d+(?:\.\d+)?)\s*([A-Za-z]*)\s*", str(value))
+    if match is None or match.group(2).upper() not in _UNITS:
+        raise ValueError(f"Invalid memory size: {value!r} (expected e.g. 512M or 2G)")
+    return int(float(match.group(1)) * _UNITS[match.group(2).upper()])
+
+
+@dataclass
+class RowEstimate:
+    """In-memory size of the input, extrapolated from a parsed sample."""
+    sample_rows: int
+    row_bytes: float
+    estimated_rows: int
+
+    @property
+    def frame_bytes(self) -> int:
+        return int(self.row_bytes * self.estimated_rows)
+
+
+def estimate_rows(data_path: str, sample_rows: int = DEFAULT_SAMPLE_ROWS) -> RowEstimate:
+    """
+    Parse the first sample_rows rows of a CSV file and extrapolate its size.
+
+    Bytes per row come from the sample's deep memory usage; the row count
+    from the file size divided by the sample's bytes per line.
+    """
+    with open(data_path, "rb") as f:
+        header = f.readline()
+        lines = []
+        for line in f:
+            lines.append(line)
+            if len(lines) >= sample_rows:
+                break
+
+    if not lines:
+        return RowEstimate(sample_rows=0, row_bytes=0.0, estimated_rows=0)
+
+    sample = pd.read_csv(io.BytesIO(header + b"".join(lines)))
+    row_bytes = sample.memory_usage(deep=True, index=False).sum() / len(sample)
+    line_bytes = sum(len(line) for line in lines) / len(lines)
+    estimated = (os.path.getsize(data_path) - len(header)) / line_bytes
+    return RowEstimate(sample_rows=len(lines), row_bytes=float(row_bytes), estimated_rows=int(round(estimated)))
+
+
+@dataclass
+class MemoryPlan:
+    """Execution settings chosen to keep peak RSS under budget_bytes."""
+    budget_bytes: int
+    base_bytes: int
+    row_bytes: float
+    estimated_rows: int
+    estimated_peak_bytes: int
+    workers: int
+    transport: str
+    render_process: bool
+    chunk_rows: int
+    batch_size: int
+    notes: List[str] = field(default_factory=list)
+
+    def apply(self, config: Dict[str, Any]) -> Dict[str, Any]:
+        """Copy of config with the planned settings filled in."""
+        config = copy.deepcopy(config)
+        config.setdefault("parallel", {}).update(workers=self.workers, transport=self.transport)
+        config.setdefault("report", {})["render_process"] = self.render_process
+        config.setdefault("transform", {})["chunk_rows"] = self.chunk_rows
+        config.setdefault("artifacts", {})["batch_size"] = self.batch_size
+        return config
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def plan_memory(
+    budget_bytes: int,
+    estimate: RowEstimate,
+    config: Dict[str, Any],
+    workers: int = 1,
+    base_bytes: Optional[int] = None,
+) -> MemoryPlan:
+    """
+    Choose workers, caches and chunk sizes for a run within budget_bytes.
+
+    Requested settings are only ever reduced: workers down to 1, the
+    shared Arrow frame and the render process dropped, and chunk sizes
+    capped. If even the leanest plan exceeds the budget it is returned
+    with a note; the run is not refused.
+    """
+    if base_bytes is None:
+        base_bytes = peak_rss_bytes() or WORKER_BASE_BYTES
+    frame = estimate.frame_bytes
+    working = WORKING_SET_FACTOR * frame
+    notes: List[str] = []
+
+    # Serial run: the whole working set lives in this process
+    serial_peak = base_bytes + working
+    render_process = config.get("report", {}).get("render_process", True)
+    transport = config.get("parallel", {}).get("transport", "arrow")
+
+    def parallel_peak(n: int, shared: bool) -> float:
+        # The parent keeps the frame; the working set is split across the
+        # workers, and the shared Arrow frame adds a copy in tmpfs
+        return base_bytes + frame * (2 if shared else 1) + n * WORKER_BASE_BYTES + working
+
+    chosen = 1
+    for n in range(max(workers, 1), 1, -1):
+        if parallel_peak(n, transport == "arrow") <= budget_bytes:
+            chosen = n
+            break
+        if transport == "arrow" and parallel_peak(n, False) <= budget_bytes:
+            chosen, transport = n, "pickle"
+            notes.append("shared Arrow frame dropped: pickling partitions to workers")
+            break
+    if chosen < workers:
+        notes.append(f"workers reduced from {workers} to {chosen}")
+    peak = parallel_peak(chosen, transport == "arrow") if chosen > 1 else serial_peak
+
+    if render_process and peak + RENDER_PROCESS_BYTES > budget_bytes:
+        render_process = False
+        notes.append("chart and PDF render inline instead of in a render process")
+    elif render_process:
+        peak += RENDER_PROCESS_BYTES
+
+    if peak > budget_bytes:
+        notes.append(
+            f"estimated peak {peak / 2**20:.0f} MB exceeds the budget; "
+            "consider --incremental or a smaller input"
+        )
+
+    headroom = max(budget_bytes - peak, 0)
+    slice_rows = int(headroom * CHUNK_HEADROOM_FRACTION / max(estimate.row_bytes, 1.0))
+    chunk_rows = max(min(config.get("transform", {}).get("chunk_rows", 500_000), slice_rows), MIN_CHUNK_ROWS)
+    batch_size = max(min(config.get("artifacts", {}).get("batch_size", 65_536), slice_rows), MIN_CHUNK_ROWS)
+
+    return MemoryPlan(
+        budget_bytes=budget_bytes,
+        base_bytes=int(base_bytes),
+        row_bytes=round(estimate.row_bytes, 1),
+        estimated_rows=estimate.estimated_rows,
+        estimated_peak_bytes=int(peak),
+        workers=chosen,
+        transport=transport,
+        render_process=render_process,
+        chunk_rows=chunk_rows,
+        batch_size=batch_size,
+        notes=notes,
+    )
+
+
+def log_plan(plan: MemoryPlan, logger: logging.Logger) -> None:
+    logger.info(
+        "Memory plan for a %.0f MB budget: ~%d rows x %.0f B, estimated peak %.0f MB, "
+        "workers=%d transport=%s render_process=%s chunk_rows=%d batch_size=%d",
+        plan.budget_bytes / 2**20,
+        plan.estimated_rows,
+        plan.row_bytes,
+        plan.estimated_peak_bytes / 2**20,
+        plan.workers,
+        plan.transport,
+        plan.render_process,
+        plan.chunk_rows,
+        plan.batch_size,
+    )
+    for note in plan.notes:
+        logger.warning("Memory budget: %s", note)
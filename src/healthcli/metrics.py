@@ -0,0 +1,207 @@
+"""
+Per-stage and per-rule performance instrumentation.
+
+MetricsRecorder wraps pipeline stages and clinical rules and records:
+- wall time and CPU time
+- peak RSS growth of the process (resource.getrusage), and of its
+  largest finished worker process
+- the memory budget, when one is set (see healthcli.memory_budget)
+- peak traced Python allocations (tracemalloc, optional)
+- rows processed per second
+
+Each finished stage is also logged as a structured "stage" event (see
+logging_utils.event), so JSON logs carry the same measurements.
+
+The collected metrics are written to a machine-readable metrics.json
+and summarised in the HTML quality report, so performance regressions
+can be tracked across releases.
+"""
+
+import json
+import logging
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+from healthcli.logging_utils import event
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+
+def peak_rss_bytes() -> Optional[int]:
+    """Process peak resident set size in bytes, if the platform reports it."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in kilobytes on Linux and in bytes on macOS
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def _peak_children_rss_bytes() -> Optional[int]:
+    """Largest peak RSS of any finished child process (e.g. pool workers)."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+@dataclass
+class StageMetrics:
+    """
+    Measurements for a single instrumented stage or rule.
+
+    rows may be set by the caller inside the stage when the row count is
+    only known once the stage has run (e.g. ingest).
+    """
+    stage: str
+    rows: Optional[int] = None
+    wall_seconds: float = 0.0
+    cpu_seconds: float = 0.0
+    rows_per_second: Optional[float] = None
+    peak_rss_bytes: Optional[int] = None        # Process high-water mark after the stage
+    peak_rss_delta_bytes: Optional[int] = None  # Growth of the high-water mark during the stage
+    peak_traced_bytes: Optional[int] = None     # tracemalloc peak above the stage's starting point
+    peak_children_rss_bytes: Optional[int] = None  # Largest finished child process high-water mark
+    budget_bytes: Optional[int] = None          # Memory budget the peaks are held against
+
+
+class MetricsRecorder:
+    """
+    Collects StageMetrics for instrumented stages.
+
+    Usage:
+        recorder = MetricsRecorder(logger=logger)
+        with recorder.stage("ingest") as m:
+            df = load_csv_data(path)
+            m.rows = len(df)
+        recorder.write_json(out_dir / "metrics.json")
+
+    A disabled recorder still yields StageMetrics objects but does not
+    measure or keep them, so callers never need to branch.
+    """
+
+    def __init__(
+        self,
+        enabled: bool = True,
+        trace_memory: bool = False,
+        logger: Optional[logging.Logger] = None,
+    ):
+        self.enabled = enabled
+        self.trace_memory = trace_memory
+        self.logger = logger or logging.getLogger("healthcli.metrics")
+        self.started_at = datetime.now().isoformat(timespec="seconds")
+        # Set by memory-budgeted runs (memory_budget.MemoryPlan)
+        self.budget_bytes: Optional[int] = None
+        self.memory_plan: Optional[Dict[str, Any]] = None
+        self.stages: List[StageMetrics] = []
+        # Peak traced memory seen by each active (possibly nested) stage
+        self._active_peaks: List[int] = []
+        self._owns_tracing = False
+
+    def start(self) -> None:
+        """Start tracemalloc if memory tracing was requested."""
+        if self.enabled and self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._owns_tracing = True
+
+    def stop(self) -> None:
+        """Stop tracemalloc if this recorder started it."""
+        if self._owns_tracing:
+            tracemalloc.stop()
+            self._owns_tracing = False
+
+    def _fold_traced_peak(self) -> None:
+        # reset_peak() discards the running peak, so hand it to every
+        # enclosing stage before a nested stage resets it.
+        _, peak = tracemalloc.get_traced_memory()
+        self._active_peaks = [max(p, peak) for p in self._active_peaks]
+
+    @contextmanager
+    def stage(self, name: str, rows: Optional[int] = None) -> Iterator[StageMetrics]:
+        metrics = StageMetrics(stage=name, rows=rows)
+        if not self.enabled:
+            yield metrics
+            return
+
+        tracing = self.trace_memory and tracemalloc.is_tracing()
+        if tracing:
+            self._fold_traced_peak()
+            tracemalloc.reset_peak()
+            traced_start, _ = tracemalloc.get_traced_memory()
+            self._active_peaks.append(traced_start)
+
+        rss_start = peak_rss_bytes()
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+
+        try:
+            yield metrics
+        finally:
+            metrics.wall_seconds = time.perf_counter() - wall_start
+            metrics.cpu_seconds = time.process_time() - cpu_start
+
+            rss_end = peak_rss_bytes()
+            if rss_end is not None:
+                metrics.peak_rss_bytes = rss_end
+                metrics.peak_rss_delta_bytes = rss_end - rss_start
+            metrics.peak_children_rss_bytes = _peak_children_rss_bytes() or None
+            metrics.budget_bytes = self.budget_bytes
+            # The high-water mark never falls, so only the crossing stage warns
+            budget = self.budget_bytes
+            if budget is not None and rss_end is not None and rss_start <= budget < rss_end:
+                self.logger.warning(
+                    "Stage %s: peak RSS %.0f MB exceeds the %.0f MB memory budget",
+                    name,
+                    rss_end / 2**20,
+                    budget / 2**20,
+                )
+
+            if tracing:
+                self._fold_traced_peak()
+                peak = self._active_peaks.pop()
+                metrics.peak_traced_bytes = max(peak - traced_start, 0)
+
+            if metrics.rows is not None and metrics.wall_seconds > 0:
+                metrics.rows_per_second = metrics.rows / metrics.wall_seconds
+
+            self.stages.append(metrics)
+            self.logger.info(
+                "Stage %s: wall=%.3fs cpu=%.3fs rows=%s",
+                name,
+                metrics.wall_seconds,
+                metrics.cpu_seconds,
+                metrics.rows,
+                extra=event(
+                    "stage",
+                    stage=name,
+                    duration_s=round(metrics.wall_seconds, 6),
+                    cpu_s=round(metrics.cpu_seconds, 6),
+                    rows=metrics.rows,
+                    rows_per_second=metrics.rows_per_second,
+                    peak_rss_bytes=metrics.peak_rss_bytes,
+                ),
+            )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "started_at": self.started_at,
+            "trace_memory": self.trace_memory,
+            "memory_plan": self.memory_plan,
+            "stages": [asdict(m) for m in self.stages],
+        }
+
+    def summary_rows(self) -> List[Dict[str, Any]]:
+        """Stage metrics as plain dicts, for the HTML report template."""
+        return [asdict(m) for m in self.stages]
+
+    def write_json(self, path: Path) -> None:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, indent=2)
@@ -0,0 +1,235 @@
+"""
+Patient-partitioned parallel validation.
+
+Per-patient rules (VitalSignAnomalyRule, PatientSexConsistencyRule) need
+all rows of a patient together, so rows cannot be split at arbitrary
+boundaries. Instead every row is assigned to one of N partitions by a
+hash of its patient_id; each partition keeps its rows in input order and
+its original row labels, and is validated in a worker process.
+
+The partial results are merged into exactly what a serial run returns:
+- null counts are summed, and the missing summary and
+  MissingDataThresholdRule are computed from the totals
+- row-level violations are concatenated and sorted
+- FHIR counters are summed and errors put back in serial order
+  (quality.fhir_error_order)
+
+Partitions reach the workers through a SharedFrame (parallel.transport:
+arrow, the default): the frame is written once to a memory-mapped Arrow
+file and each task carries only a path and row positions. With
+transport: pickle, or when the frame cannot be shared, each partition is
+pickled to its worker instead.
+
+With an FHIR export, each worker writes the resources it validates to
+part files, joined by the calling process (fhir_export.merge_parts).
+"""
+
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from healthcli.clinical_rules_extended import (
+    ClinicalCoherenceRule,
+    MissingDataThresholdRule,
+    RuleResult,
+    VitalSignAnomalyRule,
+    run_clinical_rules,
+)
+from healthcli.fhir_export import NdjsonExporter, merge_parts
+from healthcli.logging_utils import event
+from healthcli.metrics import MetricsRecorder
+from healthcli.quality import fhir_error_order, fhir_validation_summary, missing_summary_from_counts
+from healthcli.shared_frame import attach_frame, publish
+
+PARTITION_KEY = "patient_id"
+TRANSPORTS = ("arrow", "pickle")
+
+# Rules computed from the merged null counts rather than per partition
+_COUNT_RULES = {"MissingDataThresholdRule"}
+
+# Row-level rules, whose merged results are logged as the rule logs them
+_ROW_RULES = {rule.__name__: rule for rule in (ClinicalCoherenceRule, VitalSignAnomalyRule)}
+
+
+def partition_rows(df: pd.DataFrame, n_partitions: int, key: str = PARTITION_KEY) -> List[np.ndarray]:
+    """
+    Row positions of each partition, in input order.
+
+    Rows with the same key always land in the same partition. Without a
+    key column the rows are split into contiguous ranges.
+    """
+    if key not in df.columns:
+        return [p for p in np.array_split(np.arange(len(df)), n_partitions) if len(p)]
+
+    hashes = pd.util.hash_pandas_object(df[key], index=False).to_numpy()
+    assignment = hashes % np.uint64(n_partitions)
+    partitions = [np.flatnonzero(assignment == i) for i in range(n_partitions)]
+    return [p for p in partitions if len(p)]
+
+
+def validate_partition(
+    part: pd.DataFrame,
+    export: Optional[Dict[str, Any]] = None,
+    index: int = 0,
+    fhir: bool = True,
+) -> Dict[str, Any]:
+    """
+    Worker: null counts, row-level clinical rules and FHIR validation of one partition.
+
+    Logging is silenced here; the merged results are logged once by the
+    calling process. With export (NdjsonExporter options), the valid
+    resources are written to part files numbered by index. With
+    fhir=False the FHIR validation is skipped and fhir_summary is None.
+    """
+    logger = logging.getLogger("healthcli.partition")
+    logger.propagate = False
+    if not logger.handlers:
+        logger.addHandler(logging.NullHandler())
+
+    clinical = run_clinical_rules(part, logger)
+    for name in _COUNT_RULES:
+        clinical.pop(name, None)
+
+    fhir_summary, export_files = None, []
+    if fhir:
+        exporter = NdjsonExporter(**export, part=index) if export is not None else None
+        try:
+            fhir_summary = fhir_validation_summary(part, logger, sink=exporter)
+        finally:
+            export_files = exporter.close() if exporter is not None else []
+
+    return {
+        "rows": len(part),
+        "null_counts": part.isna().sum(),
+        "clinical_violations": clinical,
+        "fhir_summary": fhir_summary,
+        "export_files": export_files,
+    }
+
+
+def validate_shared_partition(
+    path: str,
+    positions: np.ndarray,
+    export: Optional[Dict[str, Any]] = None,
+    index: int = 0,
+    fhir: bool = True,
+) -> Dict[str, Any]:
+    """Worker: validate_partition on rows attached from a SharedFrame."""
+    return validate_partition(attach_frame(path, positions), export, index, fhir)
+
+
+def merge_partitions(
+    partials: List[Dict[str, Any]],
+    columns: pd.Index,
+    config: dict,
+    logger: logging.Logger,
+) -> Dict[str, Any]:
+    """Merge partition results into the result of a serial validate()."""
+    rows = sum(p["rows"] for p in partials)
+    null_counts = sum((p["null_counts"] for p in partials[1:]), partials[0]["null_counts"])
+    null_counts = null_counts.reindex(columns)
+    summary = missing_summary_from_counts(null_counts, rows, logger, config)
+
+    clinical: Dict[str, RuleResult] = {}
+    for name, first in partials[0]["clinical_violations"].items():
+        violations = sorted(v for p in partials for v in p["clinical_violations"][name].violations)
+        clinical[name] = RuleResult(
+            rule_name=name,
+            violations=violations,
+            count=len(violations),
+            severity=first.severity,
+            details=first.details,
+        )
+        _ROW_RULES[name]().log(clinical[name], logger)
+    clinical["MissingDataThresholdRule"] = MissingDataThresholdRule().apply_counts(
+        null_counts.to_dict(), rows, logger=logger
+    )
+    results: Dict[str, Any] = {
+        "missing_summary": summary,
+        "clinical_violations": clinical,
+    }
+    if partials[0]["fhir_summary"] is None:
+        return results
+
+    fhir: Dict[str, Any] = {
+        key: sum(p["fhir_summary"][key] for p in partials)
+        for key, value in partials[0]["fhir_summary"].items()
+        if isinstance(value, int)
+    }
+    errors = sorted(
+        (
+            (detail, message)
+            for p in partials
+            for detail, message in zip(p["fhir_summary"]["error_details"], p["fhir_summary"]["errors"])
+        ),
+        key=lambda pair: fhir_error_order(pair[0]),
+    )
+    fhir["errors"] = [message for _, message in errors]
+    fhir["error_details"] = [detail for detail, _ in errors]
+    logger.info(
+        "FHIR-inspired validation completed: %d patients, %d observations",
+        fhir["patients_validated"],
+        fhir["observations_validated"],
+        extra=event("fhir_summary", **{key: value for key, value in fhir.items() if isinstance(value, int)}),
+    )
+    results["fhir_summary"] = fhir
+    return results
+
+
+def validate_parallel(
+    df: pd.DataFrame,
+    config: dict,
+    workers: int,
+    recorder: Optional[MetricsRecorder] = None,
+    logger: Optional[logging.Logger] = None,
+    export: Optional[Dict[str, Any]] = None,
+    fhir: bool = True,
+) -> Dict[str, Any]:
+    """
+    Validate df in `workers` patient-hash partitions, one worker process each.
+
+    Returns the same dict as pipeline.validate() on the whole frame.
+    """
+    logger = logger or logging.getLogger("healthcli.pipeline")
+    if recorder is None:
+        recorder = MetricsRecorder(enabled=False)
+    rows = len(df)
+    transport = config.get("parallel", {}).get("transport", "arrow")
+    if transport not in TRANSPORTS:
+        raise ValueError(f"Unknown parallel.transport: {transport!r} (expected one of {TRANSPORTS})")
+
+    with recorder.stage("partition", rows=rows):
+        positions = partition_rows(df, workers)
+        shared = publish(df, logger) if transport == "arrow" else None
+    logger.info(
+        "Validating %d rows in %d patient partitions (%s transport)",
+        rows,
+        len(positions),
+        "arrow" if shared is not None else "pickle",
+    )
+
+    exports = [export] * len(positions)
+    indexes = range(len(positions))
+    fhirs = [fhir] * len(positions)
+    with recorder.stage("validate_partitions", rows=rows):
+        with ProcessPoolExecutor(max_workers=min(workers, len(positions))) as executor:
+            if shared is not None:
+                with shared:
+                    partials = list(executor.map(
+                        validate_shared_partition, [shared.path] * len(positions), positions, exports, indexes, fhirs
+                    ))
+            else:
+                partials = list(executor.map(
+                    validate_partition, (df.iloc[p] for p in positions), exports, indexes, fhirs
+                ))
+
+    with recorder.stage("merge_partitions", rows=rows):
+        results = merge_partitions(partials, df.columns, config, logger)
+        if export is not None:
+            results["export_files"] = merge_parts(
+                export["directory"], [p["export_files"] for p in partials], export["compress"], logger
+            )
+    return results
@@ -1,13 +1,33 @@
+from dataclasses import replace
 from pathlib import Path
+import functools
+import json
 import logging
-from typing import Tuple
+import uuid
+from typing import Dict, List, Optional, Tuple
 
+import pandas as pd
+
+from healthcli.artifacts import pyarrow_available, write_result_artifacts
+from healthcli.bulk_fhir import DEFAULT_BATCH_LINES, is_fhir_ndjson, load_fhir_ndjson
 from healthcli.clinical_rules_extended import run_clinical_rules
 from healthcli.data_loader import load_csv_data
+from healthcli.fhir_export import DEFAULT_BATCH_SIZE, EXPORT_DIR, NdjsonExporter, clear_export
+from healthcli.history import DEFAULT_HISTORY_PATH, FHIR_COUNTERS, HistoryStore, dataset_name
 from healthcli.config_loader import load_config
-from healthcli.logging_utils import setup_logger
-from healthcli.quality import fhir_validation_summary, missing_summary
-from healthcli.quality_report import QualityReportGenerator
+from healthcli.logging_utils import log_context, logger_from_config
+from healthcli.memory_budget import DEFAULT_SAMPLE_ROWS, estimate_rows, log_plan, parse_size, plan_memory
+from healthcli.metrics import MetricsRecorder
+from healthcli.incremental import IncrementalState
+from healthcli.quality import fhir_validation_summary, missing_summary, missing_summary_from_counts
+from healthcli.manifest import RunManifest
+from healthcli.parallel import validate_parallel
+from healthcli.render_worker import ReportRenderer, read_marker
+from healthcli.sampling import DEFAULT_CHUNK_ROWS, DEFAULT_CONFIDENCE, Sample, estimate_rates, sample_csv
+from healthcli.transform import clean, write_cleaned
+
+# Headline figures of each run (see _write_run_summary)
+RUN_SUMMARY = "summary.json"
 
 
 def ingest(data_path: str) -> Tuple[object, int]:
@@ -15,51 +35,622 @@ def ingest(data_path: str) -> Tuple[object, int]:
     return df, len(df)
 
 
-def validate(df, config: dict) -> dict:
+def validate(
+    df,
+    config: dict,
+    recorder: Optional[MetricsRecorder] = None,
+    renderer: Optional[ReportRenderer] = None,
+    workers: int = 1,
+    export: Optional[dict] = None,
+    fhir: bool = True,
+) -> dict:
+    """
+    Missing summary, clinical rules and FHIR validation of df.
+
+    With export (NdjsonExporter options), the resources validated are
+    written as NDJSON in the same pass; their file names are returned as
+    "export_files". With fhir=False (rows flattened from resources that
+    were validated as they were read), the FHIR validation is skipped and
+    no "fhir_summary" is returned.
+    """
+    logger = logging.getLogger("healthcli.pipeline")
+    if recorder is None:
+        recorder = MetricsRecorder(enabled=False)
+    rows = len(df)
+
+    if workers > 1 and rows > 0:
+        results = validate_parallel(
+            df, config, workers, recorder=recorder, logger=logger, export=export, fhir=fhir
+        )
+        if renderer is not None:
+            counts = results["missing_summary"]["missing_count"].reindex(df.columns)
+            renderer.submit_chart({col: int(n) for col, n in counts.items()})
+        return results
+
+    with recorder.stage("missing_summary", rows=rows):
+        summary = missing_summary(df, logger, config)
+
+    # The chart only needs missing counts, so it renders in the worker
+    # process while the clinical rules and FHIR validation run here
+    if renderer is not None:
+        counts = summary["missing_count"].reindex(df.columns)
+        renderer.submit_chart({col: int(n) for col, n in counts.items()})
+
+    with recorder.stage("run_clinical_rules", rows=rows):
+        clinical_violations = run_clinical_rules(df, logger, recorder=recorder)
+    results = {
+        "missing_summary": summary,
+        "clinical_violations": clinical_violations,
+    }
+    if not fhir:
+        return results
+
+    exporter = NdjsonExporter(**export) if export is not None else None
+    with recorder.stage("fhir_validation_summary", rows=rows):
+        try:
+            results["fhir_summary"] = fhir_validation_summary(df, logger, sink=exporter)
+        finally:
+            export_files = exporter.close() if exporter is not None else None
+    if export_files is not None:
+        results["export_files"] = export_files
+    return results
+
+
+def transform(
+    df,
+    config: dict,
+    output_dir: Optional[str] = None,
+    logger: Optional[logging.Logger] = None,
+    incremental: bool = False,
+):
+    """
+    Clean df as configured (see healthcli.transform) and, if output_dir is
+    given, stream the cleaned rows to <output_dir>/cleaned/. incremental
+    marks df as the rows appended since the last run.
+
+    Returns the cleaned DataFrame and the cleaned part files written.
+    """
+    logger = logger or logging.getLogger("healthcli.pipeline")
+    transform_config = config.get("transform", {})
+    first_row = int(df.index[0]) if len(df) else 0
+
+    cleaned = clean(df, config, logger, incremental=incremental)
+    files = []
+    if output_dir is not None:
+        files = write_cleaned(
+            cleaned,
+            output_dir,
+            fmt=transform_config.get("output_format", "csv"),
+            chunk_rows=transform_config.get("chunk_rows", 500_000),
+            first_row=first_row,
+            logger=logger,
+        )
+    return cleaned, files
+
+
+def validate_increment(
+    chunk,
+    state: IncrementalState,
+    config: dict,
+    recorder: Optional[MetricsRecorder] = None,
+    renderer: Optional[ReportRenderer] = None,
+) -> dict:
+    """
+    Validate newly appended rows and merge them into the cumulative results.
+
+    state must already include chunk in its profile (update_profile), so
+    missing data checks see the cumulative counts.
+    """
+    logger = logging.getLogger("healthcli.pipeline")
+    if recorder is None:
+        recorder = MetricsRecorder(enabled=False)
+    rows = len(chunk)
+    counts = state.missing_counts()
+
+    with recorder.stage("missing_summary", rows=rows):
+        summary = missing_summary_from_counts(pd.Series(counts, dtype="int64"), state.rows, logger, config)
+    if renderer is not None:
+        renderer.submit_chart(counts)
+
+    # Each patient's last stored reading precedes its new readings, so
+    # spikes across the previous watermark are still detected
+    combined = state.with_context(chunk)
+    with recorder.stage("run_clinical_rules", rows=rows):
+        clinical_violations = run_clinical_rules(
+            combined, logger, recorder=recorder, missing_counts=counts, total_rows=state.rows
+        )
+    with recorder.stage("fhir_validation_summary", rows=rows):
+        fhir_summary = fhir_validation_summary(chunk, logger)
+
+    with recorder.stage("merge_results", rows=rows):
+        results = state.merge(clinical_violations, fhir_summary, chunk)
+        state.update_last_readings(combined)
+    results["missing_summary"] = summary
+    return results
+
+
+def validate_sample(
+    sample: Sample,
+    config: dict,
+    recorder: Optional[MetricsRecorder] = None,
+    renderer: Optional[ReportRenderer] = None,
+) -> dict:
+    """
+    Validate a sample and estimate file-wide rates (see healthcli.sampling).
+
+    The missing summary and MissingDataThresholdRule use the exact counts
+    from the sampling pass; row-level rules and FHIR validation run on
+    the sampled rows. The estimates are returned as "sample_estimates".
+    """
     logger = logging.getLogger("healthcli.pipeline")
-    summary = missing_summary(df, logger, config)
-    clinical_violations = run_clinical_rules(df, logger)
-    fhir_summary = fhir_validation_summary(df, logger)
+    if recorder is None:
+        recorder = MetricsRecorder(enabled=False)
+    rows = len(sample.frame)
+    counts = sample.missing_counts
+
+    with recorder.stage("missing_summary", rows=sample.total_rows):
+        summary = missing_summary_from_counts(pd.Series(counts, dtype="int64"), sample.total_rows, logger, config)
+    if renderer is not None:
+        renderer.submit_chart(counts)
+
+    with recorder.stage("run_clinical_rules", rows=rows):
+        clinical_violations = run_clinical_rules(
+            sample.frame, logger, recorder=recorder, missing_counts=counts, total_rows=sample.total_rows
+        )
+    with recorder.stage("fhir_validation_summary", rows=rows):
+        fhir_summary = fhir_validation_summary(sample.frame, logger)
+    with recorder.stage("estimate_rates", rows=rows):
+        estimates = estimate_rates(
+            sample,
+            clinical_violations,
+            fhir_summary,
+            confidence=config.get("sampling", {}).get("confidence", DEFAULT_CONFIDENCE),
+        )
     return {
         "missing_summary": summary,
         "clinical_violations": clinical_violations,
         "fhir_summary": fhir_summary,
+        "sample_estimates": estimates,
     }
 
 
-def transform(df, config: dict):
-    # Placeholder transform: no-op currently
-    return df
+def _with_run_context(func):
+    """Tag every log record of a run with a fresh run_id and the dataset name."""
+    @functools.wraps(func)
+    def wrapper(data_path: str, *args, **kwargs):
+        with log_context(run_id=uuid.uuid4().hex[:12], dataset=dataset_name(data_path)):
+            return func(data_path, *args, **kwargs)
+    return wrapper
 
 
-def run_pipeline(data_path: str, config_path: str, output_dir: str) -> int:
-    config = load_config(config_path)
-    logger = setup_logger(
-        "healthcli.pipeline",
-        level=config.get("logging", {}).get("level", "INFO"),
-        log_dir=config.get("logging", {}).get("log_dir", "logs"),
-    )
+@_with_run_context
+def run_pipeline(
+    data_path: str,
+    config_path: str,
+    output_dir: str,
+    recorder: Optional[MetricsRecorder] = None,
+    async_pdf: Optional[bool] = None,
+    force: bool = False,
+    incremental: Optional[bool] = None,
+    workers: Optional[int] = None,
+    memory_budget: Optional[str] = None,
+    sample: Optional[int] = None,
+    sample_by: Optional[str] = None,
+    config: Optional[dict] = None,
+    export_fhir: Optional[bool] = None,
+) -> int:
+    # Batch runs pass the already loaded contents of config_path
+    if config is None:
+        config = load_config(config_path)
+    logger = logger_from_config("healthcli.pipeline", config)
 
-    logger.info("Pipeline started: ingest -> validate -> transform")
+    if recorder is None:
+        metrics_config = config.get("metrics", {})
+        recorder = MetricsRecorder(
+            enabled=metrics_config.get("enabled", True),
+            trace_memory=metrics_config.get("trace_memory", False),
+            logger=logger,
+        )
+    recorder.start()
 
-    df, rows = ingest(data_path)
-    logger.info("Ingested %d rows from %s", rows, data_path)
+    report_config = config.get("report", {})
+    if async_pdf is None:
+        async_pdf = report_config.get("async_pdf", False)
+    if incremental is None:
+        incremental = config.get("incremental", {}).get("enabled", False)
+    if workers is None:
+        workers = config.get("parallel", {}).get("workers", 1)
+    if sample is not None and incremental:
+        raise ValueError("--sample cannot be combined with incremental runs")
+    bulk_fhir = is_fhir_ndjson(data_path)
+    if bulk_fhir and (incremental or sample is not None):
+        raise ValueError("FHIR NDJSON input does not support incremental or sampled runs")
+    if export_fhir is None:
+        export_fhir = config.get("export", {}).get("fhir_ndjson", False)
+    if export_fhir and (incremental or sample is not None):
+        logger.warning("FHIR export skipped: incremental and sampled runs do not validate every row")
+        export_fhir = False
+
+    memory_config = config.get("memory", {})
+    if memory_budget is None:
+        memory_budget = memory_config.get("budget")
+    if memory_budget is not None and bulk_fhir:
+        logger.warning("Memory budget ignored: planning samples CSV rows, not FHIR NDJSON")
+    elif memory_budget is not None:
+        # Size the run from a sampled parse before the data is loaded
+        with recorder.stage("plan_memory"):
+            estimate = estimate_rows(data_path, memory_config.get("sample_rows", DEFAULT_SAMPLE_ROWS))
+            if sample is not None:
+                estimate = replace(estimate, estimated_rows=min(estimate.estimated_rows, sample))
+            plan = plan_memory(parse_size(memory_budget), estimate, config, workers)
+        log_plan(plan, logger)
+        config = plan.apply(config)
+        workers = plan.workers
+        recorder.budget_bytes = plan.budget_bytes
+        recorder.memory_plan = plan.to_dict()
 
-    results = validate(df, config)
+    logger.info("Pipeline started: ingest -> validate -> transform")
 
     out_dir = Path(output_dir)
     out_dir.mkdir(parents=True, exist_ok=True)
+    html_path = out_dir / "quality_report.html"
+    pdf_path = out_dir / "quality_report.pdf"
+
+    # Artifacts whose inputs (data, config, package version) are unchanged
+    # since the last run in this output directory are reused as-is
+    manifest = RunManifest(out_dir)
+    use_cache = config.get("cache", {}).get("enabled", True) and not force
+
+    renderer = ReportRenderer(use_process=report_config.get("render_process", True), logger=logger)
+    try:
+        if incremental:
+            df, html_ok, inputs_key = _run_incremental_stages(
+                data_path, config, config_path, out_dir, manifest, use_cache, recorder, renderer, logger
+            )
+        elif sample is not None:
+            # Quick looks always run; the cleaned data is not written from a sample
+            df = None
+            html_ok, inputs_key = _run_sample_stages(
+                data_path, config, config_path, out_dir, manifest, sample, sample_by, recorder, renderer, logger
+            )
+        else:
+            with recorder.stage("hash_inputs"):
+                inputs_key = manifest.key(
+                    data=manifest.fingerprint(data_path),
+                    config=manifest.fingerprint(config_path),
+                )
+            df = None
+            if use_cache and _is_fresh(manifest, config, inputs_key, export_fhir):
+                logger.info("Inputs unchanged since last run; reusing cached reports in %s", out_dir)
+                html_ok = True
+            else:
+                export = _export_options(config, out_dir) if export_fhir else None
+                df, html_ok = _run_stages(
+                    data_path, config, out_dir, inputs_key, manifest, recorder, renderer, logger, workers, export
+                )
+
+        # The PDF renders in the worker while the transform stage runs
+        pdf_key = None
+        if html_ok:
+            pdf_key = _submit_pdf(html_path, pdf_path, manifest, use_cache, async_pdf, renderer, logger)
+
+        if df is not None and _transform_enabled(config):
+            with recorder.stage("transform", rows=len(df)):
+                _, cleaned_files = transform(df, config, str(out_dir), logger, incremental=incremental)
+            manifest.record("cleaned_data", inputs_key, cleaned_files)
+
+        if pdf_key is not None and not async_pdf:
+            _finish_pdf(pdf_path, pdf_key, manifest, recorder, renderer, logger)
+    finally:
+        renderer.shutdown()
+        manifest.save()
+
+    recorder.stop()
+    if recorder.enabled:
+        recorder.write_json(out_dir / "metrics.json")
+        logger.info("Metrics written to %s", out_dir / "metrics.json")
+
+    logger.info("Pipeline completed successfully")
+    return 0
+
+
+def _columnar_enabled(config: dict) -> bool:
+    return config.get("artifacts", {}).get("parquet", True) and pyarrow_available()
+
+
+def _transform_enabled(config: dict) -> bool:
+    return config.get("transform", {}).get("enabled", True)
+
+
+def _export_options(config: dict, out_dir: Path) -> dict:
+    """NdjsonExporter options of the config's export section."""
+    export_config = config.get("export", {})
+    return {
+        "directory": str(out_dir / EXPORT_DIR),
+        "compress": export_config.get("compress", True),
+        "batch_size": export_config.get("batch_size", DEFAULT_BATCH_SIZE),
+    }
+
+
+def _is_fresh(manifest: RunManifest, config: dict, inputs_key: str, export_fhir: bool = False) -> bool:
+    """True if every cached artifact was produced from inputs_key."""
+    artifacts = ["missing_summary", "run_summary", "html_report"]
+    if _columnar_enabled(config):
+        artifacts.append("columnar_results")
+    if _transform_enabled(config):
+        artifacts.append("cleaned_data")
+    if export_fhir:
+        artifacts.append("fhir_export")
+    return all(manifest.is_fresh(artifact, inputs_key) for artifact in artifacts)
+
+
+def _run_stages(
+    data_path: str,
+    config: dict,
+    out_dir: Path,
+    inputs_key: str,
+    manifest: RunManifest,
+    recorder: MetricsRecorder,
+    renderer: ReportRenderer,
+    logger: logging.Logger,
+    workers: int = 1,
+    export: Optional[dict] = None,
+) -> Tuple[object, bool]:
+    """
+    Ingest, validate, and write the missing summary and HTML report.
+
+    With workers > 1, validation runs in patient-hash partitions in
+    parallel. With export (see _export_options), the valid FHIR resources
+    are written to <output>/fhir as they are validated. Returns the
+    ingested DataFrame and whether the HTML report was written.
+    """
+    if export is not None:
+        clear_export(export["directory"])
+    bulk = None
+    with recorder.stage("ingest") as stage:
+        if is_fhir_ndjson(data_path):
+            # Resources are validated as they are read, so validate() does
+            # not check the flattened frame against the models again
+            batch_lines = config.get("bulk_fhir", {}).get("batch_lines", DEFAULT_BATCH_LINES)
+            exporter = NdjsonExporter(**export) if export is not None else None
+            try:
+                bulk = load_fhir_ndjson(data_path, batch_lines=batch_lines, logger=logger, sink=exporter)
+            finally:
+                if exporter is not None:
+                    exporter.close()
+            df, rows = bulk.frame, len(bulk.frame)
+        else:
+            df, rows = ingest(data_path)
+        stage.rows = rows
+    logger.info("Ingested %d rows from %s", rows, data_path)
+
+    results = validate(
+        df, config, recorder=recorder, renderer=renderer, workers=workers,
+        export=export if bulk is None else None, fhir=bulk is None,
+    )
+    if bulk is not None:
+        results["fhir_summary"] = bulk.summary
+        if exporter is not None:
+            results["export_files"] = exporter.files
+    if export is not None:
+        export_files = [f"{EXPORT_DIR}/{name}" for name in results["export_files"]]
+        manifest.record("fhir_export", inputs_key, export_files)
+        logger.info("FHIR resources exported to %s: %s", export["directory"], ", ".join(export_files) or "none")
+
+    html_ok = _write_outputs(
+        data_path, config, out_dir, inputs_key, manifest, recorder, renderer, logger, results, df=df
+    )
+    return df, html_ok
+
+
+def _run_incremental_stages(
+    data_path: str,
+    config: dict,
+    config_path: str,
+    out_dir: Path,
+    manifest: RunManifest,
+    use_cache: bool,
+    recorder: MetricsRecorder,
+    renderer: ReportRenderer,
+    logger: logging.Logger,
+) -> Tuple[object, bool, str]:
+    """
+    Validate only the rows appended since the last run and rewrite the
+    cumulative outputs from the merged state.
+
+    Returns the new rows (None if there were none), whether the HTML
+    report was written and the manifest key of this run's inputs.
+    """
+    state = IncrementalState(out_dir)
+    with recorder.stage("hash_inputs"):
+        config_key = manifest.key(config=manifest.fingerprint(config_path))
+    if not use_cache or not state.matches(data_path, config_key):
+        logger.info("No usable incremental state; processing %s from the start", data_path)
+        state.reset(data_path, config_key)
+
+    with recorder.stage("ingest") as stage:
+        chunk = state.read_new_rows(data_path)
+        stage.rows = 0 if chunk is None else len(chunk)
+
+    # The watermark stands in for a content hash of the whole data file
+    inputs_key = manifest.key(data=f"{state.offset}:{state.tail_sha256}", config=config_key)
+
+    if chunk is None:
+        if state.rows == 0:
+            raise ValueError(f"Dataset is empty: {data_path}")
+        if use_cache and _is_fresh(manifest, config, inputs_key):
+            logger.info("No rows appended since the last run; reusing cached reports in %s", out_dir)
+            return None, True, inputs_key
+        logger.info("No rows appended since the last run; rewriting reports from incremental state")
+        results = state.cumulative_results()
+        results["missing_summary"] = missing_summary_from_counts(
+            pd.Series(state.missing_counts(), dtype="int64"), state.rows, logger, config
+        )
+        renderer.submit_chart(state.missing_counts())
+    else:
+        with recorder.stage("merge_profile", rows=len(chunk)):
+            state.update_profile(chunk)
+        logger.info("Ingested %d new rows from %s (%d in total)", len(chunk), data_path, state.rows)
+        results = validate_increment(chunk, state, config, recorder=recorder, renderer=renderer)
+
+    html_ok = _write_outputs(
+        data_path,
+        config,
+        out_dir,
+        inputs_key,
+        manifest,
+        recorder,
+        renderer,
+        logger,
+        results,
+        rows=state.rows,
+        missing_counts=state.missing_counts(),
+        profile=state.profile_records(),
+    )
+    with recorder.stage("save_incremental_state"):
+        state.save()
+    return chunk, html_ok, inputs_key
+
+
+def _run_sample_stages(
+    data_path: str,
+    config: dict,
+    config_path: str,
+    out_dir: Path,
+    manifest: RunManifest,
+    size: int,
+    by: Optional[str],
+    recorder: MetricsRecorder,
+    renderer: ReportRenderer,
+    logger: logging.Logger,
+) -> Tuple[bool, str]:
+    """
+    Sample the input, validate the sample and write sample-based outputs.
+
+    Returns whether the HTML report was written and the manifest key of
+    this run's inputs, which includes the sample settings.
+    """
+    sampling_config = config.get("sampling", {})
+    seed = sampling_config.get("seed", 0)
+    with recorder.stage("hash_inputs"):
+        inputs_key = manifest.key(
+            data=manifest.fingerprint(data_path),
+            config=manifest.fingerprint(config_path),
+            sample=f"{size}:{by}:{seed}",
+        )
+
+    with recorder.stage("ingest") as stage:
+        drawn = sample_csv(
+            data_path,
+            size,
+            by=by,
+            seed=seed,
+            chunk_rows=sampling_config.get("chunk_rows", DEFAULT_CHUNK_ROWS),
+        )
+        stage.rows = drawn.total_rows
+    logger.info("Sampled %s from %s", drawn.describe(), data_path)
+
+    results = validate_sample(drawn, config, recorder=recorder, renderer=renderer)
+    html_ok = _write_outputs(
+        data_path,
+        config,
+        out_dir,
+        inputs_key,
+        manifest,
+        recorder,
+        renderer,
+        logger,
+        results,
+        rows=drawn.total_rows,
+        missing_counts=drawn.missing_counts,
+        sample=drawn,
+    )
+    return html_ok, inputs_key
+
+
+def _write_outputs(
+    data_path: str,
+    config: dict,
+    out_dir: Path,
+    inputs_key: str,
+    manifest: RunManifest,
+    recorder: MetricsRecorder,
+    renderer: ReportRenderer,
+    logger: logging.Logger,
+    results: dict,
+    df=None,
+    rows: Optional[int] = None,
+    missing_counts: Optional[Dict[str, int]] = None,
+    profile: Optional[List[Dict]] = None,
+    sample: Optional[Sample] = None,
+) -> bool:
+    """
+    Write the missing and run summaries, columnar results, run history and HTML report.
+
+    Without df (incremental runs), rows, missing_counts and profile
+    describe the cumulative dataset instead. For sample-based runs the
+    estimates are written to sample_estimates.csv and shown in the report;
+    columnar results and run history are skipped, as they describe every
+    row. Returns whether the HTML report was written.
+    """
+    report_config = config.get("report", {})
+    if df is not None:
+        rows = len(df)
+    columns = len(df.columns) if df is not None else len(missing_counts)
 
     # Save a simple CSV of missing summary
     ms = results.get("missing_summary")
     if hasattr(ms, "to_csv"):
         ms.to_csv(out_dir / "missing_summary.csv")
+        manifest.record("missing_summary", inputs_key, ["missing_summary.csv"])
         logger.info("Missing summary written to %s", out_dir / "missing_summary.csv")
 
-    # Generate HTML and PDF quality reports
+    estimates = results.get("sample_estimates")
+    if estimates is not None:
+        estimates.to_csv(out_dir / "sample_estimates.csv")
+        logger.info("Sample estimates written to %s", out_dir / "sample_estimates.csv")
+    else:
+        # Left over from an earlier sample run in this directory
+        (out_dir / "sample_estimates.csv").unlink(missing_ok=True)
+
+    _write_run_summary(out_dir, data_path, rows, columns, results, sample)
+    manifest.record("run_summary", inputs_key, [RUN_SUMMARY])
+
+    # Typed row-level results for downstream jobs
+    if _columnar_enabled(config) and sample is None:
+        with recorder.stage("columnar_artifacts", rows=rows):
+            files = write_result_artifacts(
+                df,
+                results,
+                str(out_dir),
+                batch_size=config.get("artifacts", {}).get("batch_size", 65_536),
+                logger=logger,
+                profile=profile,
+            )
+        manifest.record("columnar_results", inputs_key, files)
+
+    storage_config = config.get("storage", {})
+    if storage_config.get("history", True) and sample is None:
+        with recorder.stage("record_history"):
+            with HistoryStore(storage_config.get("history_path", DEFAULT_HISTORY_PATH)) as store:
+                run_id = store.record_run(
+                    dataset_name(data_path),
+                    data_path,
+                    rows,
+                    columns,
+                    missing_summary=ms,
+                    clinical_violations=results.get("clinical_violations"),
+                    fhir_summary=results.get("fhir_summary"),
+                    inputs_key=inputs_key,
+                )
+        logger.info("Run %d recorded in history store %s", run_id, store.path)
+
+    # Generate HTML and PDF quality reports; the report module pulls in
+    # Jinja2, so it is only imported once it is needed
+    from healthcli.quality_report import QualityReportGenerator
+
     generator = QualityReportGenerator(logger=logger)
     html_path = out_dir / "quality_report.html"
-    pdf_path = out_dir / "quality_report.pdf"
 
     missing_summary_for_report = {}
     if hasattr(ms, "iterrows"):
@@ -69,28 +660,129 @@ def run_pipeline(data_path: str, config_path: str, output_dir: str) -> int:
                 "pct": float(row.get("missing_ratio", 0.0)) * 100,
             }
 
+    html_ok = False
     try:
-        generator.generate_html_report(
-            df,
-            missing_summary=missing_summary_for_report,
-            clinical_violations=results.get("clinical_violations"),
-            fhir_summary=results.get("fhir_summary"),
-            output_path=str(html_path),
+        with recorder.stage("export_violations"):
+            violation_files = generator.export_violations(
+                results.get("clinical_violations"),
+                str(out_dir),
+                page_size=report_config.get("violation_page_size", 100_000),
+            )
+        with recorder.stage("render_chart"):
+            chart_base64 = renderer.chart()
+        with recorder.stage("html_report", rows=rows):
+            generator.generate_html_report(
+                df,
+                missing_summary=missing_summary_for_report,
+                clinical_violations=results.get("clinical_violations"),
+                fhir_summary=results.get("fhir_summary"),
+                output_path=str(html_path),
+                recorder=recorder,
+                chart_base64=chart_base64,
+                violation_files=violation_files,
+                total_records=rows,
+                missing_counts=missing_counts,
+                sample=_sample_for_report(sample, estimates, config),
+            )
+        html_ok = True
+        manifest.record(
+            "html_report",
+            inputs_key,
+            [html_path.name] + [f for files in violation_files.values() for f in files],
         )
         logger.info("HTML report generated: %s", html_path)
     except Exception as exc:
+        manifest.invalidate("html_report")
         logger.error("Failed to generate HTML report: %s", exc)
 
-    try:
-        generator.generate_pdf_report(str(html_path), str(pdf_path))
-        logger.info("PDF report generated: %s", pdf_path)
-    except RuntimeError as exc:
-        logger.warning("PDF report skipped: %s", exc)
-    except Exception as exc:
-        logger.error("Failed to generate PDF report: %s", exc)
+    return html_ok
 
-    # Transform (no-op)
-    _ = transform(df, config)
 
-    logger.info("Pipeline completed successfully")
-    return 0
+def _write_run_summary(
+    out_dir: Path,
+    data_path: str,
+    rows: int,
+    columns: int,
+    results: dict,
+    sample: Optional[Sample],
+) -> None:
+    """Headline figures of the run as summary.json, e.g. for batch index reports."""
+    ms = results.get("missing_summary")
+    missing_cells = int(ms["missing_count"].sum()) if hasattr(ms, "sum") else 0
+    fhir = results.get("fhir_summary") or {}
+    summary = {
+        "dataset": dataset_name(data_path),
+        "data_path": str(data_path),
+        "rows": int(rows),
+        "columns": int(columns),
+        "missing_cells": missing_cells,
+        "completeness_pct": round((1 - missing_cells / (rows * columns)) * 100, 2) if rows and columns else None,
+        "violations": {name: int(r.count) for name, r in (results.get("clinical_violations") or {}).items()},
+        "fhir": {key: fhir.get(key) for key in FHIR_COUNTERS},
+        "sample": sample.describe() if sample is not None else None,
+    }
+    with open(out_dir / RUN_SUMMARY, "w", encoding="utf-8") as f:
+        json.dump(summary, f, indent=2)
+
+
+def _sample_for_report(sample: Optional[Sample], estimates, config: dict) -> Optional[Dict]:
+    if sample is None:
+        return None
+    return {
+        "description": sample.describe(),
+        "confidence": config.get("sampling", {}).get("confidence", DEFAULT_CONFIDENCE),
+        "estimates": estimates.reset_index().to_dict("records"),
+    }
+
+
+def _submit_pdf(
+    html_path: Path,
+    pdf_path: Path,
+    manifest: RunManifest,
+    use_cache: bool,
+    async_pdf: bool,
+    renderer: ReportRenderer,
+    logger: logging.Logger,
+) -> Optional[str]:
+    """
+    Start rendering the PDF unless the cached one was produced from the same HTML.
+
+    Returns the PDF's manifest key if a render was started, else None.
+    """
+    pdf_key = manifest.key(html=manifest.fingerprint(str(html_path)))
+    marker = read_marker(str(pdf_path))
+    if (
+        use_cache
+        and manifest.is_fresh("pdf_report", pdf_key)
+        and marker is not None
+        and marker.get("status") == "ok"
+    ):
+        logger.info("HTML report unchanged; reusing cached PDF report: %s", pdf_path)
+        return None
+
+    manifest.invalidate("pdf_report")
+    renderer.submit_pdf(str(html_path), str(pdf_path), detach=async_pdf)
+    if async_pdf:
+        # Freshness is confirmed on the next run through the completion marker
+        manifest.record("pdf_report", pdf_key, [pdf_path.name])
+    return pdf_key
+
+
+def _finish_pdf(
+    pdf_path: Path,
+    pdf_key: str,
+    manifest: RunManifest,
+    recorder: MetricsRecorder,
+    renderer: ReportRenderer,
+    logger: logging.Logger,
+) -> None:
+    """Wait for the PDF render started by _submit_pdf and record the result."""
+    with recorder.stage("pdf_report"):
+        marker = renderer.wait_pdf()
+    if marker["status"] == "ok":
+        manifest.record("pdf_report", pdf_key, [pdf_path.name])
+        logger.info("PDF report generated: %s", pdf_path)
+    elif marker["status"] == "skipped":
+        logger.warning("PDF report skipped: %s", marker.get("error"))
+    else:
+        logger.error("Failed to generate PDF report: %s", marker.get("error"))
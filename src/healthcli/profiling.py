@@ -0,0 +1,208 @@
+"""
+Profiling support for the `healthcli profile` command.
+
+Runs the quality or pipeline workflow under:
+- cProfile (deterministic function-level timings, saved as pstats)
+- a wall-clock stack sampler (collapsed stacks for flamegraph tools)
+- tracemalloc (top allocation sites per instrumented stage)
+
+The resulting files can be attached to performance tickets as-is.
+"""
+
+import cProfile
+import io
+import json
+import logging
+import pstats
+import sys
+import threading
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional
+
+from healthcli.metrics import MetricsRecorder, StageMetrics
+
+
+# Allocation sites in these files only describe the profiler itself
+_TRACEMALLOC_EXCLUDES = frozenset({
+    __file__,
+    tracemalloc.__file__,
+    "<frozen importlib._bootstrap>",
+    "<frozen importlib._bootstrap_external>",
+    "<unknown>",
+})
+
+
+class AllocationRecorder(MetricsRecorder):
+    """
+    MetricsRecorder that also records the top allocation sites per stage.
+
+    A tracemalloc snapshot is taken when each stage starts and ends; the
+    difference, grouped by source line, gives the stage's allocation
+    hot spots. Snapshots are expensive, so this is only used when profiling;
+    profiler, if given, is paused while they are taken and compared so the
+    recorder's own work stays out of the profile.
+    """
+
+    def __init__(
+        self,
+        top_n: int = 10,
+        logger: Optional[logging.Logger] = None,
+        profiler: Optional[cProfile.Profile] = None,
+    ):
+        super().__init__(enabled=True, trace_memory=True, logger=logger)
+        self.top_n = top_n
+        self.profiler = profiler
+        self.allocations: Dict[str, List[Dict]] = {}
+
+    @contextmanager
+    def _unprofiled(self) -> Iterator[None]:
+        if self.profiler is None:
+            yield
+            return
+        self.profiler.disable()
+        try:
+            yield
+        finally:
+            self.profiler.enable()
+
+    @contextmanager
+    def stage(self, name: str, rows: Optional[int] = None) -> Iterator[StageMetrics]:
+        with self._unprofiled():
+            before = tracemalloc.take_snapshot() if tracemalloc.is_tracing() else None
+
+        with super().stage(name, rows=rows) as metrics:
+            yield metrics
+
+        if before is None:
+            return
+
+        with self._unprofiled():
+            # Excluded sites are dropped after grouping by line: filtering
+            # the snapshots would match every trace against every filter
+            diff = tracemalloc.take_snapshot().compare_to(before, "lineno")
+            top = sorted(
+                (
+                    stat for stat in diff
+                    if stat.size_diff > 0 and stat.traceback[0].filename not in _TRACEMALLOC_EXCLUDES
+                ),
+                key=lambda stat: stat.size_diff,
+                reverse=True,
+            )[: self.top_n]
+            self.allocations[name] = [
+                {
+                    "location": f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}",
+                    "size_diff_bytes": stat.size_diff,
+                    "count_diff": stat.count_diff,
+                }
+                for stat in top
+            ]
+
+
+class StackSampler:
+    """
+    Samples the call stack of one thread at a fixed interval.
+
+    Each sample is stored root-first as a semicolon-joined stack, which is
+    the collapsed format read by flamegraph.pl, speedscope and similar tools.
+    """
+
+    def __init__(self, interval: float = 0.005, thread_id: Optional[int] = None):
+        self.interval = interval
+        self.thread_id = thread_id or threading.get_ident()
+        self.samples: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="healthcli-sampler", daemon=True)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({Path(code.co_filename).name}:{code.co_firstlineno})")
+                frame = frame.f_back
+            self.samples[";".join(reversed(stack))] += 1
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def write_collapsed(self, path: Path) -> None:
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in self.samples.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+def _write_allocations(allocations: Dict[str, List[Dict]], path: Path) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        for stage, sites in allocations.items():
+            f.write(f"[{stage}]\n")
+            if not sites:
+                f.write("  (no net allocations)\n")
+            for site in sites:
+                f.write(
+                    f"  {site['size_diff_bytes'] / 1024:10.1f} KiB"
+                    f"  {site['count_diff']:8d} blocks  {site['location']}\n"
+                )
+            f.write("\n")
+
+
+def run_profiled(
+    workflow: Callable[[MetricsRecorder], int],
+    profile_dir: str,
+    top_n: int = 10,
+    sample_interval: float = 0.005,
+    logger: Optional[logging.Logger] = None,
+) -> int:
+    """
+    Run a workflow under cProfile, the stack sampler and tracemalloc.
+
+    workflow receives the AllocationRecorder so its stages are instrumented.
+    Writes to profile_dir:
+    - profile.pstats: cProfile statistics (load with pstats / snakeviz)
+    - profile.collapsed: sampled stacks for flamegraph tools
+    - profile.txt: top functions by cumulative time
+    - allocations.txt / allocations.json: top allocation sites per stage
+    - metrics.json: per-stage timings and memory
+    """
+    logger = logger or logging.getLogger("healthcli.profiling")
+    out_dir = Path(profile_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    profiler = cProfile.Profile()
+    recorder = AllocationRecorder(top_n=top_n, logger=logger, profiler=profiler)
+    sampler = StackSampler(interval=sample_interval)
+
+    recorder.start()
+    sampler.start()
+    profiler.enable()
+    try:
+        status = workflow(recorder)
+    finally:
+        profiler.disable()
+        sampler.stop()
+        recorder.stop()
+
+    profiler.dump_stats(str(out_dir / "profile.pstats"))
+    sampler.write_collapsed(out_dir / "profile.collapsed")
+
+    stream = io.StringIO()
+    pstats.Stats(profiler, stream=stream).sort_stats("cumulative").print_stats(30)
+    (out_dir / "profile.txt").write_text(stream.getvalue(), encoding="utf-8")
+
+    _write_allocations(recorder.allocations, out_dir / "allocations.txt")
+    with open(out_dir / "allocations.json", "w", encoding="utf-8") as f:
+        json.dump(recorder.allocations, f, indent=2)
+    recorder.write_json(out_dir / "metrics.json")
+
+    logger.info("Profile written to %s", out_dir)
+    return status
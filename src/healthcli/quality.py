@@ -1,9 +1,10 @@
 import pandas as pd
 import logging
-from typing import Dict, Any
-from pydantic import ValidationError
+from typing import Any, Callable, Dict, Optional
+from pydantic import BaseModel, ValidationError
 
-from healthcli.fhir_models import Observation, Patient, VitalSigns
+from healthcli.fhir_models import UCUM_SYSTEM, VITAL_SIGN_RANGES, Observation, Patient, VitalSigns
+from healthcli.logging_utils import event
 
 
 def dataset_overview(df: pd.DataFrame, logger: logging.Logger) -> Dict[str, Any]:
@@ -30,8 +31,20 @@ def missing_summary(df: pd.DataFrame, logger: logging.Logger, config: Dict[str,
     Summarise missing values per column and log data quality warnings
     based on configured thresholds.
     """
-    missing_count = df.isna().sum()
-    missing_ratio = missing_count / len(df)
+    return missing_summary_from_counts(df.isna().sum(), len(df), logger, config)
+
+
+def missing_summary_from_counts(
+    missing_count: pd.Series,
+    rows: int,
+    logger: logging.Logger,
+    config: Dict[str, Any],
+) -> pd.DataFrame:
+    """
+    Same as missing_summary, from per-column missing counts and a row count
+    (e.g. aggregates merged across incremental runs).
+    """
+    missing_ratio = missing_count / rows
 
     summary = (
         missing_count
@@ -65,7 +78,8 @@ def missing_summary(df: pd.DataFrame, logger: logging.Logger, config: Dict[str,
     return summary
 
 
-def _normalize_gender(value: Any) -> str:
+def normalize_gender_value(value: Any) -> str:
+    """FHIR Patient gender of a raw value: male, female, other or unknown."""
     if pd.isna(value):
         return "unknown"
 
@@ -76,12 +90,59 @@ def _normalize_gender(value: Any) -> str:
     return "unknown"
 
 
-def fhir_validation_summary(df: pd.DataFrame, logger: logging.Logger) -> Dict[str, Any]:
+# Lab and vital sign columns validated as Observations, in validation order
+LAB_COLUMNS = ["max_glu_serum", "A1Cresult"]
+# UCUM code of each lab column's unit
+LAB_UCUM = {"max_glu_serum": "mg/dL", "A1Cresult": "%"}
+VITAL_SIGN_UNITS = {column: bounds.unit for column, bounds in VITAL_SIGN_RANGES.items()}
+
+
+def fhir_error_order(detail: Dict[str, Any]) -> tuple:
+    """
+    Sort key reproducing the order in which fhir_validation_summary
+    reports errors: patients, then lab columns, then vital sign columns,
+    each by row.
+    """
+    if detail["resource"] == "Patient":
+        return (0, 0, detail["row"])
+    if detail["resource"] == "Observation":
+        return (1, LAB_COLUMNS.index(detail["column"]), detail["row"])
+    return (2, list(VITAL_SIGN_UNITS).index(detail["column"]), detail["row"])
+
+
+def _validation_error_class(exc: ValidationError) -> str:
+    """Pydantic error type of the first failure (e.g. literal_error, value_error)."""
+    errors = exc.errors()
+    return errors[0]["type"] if errors else "validation_error"
+
+
+def _record_error(
+    summary: Dict[str, Any],
+    message: str,
+    resource: str,
+    row: Any,
+    column: Any,
+    error_class: str,
+) -> None:
+    """Keep both the readable message and a structured record of a failure."""
+    summary["errors"].append(message)
+    summary["error_details"].append(
+        {"resource": resource, "row": row, "column": column, "error_class": error_class}
+    )
+
+
+def fhir_validation_summary(
+    df: pd.DataFrame,
+    logger: logging.Logger,
+    sink: Optional[Callable[[BaseModel], None]] = None,
+) -> Dict[str, Any]:
     """
     Validate dataset rows against FHIR-inspired Pydantic models.
 
     This step is designed to demonstrate how clinical tabular data can be
     mapped to patient and observation resources and validated deterministically.
+    Each valid resource is passed to sink, if given (e.g. an
+    fhir_export.NdjsonExporter).
     """
     summary = {
         "patients_validated": 0,
@@ -89,31 +150,41 @@ def fhir_validation_summary(df: pd.DataFrame, logger: logging.Logger) -> Dict[st
         "observations_validated": 0,
         "observation_errors": 0,
         "errors": [],
+        "error_details": [],  # Structured counterpart of "errors"
     }
+    # Reading times of the rows, exported as the Observations'
+    # effectiveDateTime; only parsed when exporting, so a malformed
+    # timestamp does not fail the validation of its row's readings
+    timestamps = sink is not None and "timestamp" in df.columns
 
     # Patient-style validation
     if {"patient_nbr", "gender"}.issubset(df.columns):
         for idx, row in df.iterrows():
             payload = {
                 "id": str(row["patient_nbr"]),
-                "gender": _normalize_gender(row.get("gender", "unknown")),
+                "gender": normalize_gender_value(row.get("gender", "unknown")),
             }
             if "birthDate" in df.columns and pd.notna(row.get("birthDate")):
                 payload["birthDate"] = row["birthDate"]
 
             try:
-                Patient(**payload)
+                patient = Patient(**payload)
                 summary["patients_validated"] += 1
             except ValidationError as exc:
                 summary["patient_errors"] += 1
-                summary["errors"].append(f"Patient row {idx}: {exc}")
+                _record_error(
+                    summary, f"Patient row {idx}: {exc}",
+                    "Patient", idx, None, _validation_error_class(exc),
+                )
+                continue
+            if sink is not None:
+                sink(patient)
     else:
         logger.debug("FHIR patient validation skipped: required columns missing")
 
     # Observation-style validation for key clinical measurement columns
-    lab_columns = ["max_glu_serum", "A1Cresult"]
-    if "patient_nbr" in df.columns and any(col in df.columns for col in lab_columns):
-        for col in lab_columns:
+    if "patient_nbr" in df.columns and any(col in df.columns for col in LAB_COLUMNS):
+        for col in LAB_COLUMNS:
             if col not in df.columns:
                 continue
 
@@ -125,34 +196,41 @@ def fhir_validation_summary(df: pd.DataFrame, logger: logging.Logger) -> Dict[st
                     value = float(row[col])
                 except (TypeError, ValueError):
                     summary["observation_errors"] += 1
-                    summary["errors"].append(f"Observation row {idx} column {col}: non-numeric value")
+                    _record_error(
+                        summary, f"Observation row {idx} column {col}: non-numeric value",
+                        "Observation", idx, col, "non_numeric",
+                    )
                     continue
 
                 payload = {
-                    "id": f"obs-{idx}-{col}",
+                    "id": f"obs-{idx}-{col.replace('_', '-')}",
                     "code": col,
                     "subject": str(row["patient_nbr"]),
-                    "value": {"value": value, "unit": "mg/dL", "code": col},
+                    "value": {
+                        "value": value, "unit": LAB_UCUM[col], "system": UCUM_SYSTEM, "code": LAB_UCUM[col],
+                    },
                 }
+                if timestamps and pd.notna(row["timestamp"]):
+                    payload["effectiveDateTime"] = row["timestamp"]
 
                 try:
-                    Observation(**payload)
+                    observation = Observation(**payload)
                     summary["observations_validated"] += 1
                 except ValidationError as exc:
                     summary["observation_errors"] += 1
-                    summary["errors"].append(f"Observation row {idx} column {col}: {exc}")
+                    _record_error(
+                        summary, f"Observation row {idx} column {col}: {exc}",
+                        "Observation", idx, col, _validation_error_class(exc),
+                    )
+                    continue
+                if sink is not None:
+                    sink(observation)
     else:
         logger.debug("FHIR observation validation skipped: required columns missing")
 
     # Additional vital sign validation if the dataset contains those columns.
-    vital_sign_cols = {
-        "systolic_bp": "mmHg",
-        "heart_rate": "bpm",
-        "temperature": "C",
-        "spo2": "%",
-    }
     if "patient_nbr" in df.columns:
-        for col, unit in vital_sign_cols.items():
+        for col, unit in VITAL_SIGN_UNITS.items():
             if col not in df.columns:
                 continue
 
@@ -164,27 +242,41 @@ def fhir_validation_summary(df: pd.DataFrame, logger: logging.Logger) -> Dict[st
                     value = float(row[col])
                 except (TypeError, ValueError):
                     summary["observation_errors"] += 1
-                    summary["errors"].append(f"Vital sign row {idx} column {col}: non-numeric value")
+                    _record_error(
+                        summary, f"Vital sign row {idx} column {col}: non-numeric value",
+                        "VitalSigns", idx, col, "non_numeric",
+                    )
                     continue
 
                 payload = {
-                    "id": f"vital-{idx}-{col}",
+                    "id": f"vital-{idx}-{col.replace('_', '-')}",
                     "code": col,
                     "subject": str(row["patient_nbr"]),
-                    "value": {"value": value, "unit": unit, "code": col},
+                    "value": {
+                        "value": value, "unit": unit, "system": UCUM_SYSTEM, "code": VITAL_SIGN_RANGES[col].ucum,
+                    },
                 }
+                if timestamps and pd.notna(row["timestamp"]):
+                    payload["effectiveDateTime"] = row["timestamp"]
 
                 try:
-                    VitalSigns(**payload)
+                    vital = VitalSigns(**payload)
                     summary["observations_validated"] += 1
                 except ValidationError as exc:
                     summary["observation_errors"] += 1
-                    summary["errors"].append(f"Vital sign row {idx} column {col}: {exc}")
+                    _record_error(
+                        summary, f"Vital sign row {idx} column {col}: {exc}",
+                        "VitalSigns", idx, col, _validation_error_class(exc),
+                    )
+                    continue
+                if sink is not None:
+                    sink(vital)
 
     logger.info(
         "FHIR-inspired validation completed: %d patients, %d observations",
         summary["patients_validated"],
         summary["observations_validated"],
+        extra=event("fhir_summary", **{key: value for key, value in summary.items() if isinstance(value, int)}),
     )
     return summary
 
@@ -255,7 +347,7 @@ def categorical_summary(df: pd.DataFrame, logger: logging.Logger, config: Dict[s
         summaries[col] = value_counts.head(top_n)
 
         logger.debug("Categorical column '%s': %d unique values", col, value_counts.shape[0],)
-        
+
     logger.info("Categorical summary completed (%d columns analysed)", len(cat_cols),)
 
     return summaries
\ No newline at end of file
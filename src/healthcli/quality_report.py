@@ -5,24 +5,38 @@ Generates professional clinical data quality reports with:
 - Missing data analysis with visualizations
 - Clinical validation rule violations summary
 - Data completeness metrics
+
+matplotlib and WeasyPrint are imported on first use rather than at module
+import, since each adds noticeable startup time.
 """
 
-import base64
-import io
 import logging
 from datetime import datetime
-from typing import Dict, Optional
+from pathlib import Path
+from typing import Any, Dict, List, Optional
 
-import matplotlib.pyplot as plt
 import pandas as pd
 from jinja2 import Template
 
-try:
-    from weasyprint import HTML
-    WEASYPRINT_IMPORT_ERROR = None
-except Exception as exc:
-    HTML = None
-    WEASYPRINT_IMPORT_ERROR = exc
+from healthcli.metrics import MetricsRecorder
+
+# Populated by _load_weasyprint() on the first PDF request
+HTML = None
+WEASYPRINT_IMPORT_ERROR = None
+_WEASYPRINT_LOADED = False
+
+
+def _load_weasyprint():
+    """Import WeasyPrint once, remembering the failure if it is unavailable."""
+    global HTML, WEASYPRINT_IMPORT_ERROR, _WEASYPRINT_LOADED
+    if not _WEASYPRINT_LOADED:
+        try:
+            from weasyprint import HTML
+        except Exception as exc:
+            HTML = None
+            WEASYPRINT_IMPORT_ERROR = exc
+        _WEASYPRINT_LOADED = True
+    return HTML
 
 
 class QualityReportGenerator:
@@ -148,6 +162,14 @@ class QualityReportGenerator:
     <div class="container">
         <h1>Clinical Data Quality Report</h1>
         
+        {% if sample %}
+        <div class="warning">
+            <strong>⚠ Sample-based report:</strong> {{ sample.description }}.
+            Missing data counts cover every row; clinical validation and FHIR results were computed on the
+            sampled rows only. File-wide rates are estimated below with {{ "%.0f" | format(sample.confidence * 100) }}% confidence intervals.
+        </div>
+        {% endif %}
+
         <div class="metadata">
             <div class="metric">
                 <div class="metric-label">Report Date:</div>
@@ -208,7 +230,33 @@ class QualityReportGenerator:
         </div>
         {% endif %}
         
-        <h2>Clinical Validation Results</h2>
+        {% if sample %}
+        <h2>Sample Estimates</h2>
+        <table>
+            <thead>
+                <tr>
+                    <th>Metric</th>
+                    <th>Sample Rows Affected</th>
+                    <th>Estimated Rate</th>
+                    <th>{{ "%.0f" | format(sample.confidence * 100) }}% CI</th>
+                    <th>Estimated Rows Affected</th>
+                </tr>
+            </thead>
+            <tbody>
+            {% for e in sample.estimates %}
+                <tr>
+                    <td>{{ e.metric }}</td>
+                    <td>{{ e.sample_count }} / {{ e.sample_rows }}</td>
+                    <td>{{ "%.2f" | format(e.rate * 100) }}%</td>
+                    <td>{{ "%.2f" | format(e.ci_low * 100) }}% – {{ "%.2f" | format(e.ci_high * 100) }}%</td>
+                    <td>{{ e.estimated_count }} ({{ e.estimated_low }} – {{ e.estimated_high }})</td>
+                </tr>
+            {% endfor %}
+            </tbody>
+        </table>
+        {% endif %}
+
+        <h2>Clinical Validation Results{% if sample %} (Sample){% endif %}</h2>
         {% if clinical_violations %}
             {% for rule_name, rule_details in clinical_violations.items() %}
             <div>
@@ -217,7 +265,14 @@ class QualityReportGenerator:
                     <div class="warning">
                         <strong>⚠ {{ rule_details['count'] }} violation(s) detected</strong>
                         <p>Severity: <strong>{{ rule_details['severity'] }}</strong></p>
-                        <p>Affected rows: {{ rule_details['violations'] | join(', ') }}</p>
+                        <p>Affected rows{% if rule_details['count'] > rule_details['violations'] | length %} (first {{ rule_details['violations'] | length }}){% endif %}: {{ rule_details['violations'] | join(', ') }}</p>
+                        {% if rule_details['files'] %}
+                        <p>Full list:
+                        {% for file in rule_details['files'] %}
+                            <a href="{{ file }}">page {{ loop.index }}</a>{% if not loop.last %}, {% endif %}
+                        {% endfor %}
+                        </p>
+                        {% endif %}
                     </div>
                 {% else %}
                     <div class="no-violations">✓ No violations detected</div>
@@ -267,6 +322,35 @@ class QualityReportGenerator:
         {% else %}
             <div class="no-violations">FHIR model validation was not executed.</div>
         {% endif %}
+
+        {% if metrics %}
+        <h2>Performance Metrics</h2>
+        <table>
+            <thead>
+                <tr>
+                    <th>Stage</th>
+                    <th>Wall (s)</th>
+                    <th>CPU (s)</th>
+                    <th>Rows/s</th>
+                    <th>Peak RSS Growth (MB)</th>
+                    <th>Peak RSS / Budget (MB)</th>
+                </tr>
+            </thead>
+            <tbody>
+            {% for m in metrics %}
+                <tr>
+                    <td>{{ m.stage }}</td>
+                    <td>{{ "%.3f" | format(m.wall_seconds) }}</td>
+                    <td>{{ "%.3f" | format(m.cpu_seconds) }}</td>
+                    <td>{{ "%.0f" | format(m.rows_per_second) if m.rows_per_second is not none else "-" }}</td>
+                    <td>{{ "%.1f" | format(m.peak_rss_delta_bytes / 1048576) if m.peak_rss_delta_bytes is not none else "-" }}</td>
+                    <td>{{ "%.0f" | format(m.peak_rss_bytes / 1048576) if m.peak_rss_bytes is not none else "-" }}{{ " / %.0f" | format(m.budget_bytes / 1048576) if m.budget_bytes is not none else "" }}</td>
+                </tr>
+            {% endfor %}
+            </tbody>
+        </table>
+        <p>Full per-stage and per-rule measurements are written to metrics.json.</p>
+        {% endif %}
         
         <div class="footer">
             <p>This report was automatically generated by Clinical Data Quality Analysis Tool.</p>
@@ -280,60 +364,103 @@ class QualityReportGenerator:
     def __init__(self, logger: Optional[logging.Logger] = None):
         self.logger = logger or logging.getLogger("healthcli.quality_report")
     
-    def _generate_missing_chart_base64(self, df: pd.DataFrame) -> str:
+    def _generate_missing_chart_base64(self, missing_counts: Dict[str, int]) -> str:
         """
         Generate missing data bar chart and encode as base64 PNG.
         
         Shows top 10 columns by missing count, embedded in HTML as data URI.
         """
-        # Calculate missing data by column
-        missing_counts = df.isnull().sum().sort_values(ascending=False)
-        top_10 = missing_counts.head(10)
+        from healthcli.render_worker import render_missing_chart
         
-        if len(top_10) == 0 or top_10.sum() == 0:
-            return ""
-        
-        # Create bar chart
-        fig, ax = plt.subplots(figsize=(10, 5))
-        top_10.plot(kind="bar", ax=ax, color="#3498db")
-        ax.set_title("Missing Data by Column (Top 10)", fontsize=14, fontweight="bold")
-        ax.set_xlabel("Column", fontsize=12)
-        ax.set_ylabel("Missing Count", fontsize=12)
-        ax.grid(axis="y", alpha=0.3)
-        plt.xticks(rotation=45, ha="right")
-        plt.tight_layout()
-        
-        # Encode to base64
-        buffer = io.BytesIO()
-        plt.savefig(buffer, format="png", dpi=100)
-        buffer.seek(0)
-        image_base64 = base64.b64encode(buffer.read()).decode()
-        plt.close(fig)
-        
-        return image_base64
+        return render_missing_chart(missing_counts)
     
+    def export_violations(
+        self,
+        clinical_violations: Dict,
+        output_dir: str,
+        page_size: int = 100_000,
+    ) -> Dict[str, List[str]]:
+        """
+        Write the full violation list of every rule as paginated CSV files.
+
+        The HTML report only shows the first 20 violations per rule; these
+        side files keep the complete detail available for audit without
+        building it into the report itself.
+
+        Files are written to <output_dir>/violations/<rule>_<page>.csv.
+        Returns rule_name -> file paths relative to output_dir, for linking
+        from the report.
+        """
+        out_dir = Path(output_dir)
+        pages_dir = out_dir / "violations"
+        pages_dir.mkdir(parents=True, exist_ok=True)
+
+        files: Dict[str, List[str]] = {}
+        for rule_name, result in clinical_violations.items():
+            # Drop pages left over from an earlier run of the same rule
+            for stale in pages_dir.glob(f"{rule_name}_*.csv"):
+                stale.unlink()
+
+            violations = result.violations
+            files[rule_name] = []
+            for page, start in enumerate(range(0, len(violations), page_size), start=1):
+                path = pages_dir / f"{rule_name}_{page:04d}.csv"
+                with open(path, "w", encoding="utf-8") as f:
+                    f.write("violation\n")
+                    f.write("\n".join(map(str, violations[start:start + page_size])))
+                    f.write("\n")
+                files[rule_name].append(path.relative_to(out_dir).as_posix())
+
+        self.logger.info("Full violation lists written to %s", pages_dir)
+        return files
+
     def generate_html_report(
         self,
-        df: pd.DataFrame,
+        df: Optional[pd.DataFrame],
         missing_summary: Optional[Dict] = None,
         clinical_violations: Optional[Dict] = None,
         fhir_summary: Optional[Dict] = None,
         output_path: str = "quality_report.html",
+        recorder: Optional[MetricsRecorder] = None,
+        chart_base64: Optional[str] = None,
+        violation_files: Optional[Dict[str, List[str]]] = None,
+        total_records: Optional[int] = None,
+        missing_counts: Optional[Dict[str, int]] = None,
+        sample: Optional[Dict[str, Any]] = None,
     ) -> None:
         """
         Generate HTML quality report.
         
         Args:
-            df: Input DataFrame
+            df: Input DataFrame, or None when total_records and
+                missing_counts are given instead (incremental runs)
             missing_summary: Dict with column -> {count, pct} missing data
             clinical_violations: Dict with rule_name -> {count, severity, violations}
             output_path: Output HTML file path
+            recorder: Optional MetricsRecorder; chart rendering is timed and
+                the stages recorded so far are summarised in the report
+            chart_base64: Pre-rendered missing data chart (e.g. from the
+                render worker); rendered here when not given
+            violation_files: rule_name -> paginated full violation files
+                (see export_violations), linked from the report
+            total_records: Row count, used when df is None
+            missing_counts: column -> missing count, used when df is None
+            sample: For sample-based runs, the sample description, confidence
+                level and estimates; the report is labelled as sample-based
+        
+        The template is streamed to output_path chunk by chunk rather than
+        rendered into one in-memory string.
         """
+        if recorder is None:
+            recorder = MetricsRecorder(enabled=False)
+
         # Prepare metadata
-        total_records = len(df)
-        total_columns = len(df.columns)
+        if df is not None:
+            total_records = len(df)
+            missing_counts = df.isnull().sum().to_dict()
+        total_columns = len(missing_counts)
         total_cells = total_records * total_columns
-        missing_cells = df.isnull().sum().sum()
+        missing_cells = sum(missing_counts.values())
         completeness_pct = round((1 - missing_cells / total_cells) * 100, 2)
         
         # Prepare missing summary table data
@@ -352,13 +479,16 @@ class QualityReportGenerator:
                     "count": result.count,
                     "severity": result.severity,
                     "violations": result.violations[:20],  # Limit to first 20
+                    "files": (violation_files or {}).get(rule_name, []),
                 }
         
         # Generate chart
-        chart_base64 = self._generate_missing_chart_base64(df)
+        if chart_base64 is None:
+            with recorder.stage("render_chart"):
+                chart_base64 = self._generate_missing_chart_base64(missing_counts)
 
-        # Render template
-        html_content = self.TEMPLATE.render(
+        # Stream the rendered template straight to the file
+        chunks = self.TEMPLATE.generate(
             report_date=datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
             total_records=total_records,
             total_columns=total_columns,
@@ -367,13 +497,15 @@ class QualityReportGenerator:
             clinical_violations=violations_summary,
             fhir_summary=fhir_summary,
             chart_base64=chart_base64,
+            metrics=recorder.summary_rows(),
+            sample=sample,
         )
 
-        # Write to file
         with open(output_path, "w", encoding="utf-8") as f:
-            f.write(html_content)
+            for chunk in chunks:
+                f.write(chunk)
 
-        self.logger.info(f"HTML report generated: {output_path}")
+        self.logger.info("HTML report generated: %s", output_path)
 
     def generate_pdf_report(self, html_path: str, pdf_path: str) -> None:
         """
@@ -386,6 +518,7 @@ class QualityReportGenerator:
         Raises:
             RuntimeError: If WeasyPrint is not installed
         """
+        HTML = _load_weasyprint()
         if HTML is None:
             if WEASYPRINT_IMPORT_ERROR is not None:
                 self.logger.error(
@@ -404,7 +537,7 @@ class QualityReportGenerator:
 
         try:
             HTML(html_path).write_pdf(pdf_path)
-            self.logger.info(f"PDF report generated: {pdf_path}")
+            self.logger.info("PDF report generated: %s", pdf_path)
         except Exception as e:
-            self.logger.error(f"Failed to generate PDF: {e}")
+            self.logger.error("Failed to generate PDF: %s", e)
             raise
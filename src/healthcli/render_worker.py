@@ -0,0 +1,210 @@
+"""
+Out-of-process chart and PDF rendering.
+
+matplotlib chart rendering and WeasyPrint PDF conversion are slow and do
+not need the dataset itself, so the pipeline hands them to a separate
+worker process:
+- the missing-data chart is rendered while clinical rules and FHIR
+  validation run in the main process
+- the PDF is rendered while the transform stage runs, or in a detached
+  process when the pipeline should return before the PDF is finished
+
+Each PDF render writes a completion marker (<pdf>.done, JSON) so callers
+and schedulers can tell when an asynchronous PDF is ready.
+
+The module can also be run directly to render a PDF:
+    python -m healthcli.render_worker pdf report.html report.pdf report.pdf.done
+"""
+
+import base64
+import io
+import json
+import logging
+import subprocess
+import sys
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+
+def marker_path_for(pdf_path: str) -> Path:
+    """Completion marker written next to a PDF report."""
+    return Path(f"{pdf_path}.done")
+
+
+def read_marker(pdf_path: str) -> Optional[Dict[str, str]]:
+    """Contents of a PDF completion marker, or None if there is none yet."""
+    try:
+        with open(marker_path_for(pdf_path), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def render_missing_chart(missing_counts: Dict[str, int]) -> str:
+    """
+    Render the missing data bar chart and encode it as base64 PNG.
+
+    Shows top 10 columns by missing count, embedded in HTML as data URI.
+    """
+    import pandas as pd
+
+    top_10 = pd.Series(missing_counts, dtype="int64").sort_values(ascending=False).head(10)
+
+    if len(top_10) == 0 or top_10.sum() == 0:
+        return ""
+
+    import matplotlib.pyplot as plt
+
+    # Create bar chart
+    fig, ax = plt.subplots(figsize=(10, 5))
+    top_10.plot(kind="bar", ax=ax, color="#3498db")
+    ax.set_title("Missing Data by Column (Top 10)", fontsize=14, fontweight="bold")
+    ax.set_xlabel("Column", fontsize=12)
+    ax.set_ylabel("Missing Count", fontsize=12)
+    ax.grid(axis="y", alpha=0.3)
+    plt.xticks(rotation=45, ha="right")
+    plt.tight_layout()
+
+    # Encode to base64
+    buffer = io.BytesIO()
+    plt.savefig(buffer, format="png", dpi=100)
+    buffer.seek(0)
+    image_base64 = base64.b64encode(buffer.read()).decode()
+    plt.close(fig)
+
+    return image_base64
+
+
+def render_pdf(html_path: str, pdf_path: str, marker_path: Optional[str] = None) -> Dict[str, str]:
+    """
+    Convert an HTML report to PDF and write the completion marker.
+
+    Returns the marker contents: status is "ok", "skipped" (WeasyPrint
+    unavailable) or "failed".
+    """
+    from healthcli.quality_report import QualityReportGenerator
+
+    marker = {"html": str(html_path), "pdf": str(pdf_path)}
+    try:
+        QualityReportGenerator().generate_pdf_report(str(html_path), str(pdf_path))
+        marker["status"] = "ok"
+    except RuntimeError as exc:
+        marker["status"] = "skipped"
+        marker["error"] = str(exc)
+    except Exception as exc:
+        marker["status"] = "failed"
+        marker["error"] = str(exc)
+
+    marker["finished_at"] = datetime.now().isoformat(timespec="seconds")
+    with open(marker_path or marker_path_for(pdf_path), "w", encoding="utf-8") as f:
+        json.dump(marker, f, indent=2)
+
+    return marker
+
+
+class ReportRenderer:
+    """
+    Schedules chart and PDF rendering on a single worker process.
+
+    If a worker process cannot be started, rendering falls back to the
+    calling process so reports are still produced.
+    """
+
+    def __init__(self, use_process: bool = True, logger: Optional[logging.Logger] = None):
+        self.logger = logger or logging.getLogger("healthcli.render_worker")
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._chart: Optional[Future] = None
+        self._chart_inputs: Optional[Dict[str, int]] = None
+        self._pdf: Optional[Future] = None
+        self._pdf_inputs: Optional[Tuple[str, str, str]] = None
+
+        if use_process:
+            try:
+                self._executor = ProcessPoolExecutor(max_workers=1)
+            except (OSError, ValueError) as exc:
+                self.logger.warning("Render worker unavailable, rendering in-process: %s", exc)
+
+    def submit_chart(self, missing_counts: Dict[str, int]) -> None:
+        """Start rendering the missing data chart as soon as counts are known."""
+        self._chart_inputs = missing_counts
+        if self._executor is not None:
+            try:
+                self._chart = self._executor.submit(render_missing_chart, missing_counts)
+            except (BrokenProcessPool, RuntimeError) as exc:
+                self.logger.warning("Chart render worker failed, rendering in-process: %s", exc)
+
+    def chart(self) -> Optional[str]:
+        """Base64 chart, waiting for the worker if needed; None if never submitted."""
+        if self._chart_inputs is None:
+            return None
+        if self._chart is not None:
+            try:
+                return self._chart.result()
+            except BrokenProcessPool as exc:
+                self.logger.warning("Chart render worker failed, rendering in-process: %s", exc)
+        return render_missing_chart(self._chart_inputs)
+
+    def submit_pdf(self, html_path: str, pdf_path: str, detach: bool = False) -> None:
+        """
+        Start rendering the PDF.
+
+        With detach=True the PDF is rendered by an independent process that
+        outlives the pipeline; completion is signalled by the marker file.
+        """
+        marker = marker_path_for(pdf_path)
+        if marker.exists():
+            marker.unlink()
+
+        if detach:
+            subprocess.Popen(
+                [sys.executable, "-m", "healthcli.render_worker", "pdf", str(html_path), str(pdf_path), str(marker)],
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                start_new_session=True,
+            )
+            self.logger.info("PDF rendering continues in the background; completion marker: %s", marker)
+            return
+
+        self._pdf_inputs = (str(html_path), str(pdf_path), str(marker))
+        if self._executor is not None:
+            try:
+                self._pdf = self._executor.submit(render_pdf, *self._pdf_inputs)
+                return
+            except (BrokenProcessPool, RuntimeError) as exc:
+                self.logger.warning("PDF render worker failed, rendering in-process: %s", exc)
+
+        self._pdf = Future()
+        self._pdf.set_result(render_pdf(*self._pdf_inputs))
+
+    def wait_pdf(self) -> Optional[Dict[str, str]]:
+        """Wait for a non-detached PDF render; returns its completion marker."""
+        if self._pdf is None:
+            return None
+        try:
+            return self._pdf.result()
+        except BrokenProcessPool as exc:
+            self.logger.warning("PDF render worker failed, rendering in-process: %s", exc)
+        return render_pdf(*self._pdf_inputs)
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+
+def main(argv=None) -> int:
+    args = sys.argv[1:] if argv is None else argv
+    if len(args) not in (3, 4) or args[0] != "pdf":
+        print("usage: python -m healthcli.render_worker pdf HTML PDF [MARKER]", file=sys.stderr)
+        return 2
+
+    marker = render_pdf(*args[1:])
+    return 0 if marker["status"] == "ok" else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
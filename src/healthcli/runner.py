@@ -1,4 +1,5 @@
-from typing import List
+from dataclasses import replace
+from typing import List, Optional
 
 import pandas as pd
 
@@ -8,16 +9,71 @@ from healthcli.clinical_rules import ClinicalRule, RuleResult
 class RuleRunner:
     """
     Executes a list of ClinicalRule objects against a DataFrame.
+
+    By default every rule runs over the full dataset in the given order.
+
+    With fail_fast=True the runner acts as an ingestion gate:
+    - rules run in ascending priority order (cheap rules first)
+    - execution stops at the first ERROR-severity result
+    - if sample_size is set, each rule is first run on the leading
+      sample_size rows, and an ERROR found there rejects the batch
+      without scanning the full dataset
+
+    The sample pre-check assumes that an ERROR found on a subset of rows
+    also holds for the full dataset (true for conflict-style rules such as
+    PatientSexConsistencyRule).
     """
 
-    def __init__(self, rules: List[ClinicalRule]):
+    def __init__(
+        self,
+        rules: List[ClinicalRule],
+        fail_fast: bool = False,
+        sample_size: Optional[int] = None,
+    ):
         self.rules = rules
+        self.fail_fast = fail_fast
+        self.sample_size = sample_size
 
     def run(self, df: pd.DataFrame) -> List[RuleResult]:
-        results: List[RuleResult] = []
+        if not self.fail_fast:
+            results: List[RuleResult] = []
+
+            for rule in self.rules:
+                rule_results = rule.apply(df)
+                results.extend(rule_results)
+
+            return results
 
-        for rule in self.rules:
+        return self._run_gated(df)
+
+    def _ordered_rules(self) -> List[ClinicalRule]:
+        # sorted() is stable, so rules with equal priority keep their given order
+        return sorted(self.rules, key=lambda rule: getattr(rule, "priority", 100))
+
+    def _run_gated(self, df: pd.DataFrame) -> List[RuleResult]:
+        rules = self._ordered_rules()
+
+        if self.sample_size and len(df) > self.sample_size:
+            # A contiguous leading block is a view, so the pre-check costs
+            # no copy and keeps adjacent records of the same patient together.
+            sample = df.iloc[: self.sample_size]
+            for rule in rules:
+                errors = [r for r in rule.apply(sample) if r.severity == "ERROR"]
+                if errors:
+                    return [
+                        replace(
+                            r,
+                            message=f"{r.message} (detected in pre-check sample of {len(sample)} rows)",
+                        )
+                        for r in errors
+                    ]
+
+        results: List[RuleResult] = []
+        for rule in rules:
             rule_results = rule.apply(df)
             results.extend(rule_results)
 
-        return results
\ No newline at end of file
+            if any(r.severity == "ERROR" for r in rule_results):
+                break
+
+        return results
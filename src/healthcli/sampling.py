@@ -0,0 +1,235 @@
+"""
+Sample-based quick-look runs.
+
+With --sample N, clinical rules and FHIR validation run on a sample of
+the input instead of every row:
+- the CSV is parsed in chunks and only the sample and per-column null
+  counts are kept, so memory does not grow with the file
+- without --sample-by, a uniform reservoir of N rows is kept: every row
+  gets a random key and the N smallest keys survive each chunk
+- with --sample-by COL, whole COL groups (e.g. patients or sites) are
+  kept, chosen by a seeded hash of their value, until about N rows are
+  sampled, so per-patient rules see complete patient histories (a
+  uniform sample splits them up and underestimates rules such as
+  VitalSignAnomalyRule that compare consecutive readings); this is
+  cluster sampling, not stratification: the groups not chosen are left
+  out entirely, so sampling by site covers only some sites
+- missing counts are exact, because they are counted on every chunk;
+  clinical rule and FHIR error rates are estimated from the sample with
+  Wilson confidence intervals
+
+For group samples the intervals use an effective sample size: the row
+count divided by the design effect of the clustering.
+"""
+
+import io
+from dataclasses import dataclass
+from statistics import NormalDist
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_CHUNK_ROWS = 100_000
+DEFAULT_CONFIDENCE = 0.95
+
+# Rules whose violations are columns, computed from the exact missing counts
+COLUMN_RULES = {"MissingDataThresholdRule"}
+
+# Working column holding each row's sample key
+_KEY = "__sample_key__"
+
+
+@dataclass
+class Sample:
+    """Sampled rows, indexed by their row number in the file, with exact file-wide counts."""
+    frame: pd.DataFrame
+    total_rows: int
+    missing_counts: Dict[str, int]
+    size: int
+    by: Optional[str] = None
+    seed: int = 0
+
+    @property
+    def fraction(self) -> float:
+        return len(self.frame) / self.total_rows if self.total_rows else 1.0
+
+    def describe(self) -> str:
+        method = f"cluster sample of whole {self.by} groups" if self.by else "uniform reservoir"
+        return (
+            f"{len(self.frame):,} of {self.total_rows:,} rows ({self.fraction:.1%}), "
+            f"{method}, seed {self.seed}"
+        )
+
+
+def _group_keys(values: pd.Series, seed: int) -> np.ndarray:
+    hash_key = str(seed).rjust(16, "0")[-16:]
+    return pd.util.hash_pandas_object(values, index=False, hash_key=hash_key).to_numpy()
+
+
+def _trim_groups(kept: pd.DataFrame, size: int) -> pd.DataFrame:
+    """Keep the groups with the smallest keys that together reach size rows."""
+    cumulative = kept.groupby(_KEY).size().sort_index().cumsum()
+    reached = np.flatnonzero(cumulative.to_numpy() >= size)
+    if not len(reached):
+        return kept
+    threshold = cumulative.index[reached[0]]
+    return kept[kept[_KEY] <= threshold]
+
+
+def sample_csv(
+    data_path: str,
+    size: int,
+    by: Optional[str] = None,
+    seed: int = 0,
+    chunk_rows: int = DEFAULT_CHUNK_ROWS,
+) -> Sample:
+    """
+    Draw a sample of about size rows from a CSV file in one chunked pass.
+
+    Chunks are parsed as strings so samples from different chunks
+    concatenate cleanly; the final sample is re-parsed, giving it the
+    column types a full read of those rows would have.
+    """
+    if size < 1:
+        raise ValueError(f"Sample size must be positive, got {size}")
+
+    rng = np.random.default_rng(seed)
+    kept: Optional[pd.DataFrame] = None
+    missing: Optional[pd.Series] = None
+    total = 0
+
+    for chunk in pd.read_csv(data_path, chunksize=chunk_rows, dtype=str):
+        total += len(chunk)
+        counts = chunk.isna().sum()
+        missing = counts if missing is None else missing.add(counts, fill_value=0)
+
+        if by is None:
+            keys = rng.random(len(chunk))
+        else:
+            if by not in chunk.columns:
+                raise ValueError(f"Sample column not found: {by}")
+            keys = _group_keys(chunk[by], seed)
+
+        # Rows above the current threshold can never enter the sample
+        if kept is not None and len(kept) >= size:
+            threshold = kept[_KEY].max()
+            mask = keys <= threshold
+            chunk, keys = chunk[mask], keys[mask]
+        chunk = chunk.assign(**{_KEY: keys})
+        kept = chunk if kept is None else pd.concat([kept, chunk])
+
+        if len(kept) > size:
+            kept = kept.nsmallest(size, _KEY) if by is None else _trim_groups(kept, size)
+
+    if kept is None or total == 0:
+        raise ValueError(f"Dataset is empty: {data_path}")
+
+    kept = kept.sort_index().drop(columns=_KEY)
+    frame = pd.read_csv(io.StringIO(kept.to_csv(index=False)))
+    frame.index = kept.index
+    return Sample(
+        frame=frame,
+        total_rows=total,
+        missing_counts={col: int(n) for col, n in missing.items()},
+        size=size,
+        by=by,
+        seed=seed,
+    )
+
+
+def wilson_interval(successes: float, n: float, confidence: float = DEFAULT_CONFIDENCE) -> Tuple[float, float]:
+    """Wilson score interval for a proportion observed as successes out of n."""
+    if n <= 0:
+        return 0.0, 1.0
+    p = successes / n
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)
+    denominator = 1 + z * z / n
+    center = (p + z * z / (2 * n)) / denominator
+    half = z * np.sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / denominator
+    low = 0.0 if successes <= 0 else max(center - half, 0.0)
+    high = 1.0 if successes >= n else min(center + half, 1.0)
+    return low, high
+
+
+def _effective_size(flagged: np.ndarray, groups: Optional[np.ndarray]) -> float:
+    """Rows divided by the design effect of sampling whole groups."""
+    n = len(flagged)
+    p = flagged.mean()
+    if groups is None or p in (0.0, 1.0):
+        return float(n)
+    y = np.bincount(groups, weights=flagged)
+    m = np.bincount(groups)
+    k = len(m)
+    if k < 2:
+        return 1.0
+    # Variance of the ratio estimator over sampled groups
+    variance = k / (k - 1) * np.sum((y - p * m) ** 2) / (n * n)
+    if variance <= 0:
+        return float(n)
+    return float(min(p * (1 - p) / variance, n))
+
+
+def _flagged_rows(frame: pd.DataFrame, rows) -> np.ndarray:
+    flagged = np.zeros(len(frame), dtype=bool)
+    positions = frame.index.get_indexer(pd.Index(list(rows)).unique())
+    flagged[positions[positions >= 0]] = True
+    return flagged
+
+
+def estimate_rates(
+    sample: Sample,
+    clinical_violations: Dict,
+    fhir_summary: Dict[str, Any],
+    confidence: float = DEFAULT_CONFIDENCE,
+) -> pd.DataFrame:
+    """
+    Estimated share and count of affected rows in the whole file.
+
+    One row per row-level clinical rule and per FHIR error kind (rows with
+    a Patient error, with an Observation/VitalSigns error, with any
+    error). Column-level rules (COLUMN_RULES) are exact and not estimated.
+    """
+    frame = sample.frame
+    n = len(frame)
+    groups = None
+    if sample.by is not None:
+        groups, _ = pd.factorize(frame[sample.by], use_na_sentinel=False)
+
+    metrics: List[Tuple[str, np.ndarray]] = []
+    for name, result in (clinical_violations or {}).items():
+        if name in COLUMN_RULES:
+            continue
+        metrics.append((name, _flagged_rows(frame, result.violations)))
+
+    details = (fhir_summary or {}).get("error_details", [])
+    fhir_kinds = [
+        ("FHIR Patient errors", ("Patient",)),
+        ("FHIR Observation errors", ("Observation", "VitalSigns")),
+        ("Any FHIR error", ("Patient", "Observation", "VitalSigns")),
+    ]
+    for name, resources in fhir_kinds:
+        metrics.append((name, _flagged_rows(frame, (d["row"] for d in details if d["resource"] in resources))))
+
+    records = []
+    for name, flagged in metrics:
+        count = int(flagged.sum())
+        rate = count / n if n else 0.0
+        if sample.fraction >= 1:
+            low, high = rate, rate
+        else:
+            # Finite population correction for sampling without replacement
+            effective = _effective_size(flagged, groups) / (1 - sample.fraction)
+            low, high = wilson_interval(rate * effective, effective, confidence)
+        records.append({
+            "metric": name,
+            "sample_count": count,
+            "sample_rows": n,
+            "rate": rate,
+            "ci_low": low,
+            "ci_high": high,
+            "estimated_count": int(round(rate * sample.total_rows)),
+            "estimated_low": int(np.floor(low * sample.total_rows)),
+            "estimated_high": int(np.ceil(high * sample.total_rows)),
+        })
+    return pd.DataFrame.from_records(records).set_index("metric")
@@ -0,0 +1,299 @@
+"""
+Resident validation server (healthcli serve).
+
+A one-off `healthcli pipeline` run spends most of a small job on
+interpreter startup, imports (pandas, pydantic, matplotlib, Jinja2) and
+first-use costs such as Pydantic validators and matplotlib's font setup.
+The server pays these once:
+- jobs run on a bounded ProcessPoolExecutor whose workers are warmed up
+  by warmup.warm_up()
+- jobs are submitted and polled over HTTP, on localhost or on a Unix
+  socket (curl --unix-socket)
+- at most queue_size jobs may be pending; further submissions are
+  refused with 503 so callers can back off
+
+Endpoints:
+    POST /jobs           {"data": ..., "config": ..., "output": ..., <pipeline options>}
+    GET  /jobs           all known jobs
+    GET  /jobs/<id>      one job; ?wait=SECONDS blocks until it finishes
+    GET  /health         worker and queue status
+
+Relative paths are resolved against the server's working directory.
+"""
+
+import json
+import logging
+import os
+import signal
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import CancelledError, Future, ProcessPoolExecutor, TimeoutError
+from datetime import datetime
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from socketserver import ThreadingMixIn, UnixStreamServer
+from typing import Any, Callable, Dict, List, Optional
+from urllib.parse import parse_qs, urlparse
+
+from healthcli.warmup import warm_up
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+DEFAULT_QUEUE_SIZE = 32
+DEFAULT_CONFIG_PATH = "config/config.yaml"
+
+# Finished jobs kept for status queries; older ones are forgotten
+MAX_FINISHED_JOBS = 1_000
+
+# run_pipeline keyword arguments a job may set
+JOB_OPTIONS = (
+    "async_pdf", "force", "incremental", "workers", "memory_budget", "sample", "sample_by", "export_fhir",
+)
+
+
+class QueueFull(Exception):
+    """Raised when a job is submitted while queue_size jobs are pending."""
+
+
+def run_job(spec: Dict[str, Any]) -> Dict[str, Any]:
+    """Worker: run one pipeline job and time it."""
+    from healthcli.pipeline import run_pipeline
+
+    start = time.perf_counter()
+    options = {key: spec[key] for key in JOB_OPTIONS if spec.get(key) is not None}
+    code = run_pipeline(spec["data"], spec["config"], spec["output"], **options)
+    return {"exit_code": code, "seconds": round(time.perf_counter() - start, 3)}
+
+
+class JobQueue:
+    """
+    Bounded job queue on a pool of warm worker processes.
+
+    Usage:
+        queue = JobQueue(workers=2, queue_size=32)
+        job = queue.submit({"data": "site1.csv", "output": "out/site1"})
+        queue.status(job["id"], wait=30)
+        queue.shutdown()
+    """
+
+    def __init__(
+        self,
+        workers: int = 1,
+        queue_size: int = DEFAULT_QUEUE_SIZE,
+        runner: Callable[[Dict[str, Any]], Dict[str, Any]] = run_job,
+        initializer: Optional[Callable[[], None]] = warm_up,
+        default_config: str = DEFAULT_CONFIG_PATH,
+    ):
+        self.workers = workers
+        self.queue_size = queue_size
+        self.runner = runner
+        self.default_config = default_config
+        self.executor = ProcessPoolExecutor(max_workers=workers, initializer=initializer)
+        self.jobs: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self.futures: Dict[str, Future] = {}
+        self.lock = threading.Lock()
+
+    def pending(self) -> int:
+        with self.lock:
+            return sum(not future.done() for future in self.futures.values())
+
+    def submit(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Queue a job; returns its status record.
+
+        Raises ValueError for an invalid request and QueueFull when
+        queue_size jobs are already pending.
+        """
+        if not isinstance(request, dict) or not request.get("data"):
+            raise ValueError("A job needs a 'data' path")
+        unknown = set(request) - {"data", "config", "output", *JOB_OPTIONS}
+        if unknown:
+            raise ValueError(f"Unknown job fields: {', '.join(sorted(unknown))}")
+
+        job_id = uuid.uuid4().hex[:12]
+        spec = {key: request[key] for key in JOB_OPTIONS if key in request}
+        spec["data"] = str(Path(request["data"]).resolve())
+        spec["config"] = str(Path(request.get("config") or self.default_config).resolve())
+        spec["output"] = str(Path(request.get("output") or Path("output") / job_id).resolve())
+
+        with self.lock:
+            if sum(not future.done() for future in self.futures.values()) >= self.queue_size:
+                raise QueueFull(f"{self.queue_size} jobs already pending")
+            job = {
+                "id": job_id,
+                "status": "queued",
+                "submitted_at": datetime.now().isoformat(timespec="seconds"),
+                **spec,
+            }
+            self.jobs[job_id] = job
+            future = self.executor.submit(self.runner, spec)
+            self.futures[job_id] = future
+        future.add_done_callback(lambda f, job_id=job_id: self._finished(job_id, f))
+        return self.status(job_id)
+
+    @staticmethod
+    def _record(job: Dict[str, Any], future: Future) -> None:
+        """Copy the outcome of a finished future into its job record."""
+        if job["status"] not in ("queued", "running"):
+            return
+        job["finished_at"] = datetime.now().isoformat(timespec="seconds")
+        if future.cancelled():
+            job["status"] = "cancelled"
+        elif future.exception() is not None:
+            exc = future.exception()
+            job.update(status="failed", error=f"{type(exc).__name__}: {exc}")
+        else:
+            job.update(status="succeeded", **future.result())
+
+    def _finished(self, job_id: str, future: Future) -> None:
+        with self.lock:
+            self._record(self.jobs[job_id], future)
+            finished = [jid for jid, f in self.futures.items() if f.done()]
+            for jid in finished[: max(len(finished) - MAX_FINISHED_JOBS, 0)]:
+                del self.futures[jid]
+                del self.jobs[jid]
+
+    def status(self, job_id: str, wait: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """Status record of a job, or None if unknown; wait blocks up to wait seconds."""
+        with self.lock:
+            future = self.futures.get(job_id)
+        if future is None:
+            return None
+        if wait:
+            try:
+                future.exception(timeout=wait)
+            except (TimeoutError, CancelledError):
+                pass
+        with self.lock:
+            job = self.jobs.get(job_id)
+            if job is None:
+                return None
+            # The done callback may not have run yet
+            if future.done():
+                self._record(job, future)
+            job = dict(job)
+        if job["status"] == "queued" and future.running():
+            job["status"] = "running"
+        return job
+
+    def list_jobs(self) -> List[Dict[str, Any]]:
+        with self.lock:
+            job_ids = list(self.jobs)
+        return [job for job in (self.status(job_id) for job_id in job_ids) if job is not None]
+
+    def shutdown(self, wait: bool = True) -> None:
+        self.executor.shutdown(wait=wait, cancel_futures=not wait)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server_version = "healthcli"
+
+    def _send(self, status: HTTPStatus, payload: Any) -> None:
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self) -> None:
+        queue: JobQueue = self.server.queue
+        url = urlparse(self.path)
+        parts = [p for p in url.path.split("/") if p]
+
+        if parts == ["health"]:
+            self._send(HTTPStatus.OK, {"status": "ok", "workers": queue.workers, "pending": queue.pending()})
+        elif parts == ["jobs"]:
+            self._send(HTTPStatus.OK, queue.list_jobs())
+        elif len(parts) == 2 and parts[0] == "jobs":
+            try:
+                wait = float(parse_qs(url.query).get("wait", ["0"])[0])
+            except ValueError:
+                self._send(HTTPStatus.BAD_REQUEST, {"error": "wait must be a number of seconds"})
+                return
+            job = queue.status(parts[1], wait=wait)
+            if job is None:
+                self._send(HTTPStatus.NOT_FOUND, {"error": f"Unknown job: {parts[1]}"})
+            else:
+                self._send(HTTPStatus.OK, job)
+        else:
+            self._send(HTTPStatus.NOT_FOUND, {"error": f"Unknown path: {url.path}"})
+
+    def do_POST(self) -> None:
+        if [p for p in urlparse(self.path).path.split("/") if p] != ["jobs"]:
+            self._send(HTTPStatus.NOT_FOUND, {"error": f"Unknown path: {self.path}"})
+            return
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            request = json.loads(self.rfile.read(length) or b"{}")
+            job = self.server.queue.submit(request)
+        except QueueFull as exc:
+            self._send(HTTPStatus.SERVICE_UNAVAILABLE, {"error": str(exc)})
+        except ValueError as exc:  # includes malformed JSON
+            self._send(HTTPStatus.BAD_REQUEST, {"error": str(exc)})
+        else:
+            self.server.logger.info("Job %s queued: %s", job["id"], job["data"])
+            self._send(HTTPStatus.ACCEPTED, job)
+
+    def log_message(self, format: str, *args) -> None:
+        self.server.logger.debug("%s %s", self.command, format % args)
+
+
+class _UnixHTTPServer(ThreadingMixIn, UnixStreamServer):
+    daemon_threads = True
+
+
+def make_server(
+    queue: JobQueue,
+    logger: logging.Logger,
+    host: str = DEFAULT_HOST,
+    port: int = DEFAULT_PORT,
+    socket_path: Optional[str] = None,
+):
+    """HTTP server for queue, on a Unix socket if socket_path is given, else on host:port."""
+    if socket_path is not None:
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+        server = _UnixHTTPServer(socket_path, _Handler)
+        # Only the user running the server may submit jobs
+        os.chmod(socket_path, 0o600)
+    else:
+        server = ThreadingHTTPServer((host, port), _Handler)
+        server.daemon_threads = True
+    server.queue = queue
+    server.logger = logger
+    return server
+
+
+def serve(
+    logger: logging.Logger,
+    host: str = DEFAULT_HOST,
+    port: int = DEFAULT_PORT,
+    socket_path: Optional[str] = None,
+    workers: int = 1,
+    queue_size: int = DEFAULT_QUEUE_SIZE,
+    default_config: str = DEFAULT_CONFIG_PATH,
+) -> int:
+    """Serve jobs until interrupted (Ctrl-C or SIGTERM), then drain the pool."""
+    queue = JobQueue(workers=workers, queue_size=queue_size, default_config=default_config)
+    server = make_server(queue, logger, host=host, port=port, socket_path=socket_path)
+    where = socket_path if socket_path is not None else "http://%s:%d" % server.server_address[:2]
+
+    def _stop(signum, frame):
+        raise KeyboardInterrupt
+
+    signal.signal(signal.SIGTERM, _stop)
+    logger.info("Serving on %s with %d warm workers (queue size %d)", where, workers, queue_size)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        logger.info("Shutting down; waiting for %d pending jobs", queue.pending())
+    finally:
+        server.server_close()
+        queue.shutdown(wait=True)
+        if socket_path is not None and os.path.exists(socket_path):
+            os.unlink(socket_path)
+    return 0
@@ -0,0 +1,142 @@
+"""
+Shared-memory DataFrame transport for worker processes.
+
+Handing a DataFrame (or slices of it) to a ProcessPoolExecutor pickles
+every column for every task: the parent serializes a full copy, each
+worker deserializes one, and the CPU time goes into copying bytes. With
+SharedFrame the loaded frame is written once, as an Arrow IPC file, to a
+memory-mapped file in RAM-backed storage (/dev/shm where available).
+Workers memory-map it and get zero-copy column views; each one only
+materializes the rows it is asked for.
+
+Tasks then only carry the file path and row positions. pyarrow is
+optional: without it, or for columns Arrow cannot represent (e.g. mixed
+object columns), callers fall back to pickling.
+"""
+
+import logging
+import os
+import tempfile
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from healthcli import artifacts
+
+# Hidden column carrying the original row labels
+ROW_LABEL = "__row_label__"
+
+DEFAULT_BATCH_ROWS = 262_144
+
+
+def shared_dir() -> Optional[str]:
+    """RAM-backed directory for shared frames, or None for the default temp dir."""
+    return "/dev/shm" if os.path.isdir("/dev/shm") and os.access("/dev/shm", os.W_OK) else None
+
+
+class SharedFrame:
+    """
+    A DataFrame published as a memory-mapped Arrow IPC file.
+
+    Usage:
+        with SharedFrame.create(df) as shared:
+            executor.map(work, [shared.path] * n, positions)
+        # in the worker:
+        part = attach_frame(path, positions)
+
+    The file is removed when the context exits.
+    """
+
+    def __init__(self, path: str, rows: int):
+        self.path = path
+        self.rows = rows
+
+    @classmethod
+    def create(
+        cls,
+        df: pd.DataFrame,
+        directory: Optional[str] = None,
+        batch_rows: int = DEFAULT_BATCH_ROWS,
+    ) -> "SharedFrame":
+        """
+        Write df to a new shared file in record batches.
+
+        Only one batch is converted to Arrow at a time, so publishing the
+        frame does not need a second full-size copy in memory. Raises
+        RuntimeError if pyarrow is not installed and pyarrow.ArrowException
+        if a column cannot be converted.
+        """
+        if not artifacts.pyarrow_available():
+            raise RuntimeError(f"pyarrow is required for shared frames: {artifacts.PYARROW_IMPORT_ERROR}")
+        pa, _ = artifacts.load_pyarrow()
+
+        fd, path = tempfile.mkstemp(prefix="healthcli-frame-", suffix=".arrow", dir=directory or shared_dir())
+        os.close(fd)
+        try:
+            writer, schema = None, None
+            with pa.OSFile(path, "wb") as sink:
+                for start in range(0, max(len(df), 1), batch_rows):
+                    chunk = df.iloc[start:start + batch_rows]
+                    batch = pa.RecordBatch.from_pandas(
+                        chunk.assign(**{ROW_LABEL: chunk.index.to_numpy()}),
+                        schema=schema,
+                        preserve_index=False,
+                    )
+                    if writer is None:
+                        schema = batch.schema
+                        writer = pa.ipc.new_file(sink, schema)
+                    writer.write_batch(batch)
+                writer.close()
+        except BaseException:
+            os.unlink(path)
+            raise
+        return cls(path, len(df))
+
+    def close(self) -> None:
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+
+    def __enter__(self) -> "SharedFrame":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+
+def attach_frame(path: str, positions: Optional[np.ndarray] = None) -> pd.DataFrame:
+    """
+    Read a shared frame (or the rows at positions) in a worker.
+
+    Columns are memory-mapped, so only the selected rows are copied out.
+    The original row labels are restored as the index.
+    """
+    pa, _ = artifacts.load_pyarrow()
+    with pa.memory_map(path) as source:
+        table = pa.ipc.open_file(source).read_all()
+        if positions is not None:
+            table = table.take(pa.array(positions))
+        df = table.to_pandas()
+
+    labels = df.pop(ROW_LABEL)
+    df.index = pd.Index(labels.to_numpy(), name=None)
+    return df
+
+
+def publish(df: pd.DataFrame, logger: Optional[logging.Logger] = None) -> Optional[SharedFrame]:
+    """SharedFrame for df, or None (with the reason logged) if it must be pickled instead."""
+    logger = logger or logging.getLogger("healthcli.shared_frame")
+    try:
+        shared = SharedFrame.create(df)
+    except RuntimeError as exc:
+        logger.info("Shared-memory transport unavailable, pickling partitions: %s", exc)
+        return None
+    except (TypeError, ValueError, OSError) as exc:
+        # pyarrow's ArrowTypeError / ArrowInvalid derive from these
+        logger.info("Frame cannot be shared as Arrow, pickling partitions: %s", exc)
+        return None
+    logger.debug("Frame shared via %s (%.1f MB)", shared.path, Path(shared.path).stat().st_size / 1e6)
+    return shared
@@ -0,0 +1,245 @@
+"""
+Deterministic synthetic clinical datasets for benchmarking.
+
+Two dataset shapes are provided:
+- diabetic: one row per encounter, in the style of the UCI diabetes
+  dataset (patient_nbr, gender, age, lab values)
+- vitals: per-patient timelines of vital sign readings (patient_id,
+  timestamp, systolic_bp, heart_rate, temperature, spo2)
+
+Data is produced in fixed-size chunks, each drawn from its own
+generator seeded with (seed, chunk_number). The same seed, size and
+chunk size therefore always give the same rows, whether the data is
+built in memory or streamed to disk at 10M rows.
+"""
+
+from pathlib import Path
+from typing import Dict, Iterator, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+
+DEFAULT_CHUNK_ROWS = 500_000
+
+# Named sizes used by the benchmark suite
+SIZES = {
+    "10k": 10_000,
+    "1m": 1_000_000,
+    "10m": 10_000_000,
+}
+
+# Implausible values injected as outliers, per column
+_OUTLIER_VALUES = {
+    "age": (-5.0, 150.0),
+    "glucose": (2500.0,),
+    "creatinine": (25.0,),
+    "max_glu_serum": (2500.0,),
+    "A1Cresult": (30.0,),
+    "systolic_bp": (20.0, 320.0),
+    "heart_rate": (5.0, 260.0),
+    "temperature": (25.0, 48.0),
+    "spo2": (20.0, 105.0),
+}
+
+MissingRates = Union[float, Dict[str, float]]
+
+
+def _missing_rate(missing_rate: MissingRates, column: str) -> float:
+    if isinstance(missing_rate, dict):
+        return missing_rate.get(column, 0.0)
+    return missing_rate
+
+
+def _inject_missing(df: pd.DataFrame, rng: np.random.Generator, missing_rate: MissingRates, skip=()) -> None:
+    for col in df.columns:
+        if col in skip:
+            continue
+        rate = _missing_rate(missing_rate, col)
+        if rate <= 0:
+            continue
+        mask = rng.random(len(df)) < rate
+        if mask.any():
+            if df[col].dtype.kind in "iu":
+                df[col] = df[col].astype("float64")
+            df.loc[mask, col] = np.nan
+
+
+def _inject_outliers(df: pd.DataFrame, rng: np.random.Generator, outlier_rate: float) -> None:
+    if outlier_rate <= 0:
+        return
+    for col, choices in _OUTLIER_VALUES.items():
+        if col not in df.columns:
+            continue
+        mask = rng.random(len(df)) < outlier_rate
+        if mask.any():
+            df.loc[mask, col] = rng.choice(choices, int(mask.sum()))
+
+
+def _chunk_sizes(n_rows: int, chunk_rows: int) -> Iterator[int]:
+    for start in range(0, n_rows, chunk_rows):
+        yield min(chunk_rows, n_rows - start)
+
+
+def iter_diabetic_chunks(
+    n_rows: int,
+    seed: int = 0,
+    missing_rate: MissingRates = 0.05,
+    outlier_rate: float = 0.01,
+    encounters_per_patient: int = 3,
+    chunk_rows: int = DEFAULT_CHUNK_ROWS,
+) -> Iterator[pd.DataFrame]:
+    """
+    Yield an encounter-level diabetic-style dataset in chunks.
+
+    Patients have several encounters each; a small share of patients has
+    conflicting sex values across encounters and some pediatric and
+    geriatric rows carry lab values that trip ClinicalCoherenceRule.
+    """
+    n_patients = max(n_rows // encounters_per_patient, 1)
+    offset = 0
+
+    for chunk_no, size in enumerate(_chunk_sizes(n_rows, chunk_rows)):
+        rng = np.random.default_rng([seed, chunk_no])
+        encounter = np.arange(offset, offset + size, dtype=np.int64)
+        patient = rng.integers(0, n_patients, size)
+
+        # Patient attributes derive from the patient number so they stay
+        # consistent across chunks, apart from deliberate conflicts below.
+        patient_female = (patient * 2654435761) % 2 == 0
+        sex = np.where(patient_female, "F", "M")
+        conflict = rng.random(size) < 0.002
+        sex = np.where(conflict, np.where(patient_female, "M", "F"), sex)
+        gender = np.where(sex == "F", "Female", "Male")
+        gender = np.where(rng.random(size) < 0.001, "Unknown/Invalid", gender)
+
+        age = np.clip(rng.normal(62, 18, size), 0, 100).round()
+
+        df = pd.DataFrame({
+            "encounter_id": encounter,
+            "patient_nbr": patient,
+            "patient_id": patient,
+            "race": rng.choice(
+                ["Caucasian", "AfricanAmerican", "Hispanic", "Asian", "Other"],
+                size,
+                p=[0.75, 0.19, 0.02, 0.01, 0.03],
+            ),
+            "gender": gender,
+            "sex": sex,
+            "age": age,
+            "admission_type_id": rng.integers(1, 9, size),
+            "time_in_hospital": rng.integers(1, 15, size),
+            "num_lab_procedures": rng.integers(1, 100, size),
+            "num_medications": rng.integers(1, 60, size),
+            "glucose": rng.lognormal(np.log(140), 0.35, size).round(1),
+            "creatinine": rng.lognormal(np.log(1.0), 0.4, size).round(2),
+            "max_glu_serum": rng.lognormal(np.log(150), 0.3, size).round(1),
+            "A1Cresult": rng.normal(7.2, 1.4, size).clip(4, 15).round(1),
+            "readmitted": rng.choice(["NO", ">30", "<30"], size, p=[0.54, 0.35, 0.11]),
+        })
+
+        _inject_outliers(df, rng, outlier_rate)
+        _inject_missing(df, rng, missing_rate, skip=("encounter_id", "patient_nbr", "patient_id"))
+
+        offset += size
+        yield df
+
+
+def iter_vitals_chunks(
+    n_rows: int,
+    seed: int = 0,
+    missing_rate: MissingRates = 0.02,
+    outlier_rate: float = 0.005,
+    spike_rate: float = 0.01,
+    readings_per_patient: int = 24,
+    chunk_rows: int = DEFAULT_CHUNK_ROWS,
+) -> Iterator[pd.DataFrame]:
+    """
+    Yield per-patient vital sign timelines in chunks.
+
+    Each patient has readings_per_patient hourly readings that drift
+    slowly; spikes (>50% jumps) are injected at spike_rate so
+    VitalSignAnomalyRule has work to do. Chunks hold whole patients.
+    """
+    chunk_rows = max(chunk_rows - chunk_rows % readings_per_patient, readings_per_patient)
+    start_time = np.datetime64("2024-01-01T00:00:00")
+    patient_offset = 0
+
+    for chunk_no, size in enumerate(_chunk_sizes(n_rows, chunk_rows)):
+        rng = np.random.default_rng([seed, chunk_no])
+        n_patients = -(-size // readings_per_patient)
+        patient = np.repeat(
+            np.arange(patient_offset, patient_offset + n_patients), readings_per_patient
+        )[:size]
+        reading = np.tile(np.arange(readings_per_patient), n_patients)[:size]
+
+        def timeline(baseline, scale, drift):
+            base = np.repeat(rng.normal(baseline, scale, n_patients), readings_per_patient)[:size]
+            return base + rng.normal(0, drift, size)
+
+        admitted = np.repeat(rng.integers(0, 365 * 24, n_patients), readings_per_patient)[:size]
+        timestamp = start_time + (admitted + reading).astype("timedelta64[h]")
+
+        df = pd.DataFrame({
+            "patient_id": patient,
+            "patient_nbr": patient,
+            "timestamp": np.datetime_as_string(timestamp, unit="s"),
+            "age": np.repeat(np.clip(rng.normal(60, 20, n_patients), 0, 100).round(), readings_per_patient)[:size],
+            "systolic_bp": timeline(125, 15, 4).round(),
+            "heart_rate": timeline(78, 10, 3).round(),
+            "temperature": timeline(36.9, 0.3, 0.15).round(1),
+            "spo2": np.minimum(timeline(97, 1.5, 0.8), 100).round(),
+        })
+
+        if spike_rate > 0:
+            for col in ("systolic_bp", "heart_rate"):
+                spikes = (rng.random(size) < spike_rate) & (reading > 0)
+                df.loc[spikes, col] = (df.loc[spikes, col] * 1.8).round()
+
+        _inject_outliers(df, rng, outlier_rate)
+        _inject_missing(df, rng, missing_rate, skip=("patient_id", "patient_nbr", "timestamp"))
+
+        patient_offset += n_patients
+        yield df
+
+
+GENERATORS = {
+    "diabetic": iter_diabetic_chunks,
+    "vitals": iter_vitals_chunks,
+}
+
+
+def generate_dataset(kind: str, n_rows: int, seed: int = 0, **kwargs) -> pd.DataFrame:
+    """Build a synthetic dataset of the given kind in memory."""
+    if kind not in GENERATORS:
+        raise ValueError(f"Unknown dataset kind: {kind} (expected one of {sorted(GENERATORS)})")
+    chunks = list(GENERATORS[kind](n_rows, seed=seed, **kwargs))
+    return pd.concat(chunks, ignore_index=True)
+
+
+def write_dataset(
+    kind: str,
+    n_rows: int,
+    path: str,
+    seed: int = 0,
+    chunk_rows: Optional[int] = None,
+    **kwargs,
+) -> Path:
+    """
+    Stream a synthetic dataset to CSV chunk by chunk.
+
+    Peak memory is bounded by chunk_rows, so 10M-row files can be
+    produced on small machines.
+    """
+    if kind not in GENERATORS:
+        raise ValueError(f"Unknown dataset kind: {kind} (expected one of {sorted(GENERATORS)})")
+
+    out_path = Path(path)
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    chunk_rows = chunk_rows or DEFAULT_CHUNK_ROWS
+
+    with open(out_path, "w", encoding="utf-8", newline="") as f:
+        for i, chunk in enumerate(GENERATORS[kind](n_rows, seed=seed, chunk_rows=chunk_rows, **kwargs)):
+            chunk.to_csv(f, header=(i == 0), index=False)
+
+    return out_path
@@ -0,0 +1,187 @@
+"""
+Config-driven cleaning of clinical datasets.
+
+The transform stage turns the validated input into a cleaned table:
+- missing-value placeholders (missing_values.placeholders) become NaN
+- gender columns are normalized to male/female/other/unknown, with the
+  same rules as the FHIR Patient validation
+- lab and vital sign columns are coerced to numbers
+- vital signs outside the ranges enforced by VitalSigns are set to NaN
+- missing_values.strategy is applied: ignore, drop_rows or median
+  (not in incremental runs, which clean one appended chunk at a time:
+  the columns to treat and the medians depend on the whole table, so
+  chunk-local values would make the output depend on how the file grew)
+
+clean() modifies the DataFrame passed in: each column is converted and
+assigned back (df[col] = ...) one at a time, so at most one converted
+column exists next to the input and peak memory stays close to the size
+of the input plus one column. The cleaned table is written in row slices
+to CSV or Parquet, so no second full-size copy (or full-size CSV string)
+is ever built.
+"""
+
+import logging
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from healthcli import artifacts
+from healthcli.fhir_models import vital_sign_range
+from healthcli.quality import LAB_COLUMNS, VITAL_SIGN_UNITS, normalize_gender_value
+
+CLEANED_DIR = "cleaned"
+DEFAULT_CHUNK_ROWS = 500_000
+GENDERS = ["male", "female", "other", "unknown"]
+MISSING_STRATEGIES = ("ignore", "drop_rows", "median")
+
+DEFAULT_GENDER_COLUMNS = ["gender"]
+DEFAULT_NUMERIC_COLUMNS = ["age", "glucose", "creatinine"] + LAB_COLUMNS + list(VITAL_SIGN_UNITS)
+
+
+def normalize_gender(series: pd.Series) -> pd.Series:
+    """
+    Vectorized normalize_gender_value, returned as a categorical column.
+
+    Only the distinct values go through normalize_gender_value; rows are mapped
+    through their factorized codes.
+    """
+    codes, uniques = pd.factorize(series)
+    # Last slot catches missing values (code -1)
+    mapping = np.array(
+        [GENDERS.index(normalize_gender_value(value)) for value in uniques] + [GENDERS.index("unknown")],
+        dtype=np.int8,
+    )
+    categorical = pd.Categorical.from_codes(mapping[codes], categories=GENDERS)
+    return pd.Series(categorical, index=series.index, name=series.name)
+
+
+def null_out_of_range(series: pd.Series, code: str) -> pd.Series:
+    """Set values outside the VitalSigns range for code to NaN."""
+    bounds = vital_sign_range(code)
+    if bounds is None:
+        return series
+    return series.mask((series < bounds.low) | (series > bounds.high))
+
+
+def clean(
+    df: pd.DataFrame,
+    config: Dict[str, Any],
+    logger: Optional[logging.Logger] = None,
+    incremental: bool = False,
+) -> pd.DataFrame:
+    """
+    Clean df according to the transform and missing_values config sections.
+
+    df is modified in place column by column; the returned frame is df
+    itself unless rows were dropped. With incremental (df holds the rows
+    appended since the last run), missing_values.strategy is not applied.
+    """
+    logger = logger or logging.getLogger("healthcli.transform")
+    transform_config = config.get("transform", {})
+    missing_config = config.get("missing_values", {})
+
+    placeholders = missing_config.get("placeholders", [])
+    if placeholders:
+        for col in df.columns:
+            if not pd.api.types.is_numeric_dtype(df[col]):
+                df[col] = df[col].mask(df[col].isin(placeholders))
+
+    for col in transform_config.get("gender_columns", DEFAULT_GENDER_COLUMNS):
+        if col in df.columns:
+            df[col] = normalize_gender(df[col])
+
+    numeric_columns = [
+        col for col in transform_config.get("numeric_columns", DEFAULT_NUMERIC_COLUMNS) if col in df.columns
+    ]
+    nulled = 0
+    for col in numeric_columns:
+        values = pd.to_numeric(df[col], errors="coerce")
+        if col in VITAL_SIGN_UNITS:
+            before = int(values.isna().sum())
+            values = null_out_of_range(values, col)
+            nulled += int(values.isna().sum()) - before
+        df[col] = values
+    logger.info("Coerced %d numeric columns; %d implausible vital sign values set to missing", len(numeric_columns), nulled)
+
+    strategy = missing_config.get("strategy", "ignore")
+    if strategy not in MISSING_STRATEGIES:
+        raise ValueError(f"Unknown missing_values.strategy: {strategy!r} (expected one of {MISSING_STRATEGIES})")
+    if strategy != "ignore" and incremental:
+        logger.warning(
+            "missing_values.strategy %r is not applied in incremental runs; missing values are kept", strategy
+        )
+    elif strategy != "ignore":
+        # Columns missing more than max_missing_ratio are exclusion
+        # candidates; they are left alone rather than emptying the table
+        max_ratio = missing_config.get("max_missing_ratio", 1.0)
+        ratios = df.isna().mean()
+        columns = [col for col in df.columns if 0 < ratios[col] <= max_ratio]
+
+        if strategy == "drop_rows":
+            before = len(df)
+            df = df.dropna(subset=columns)
+            logger.info("Dropped %d rows with missing values in %d columns", before - len(df), len(columns))
+        else:
+            filled = [col for col in columns if col in numeric_columns]
+            for col in filled:
+                df[col] = df[col].fillna(df[col].median())
+            logger.info("Filled missing values with the median in %d numeric columns", len(filled))
+
+    return df
+
+
+def write_cleaned(
+    df: pd.DataFrame,
+    output_dir: str,
+    fmt: str = "csv",
+    chunk_rows: int = DEFAULT_CHUNK_ROWS,
+    first_row: int = 0,
+    logger: Optional[logging.Logger] = None,
+) -> List[str]:
+    """
+    Stream the cleaned table to <output_dir>/cleaned/part-<first_row>.<fmt>.
+
+    Incremental runs pass the row number of their first new row, so each
+    run adds a part; parts from earlier runs that started at or after
+    first_row are removed. Returns every part file relative to output_dir.
+    """
+    logger = logger or logging.getLogger("healthcli.transform")
+    out_dir = Path(output_dir)
+    parts_dir = out_dir / CLEANED_DIR
+    parts_dir.mkdir(parents=True, exist_ok=True)
+
+    if fmt == "parquet" and not artifacts.pyarrow_available():
+        logger.warning("Writing cleaned data as CSV: pyarrow is not installed (%s)", artifacts.PYARROW_IMPORT_ERROR)
+        fmt = "csv"
+
+    for stale in parts_dir.glob("part-*"):
+        if int(stale.name.split("-", 1)[1].split(".", 1)[0]) >= first_row:
+            stale.unlink()
+
+    path = parts_dir / f"part-{first_row:012d}.{fmt}"
+    if fmt == "parquet":
+        pa, pq = artifacts.load_pyarrow()
+        writer = None
+        try:
+            for start in range(0, max(len(df), 1), chunk_rows):
+                table = pa.Table.from_pandas(
+                    df.iloc[start:start + chunk_rows],
+                    schema=writer.schema if writer is not None else None,
+                    preserve_index=False,
+                )
+                if writer is None:
+                    writer = pq.ParquetWriter(str(path), table.schema)
+                writer.write_table(table)
+        finally:
+            if writer is not None:
+                writer.close()
+    else:
+        with open(path, "w", encoding="utf-8", newline="") as f:
+            df.iloc[:0].to_csv(f, index=False)
+            for start in range(0, len(df), chunk_rows):
+                df.iloc[start:start + chunk_rows].to_csv(f, index=False, header=False)
+
+    logger.info("Cleaned data written to %s (%d rows)", path, len(df))
+    return sorted(p.relative_to(out_dir).as_posix() for p in parts_dir.glob("part-*"))
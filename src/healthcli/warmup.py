@@ -0,0 +1,38 @@
+"""
+Warm-up for long-lived worker processes.
+
+Resident workers (healthcli serve, batch and watch) run warm_up() as
+their pool initializer, so interpreter-level first-use costs are paid
+once per worker instead of once per job:
+- importing the pipeline (pandas, pydantic, Jinja2 and the report template)
+- building the Pydantic validators on their first validation
+- initialising matplotlib (backend, fonts) on the first chart
+
+Workers also restore the default SIGTERM action, which the parent may
+have replaced to shut down gracefully, so they exit quietly with it.
+"""
+
+import logging
+import signal
+
+
+def warm_up() -> None:
+    """Import the pipeline, then validate and render a tiny synthetic dataset."""
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+
+    from healthcli.clinical_rules_extended import run_clinical_rules
+    from healthcli.pipeline import run_pipeline  # noqa: F401  (imports the full pipeline)
+    from healthcli.quality import fhir_validation_summary
+    from healthcli.render_worker import render_missing_chart
+    from healthcli.synthetic import generate_dataset
+
+    logger = logging.getLogger("healthcli.warm_up")
+    logger.propagate = False
+    if not logger.handlers:
+        logger.addHandler(logging.NullHandler())
+
+    for kind in ("diabetic", "vitals"):
+        df = generate_dataset(kind, 20, seed=0)
+        run_clinical_rules(df, logger)
+        fhir_validation_summary(df, logger)
+        render_missing_chart(df.isna().sum().to_dict())
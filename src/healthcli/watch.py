@@ -0,0 +1,309 @@
+"""
+Continuous validation of a drop directory (healthcli watch).
+
+Files landing in the directory are validated minutes, not a cron period,
+after they are complete:
+- on Linux the directory is watched with inotify (through ctypes, no
+  extra dependency), so only files with activity are looked at; where
+  inotify is unavailable the directory is polled with one scandir per
+  interval, comparing size and mtime
+- a file is debounced until it is complete: with inotify, until it has
+  been closed after writing (or moved in) and left alone for `settle`
+  seconds; when polling, until its size and mtime are unchanged for
+  `settle` seconds
+- complete files are run through the pipeline on a pool of warm workers
+  (see healthcli.batch). Backpressure: at most one job per worker is
+  handed to the pool and at most max_pending complete files wait in
+  line; further files simply stay in the debouncer, nothing is dropped
+- <output>/index.html and index.json are rewritten after every job
+
+If the inotify event queue overflows, the directory is rescanned once so
+no file is missed.
+"""
+
+import ctypes
+import ctypes.util
+import fnmatch
+import logging
+import os
+import select
+import signal
+import struct
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from healthcli.batch import log_result, run_dataset, write_index
+from healthcli.config_loader import load_config
+from healthcli.history import dataset_name
+from healthcli.warmup import warm_up
+
+DEFAULT_PATTERN = "*.csv"
+DEFAULT_SETTLE_SECONDS = 2.0
+DEFAULT_POLL_SECONDS = 1.0
+DEFAULT_MAX_PENDING = 100
+
+# Most recent results shown in the index
+INDEX_LIMIT = 500
+
+# inotify(7) flags
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_Q_OVERFLOW = 0x00004000
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = 0o2000000
+_EVENT_HEADER = struct.Struct("iIII")
+
+# (file name, complete): complete is True once the writer is known to be done
+Event = Tuple[str, bool]
+
+
+class InotifyWatcher:
+    """Directory events from Linux inotify, through ctypes."""
+
+    MASK = IN_CREATE | IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO
+
+    def __init__(self, directory: str):
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        if not hasattr(libc, "inotify_init1"):
+            raise OSError("inotify is not available")
+        self.directory = directory
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        if libc.inotify_add_watch(self.fd, os.fsencode(directory), self.MASK) < 0:
+            errno = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(errno, f"inotify_add_watch failed for {directory}")
+        self.overflowed = False
+
+    def events(self, timeout: float) -> List[Event]:
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        if not readable:
+            return []
+        try:
+            buffer = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+
+        events, offset = [], 0
+        while offset < len(buffer):
+            _, mask, _, length = _EVENT_HEADER.unpack_from(buffer, offset)
+            offset += _EVENT_HEADER.size
+            name = buffer[offset:offset + length].rstrip(b"\0").decode("utf-8", "surrogateescape")
+            offset += length
+            if mask & IN_Q_OVERFLOW:
+                self.overflowed = True
+            elif name:
+                events.append((name, bool(mask & (IN_CLOSE_WRITE | IN_MOVED_TO))))
+        return events
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+class PollingWatcher:
+    """Directory changes found by comparing size and mtime at each interval."""
+
+    def __init__(self, directory: str, interval: float = DEFAULT_POLL_SECONDS):
+        self.directory = directory
+        self.interval = interval
+        self.overflowed = False
+        self.seen: Dict[str, Tuple[int, int]] = self._scan()
+
+    def _scan(self) -> Dict[str, Tuple[int, int]]:
+        with os.scandir(self.directory) as entries:
+            return {
+                entry.name: (stat.st_size, stat.st_mtime_ns)
+                for entry in entries
+                if entry.is_file()
+                for stat in (entry.stat(),)
+            }
+
+    def events(self, timeout: float) -> List[Event]:
+        time.sleep(min(timeout, self.interval))
+        current = self._scan()
+        # Polling cannot see writers closing a file; stability decides
+        changed = [(name, True) for name, state in current.items() if self.seen.get(name) != state]
+        self.seen = current
+        return changed
+
+    def close(self) -> None:
+        pass
+
+
+def make_watcher(directory: str, polling: bool = False, interval: float = DEFAULT_POLL_SECONDS):
+    """InotifyWatcher where available, else PollingWatcher."""
+    if not polling:
+        try:
+            return InotifyWatcher(directory)
+        except (OSError, AttributeError):
+            pass
+    return PollingWatcher(directory, interval)
+
+
+class Debouncer:
+    """Tracks files with recent activity until they are complete and settled."""
+
+    def __init__(self, settle: float = DEFAULT_SETTLE_SECONDS):
+        self.settle = settle
+        # name -> (time of last activity, writer done)
+        self.pending: Dict[str, Tuple[float, bool]] = {}
+
+    def touch(self, name: str, complete: bool, now: float) -> None:
+        self.pending[name] = (now, complete)
+
+    def ready(self, now: float, limit: Optional[int] = None) -> List[str]:
+        """Settled complete files, oldest activity first, removed from tracking."""
+        settled = sorted(
+            (last, name) for name, (last, complete) in self.pending.items()
+            if complete and now - last >= self.settle
+        )
+        names = [name for _, name in settled[:limit]]
+        for name in names:
+            del self.pending[name]
+        return names
+
+
+def watch_directory(
+    directory: str,
+    output_dir: str,
+    config_path: str,
+    workers: int = 1,
+    pattern: str = DEFAULT_PATTERN,
+    settle: float = DEFAULT_SETTLE_SECONDS,
+    poll_interval: float = DEFAULT_POLL_SECONDS,
+    max_pending: int = DEFAULT_MAX_PENDING,
+    existing: bool = False,
+    polling: bool = False,
+    logger: Optional[logging.Logger] = None,
+    stop: Optional[threading.Event] = None,
+) -> int:
+    """
+    Validate files landing in directory until stop is set or the process is interrupted.
+
+    With existing, files already in the directory are validated too
+    (unchanged files are cheap: the pipeline reuses its cached outputs).
+    """
+    logger = logger or logging.getLogger("healthcli.watch")
+    stop = stop or threading.Event()
+    config = load_config(config_path)
+    out_dir = Path(output_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    started_at = datetime.now().isoformat(timespec="seconds")
+
+    watcher = make_watcher(directory, polling=polling, interval=poll_interval)
+    logger.info(
+        "Watching %s for %s with %s (%d workers)",
+        directory,
+        pattern,
+        "inotify" if isinstance(watcher, InotifyWatcher) else "polling",
+        workers,
+    )
+
+    def matching(names) -> List[str]:
+        return [n for n in names if fnmatch.fnmatch(n, pattern) and not n.startswith(".")]
+
+    def rescan(now: float) -> None:
+        with os.scandir(directory) as entries:
+            for name in matching(e.name for e in entries if e.is_file()):
+                debouncer.touch(name, True, now)
+
+    debouncer = Debouncer(settle)
+    if existing:
+        # Already settled: the files were there before the watch started
+        rescan(time.monotonic() - settle)
+
+    queue: "deque[str]" = deque()
+    in_flight: Dict[Future, str] = {}
+    crashed: Dict[str, int] = {}
+    results: Dict[str, Dict[str, Any]] = {}
+
+    def _stop(signum, frame):
+        raise KeyboardInterrupt
+
+    if threading.current_thread() is threading.main_thread():
+        signal.signal(signal.SIGTERM, _stop)
+
+    def start_pool() -> ProcessPoolExecutor:
+        pool = ProcessPoolExecutor(max_workers=workers, initializer=warm_up)
+        # Start and warm the workers now rather than on the first file
+        pool.submit(os.getpid)
+        return pool
+
+    executor = start_pool()
+    try:
+        while not stop.is_set():
+            timeout = 0.05 if queue or debouncer.pending else poll_interval
+            now = time.monotonic()
+            for name, complete in watcher.events(timeout):
+                if matching([name]):
+                    debouncer.touch(name, complete, now)
+            if watcher.overflowed:
+                logger.warning("inotify event queue overflowed; rescanning %s", directory)
+                watcher.overflowed = False
+                rescan(now)
+
+            for name in debouncer.ready(time.monotonic(), limit=max(max_pending - len(queue), 0)):
+                if name not in queue:
+                    queue.append(name)
+
+            # Backpressure: at most one job per worker is handed to the pool
+            while queue and len(in_flight) < workers:
+                name = queue.popleft()
+                if name in in_flight.values():
+                    # Rewritten while being validated: validate again afterwards
+                    debouncer.touch(name, True, time.monotonic())
+                    continue
+                path = os.path.join(directory, name)
+                if not os.path.exists(path):
+                    continue
+                dataset = {"name": dataset_name(name), "data": os.path.abspath(path), "config": config_path}
+                logger.info("Validating %s (%d waiting)", name, len(queue))
+                future = executor.submit(run_dataset, dataset, str(out_dir / dataset["name"]), config, {})
+                in_flight[future] = name
+
+            done = [future for future in in_flight if future.done()]
+            broken = False
+            for future in done:
+                name = in_flight.pop(future)
+                try:
+                    result = future.result()
+                except BrokenProcessPool:
+                    # A worker died (e.g. out of memory) and took the pool's
+                    # jobs with it: retry each once, then give up on the file
+                    broken = True
+                    crashed[name] = crashed.get(name, 0) + 1
+                    if crashed[name] == 1:
+                        queue.appendleft(name)
+                        continue
+                    result = {
+                        "name": dataset_name(name),
+                        "data": os.path.abspath(os.path.join(directory, name)),
+                        "output": str(out_dir / dataset_name(name)),
+                        "status": "failed",
+                        "error": "Worker process died (e.g. killed for running out of memory)",
+                    }
+                crashed.pop(name, None)
+                # Latest result last, one entry per dataset
+                results.pop(result["name"], None)
+                results[result["name"]] = result
+                log_result(result, logger)
+            if broken:
+                executor.shutdown(wait=False)
+                executor = start_pool()
+            if done:
+                write_index(list(results.values())[-INDEX_LIMIT:], out_dir, started_at)
+    except KeyboardInterrupt:
+        logger.info("Stopping; waiting for %d running jobs", len(in_flight))
+    finally:
+        watcher.close()
+        executor.shutdown(wait=True)
+    return 0
@@ -0,0 +1,22 @@
+import pytest
+import yaml
+
+
+@pytest.fixture
+def pipeline_config(tmp_path):
+    """Pipeline config for tests: no missing-data thresholds, quiet logs in tmp_path, no side outputs."""
+    return {
+        "quality": {"missing": {"warning_threshold": 1.0, "critical_threshold": 1.0}},
+        "logging": {"level": "ERROR", "log_dir": str(tmp_path / "logs")},
+        "report": {"render_process": False},
+        "storage": {"history": False},
+        "metrics": {"enabled": False},
+    }
+
+
+@pytest.fixture
+def pipeline_config_path(tmp_path, pipeline_config):
+    """pipeline_config written to tmp_path/config.yaml."""
+    path = tmp_path / "config.yaml"
+    path.write_text(yaml.safe_dump(pipeline_config))
+    return str(path)
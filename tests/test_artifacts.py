@@ -0,0 +1,44 @@
+import pandas as pd
+import pytest
+
+from healthcli.artifacts import write_result_artifacts
+from healthcli.clinical_rules_extended import RuleResult
+
+pytest.importorskip("pyarrow")
+
+
+def test_results_are_written_as_typed_parquet(tmp_path):
+    df = pd.DataFrame({"age": [40, 250, None], "gender": ["M", "F", "F"]})
+    results = {
+        "clinical_violations": {
+            "AgePlausibilityRule": RuleResult(
+                rule_name="AgePlausibilityRule", violations=[1], count=1, severity="ERROR"
+            ),
+            "MissingDataThresholdRule": RuleResult(
+                rule_name="MissingDataThresholdRule", violations=["age"], count=1
+            ),
+        },
+        "fhir_summary": {
+            "error_details": [
+                {"resource": "Patient", "row": 1, "column": "age", "error_class": "value_error"},
+            ],
+        },
+    }
+
+    files = write_result_artifacts(df, results, str(tmp_path))
+
+    assert files == [
+        "results/violations.parquet",
+        "results/column_profile.parquet",
+        "results/fhir_errors.parquet",
+    ]
+    violations = pd.read_parquet(tmp_path / files[0])
+    assert violations["row_id"].tolist()[0] == 1
+    assert violations["column"].tolist()[1] == "age"
+
+    profile = pd.read_parquet(tmp_path / files[1]).set_index("column")
+    assert profile.loc["age", "missing_count"] == 1
+    assert profile.loc["age", "max"] == 250.0
+
+    errors = pd.read_parquet(tmp_path / files[2], columns=["row_id", "error_class"])
+    assert errors.to_dict("records") == [{"row_id": 1, "error_class": "value_error"}]
@@ -0,0 +1,40 @@
+import json
+
+import yaml
+
+from healthcli.batch import collect_datasets, validate_batch
+from healthcli.synthetic import generate_dataset
+
+
+def test_collect_datasets_from_globs_and_manifest(tmp_path):
+    for site in ("a", "b"):
+        (tmp_path / "drops" / site).mkdir(parents=True)
+        (tmp_path / "drops" / site / "vitals.csv").write_text("x\n1\n")
+    manifest = tmp_path / "batch.yaml"
+    manifest.write_text(yaml.safe_dump([
+        "drops/a/vitals.csv",
+        {"data": "drops/b/vitals.csv", "name": "site-b", "config": "icu.yaml"},
+    ]))
+
+    datasets = collect_datasets([str(tmp_path / "drops/*/vitals.csv")], manifest=str(manifest))
+
+    assert [d["name"] for d in datasets] == ["vitals", "vitals-2"]
+    assert datasets[1]["config"] == "config/config.yaml"
+    assert [d["name"] for d in collect_datasets([], manifest=str(manifest))] == ["vitals", "site-b"]
+    assert collect_datasets([], manifest=str(manifest))[1]["config"] == str(tmp_path / "icu.yaml")
+
+
+def test_batch_isolates_failures_and_writes_index(tmp_path, pipeline_config_path):
+    generate_dataset("vitals", 200, seed=1).to_csv(tmp_path / "good.csv", index=False)
+    (tmp_path / "empty.csv").write_text("")
+    datasets = collect_datasets([str(tmp_path / "*.csv")], default_config=pipeline_config_path)
+    out = tmp_path / "out"
+
+    results = validate_batch(datasets, str(out), concurrency=2)
+
+    assert [(r["name"], r["status"]) for r in results] == [("empty", "failed"), ("good", "succeeded")]
+    assert (out / "empty" / "error.txt").exists()
+    assert results[1]["summary"]["rows"] == 200
+    index = json.loads((out / "index.json").read_text())
+    assert index["failed"] == 1
+    assert 'href="good/quality_report.html"' in (out / "index.html").read_text()
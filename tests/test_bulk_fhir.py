@@ -0,0 +1,115 @@
+import gzip
+import json
+
+from healthcli.bulk_fhir import load_fhir_ndjson, validate_lines
+from healthcli.fhir_models import Patient, VitalSigns
+from healthcli.metrics import MetricsRecorder
+from healthcli.pipeline import run_pipeline
+
+
+def _observation(obs_id, patient, code, value, unit, when):
+    return {
+        "resourceType": "Observation",
+        "id": obs_id,
+        "status": "final",
+        "code": {"coding": [{"system": "http://loinc.org", "code": code}], "text": "vital"},
+        "subject": {"reference": f"Patient/{patient}"},
+        "effectiveDateTime": when,
+        "valueQuantity": {"value": value, "unit": unit, "system": "http://unitsofmeasure.org", "code": unit},
+    }
+
+
+def _write_ndjson(path, resources, extra_lines=()):
+    lines = [json.dumps(r) for r in resources] + list(extra_lines)
+    opener = gzip.open if path.name.endswith(".gz") else open
+    with opener(path, "wt") as f:
+        f.write("\n".join(lines) + "\n")
+
+
+def test_validate_lines_captures_errors_per_line():
+    lines = [
+        json.dumps({"resourceType": "Patient", "id": "1", "gender": "female"}).encode(),
+        json.dumps(_observation("o1", "1", "8867-4", 500, "/min", "2024-01-01T00:00:00Z")).encode(),
+        json.dumps({"resourceType": "Encounter", "id": "e1"}).encode(),
+    ]
+
+    patient, vital, other = validate_lines(lines)
+
+    assert isinstance(patient, Patient)
+    assert vital[0]["loc"][:2] == ("VitalSigns", "value")
+    assert other.resourceType == "Encounter"
+    assert isinstance(validate_lines(lines[:1] + [b"{not json"])[0], Patient)
+
+
+def test_alias_coded_observations_are_vital_signs(tmp_path):
+    pulse = _observation("p1", "1", "8867-4", 900, "/min", "2024-01-01T08:00:00Z")
+    pulse["code"] = {"text": "Pulse"}
+    spo2 = _observation("s1", "1", "8867-4", 97, "%", "2024-01-01T08:00:00Z")
+    spo2["code"] = {"coding": [{"system": "http://example.org/local", "code": "Oxygen-Saturation"}]}
+    lines = [json.dumps(r).encode() for r in (pulse, spo2)]
+
+    rejected, vital = validate_lines(lines)
+
+    assert rejected[0]["loc"][:2] == ("VitalSigns", "value")
+    assert isinstance(vital, VitalSigns)
+
+    _write_ndjson(tmp_path / "Patient.ndjson", [{"resourceType": "Patient", "id": "1", "gender": "male"}])
+    _write_ndjson(tmp_path / "Observation.ndjson", [pulse, spo2])
+    bulk = load_fhir_ndjson(str(tmp_path))
+    assert bulk.summary["observation_errors"] == 1 and bulk.summary["unmapped_observations"] == 0
+    assert bulk.frame["spo2"].tolist() == [97]
+
+
+def test_load_fhir_ndjson_flattens_valid_resources(tmp_path):
+    _write_ndjson(tmp_path / "Patient.ndjson", [
+        {"resourceType": "Patient", "id": "1", "gender": "female", "birthDate": "1950-06-01"},
+        {"resourceType": "Patient", "id": "2", "gender": "robot"},
+    ])
+    _write_ndjson(tmp_path / "Observation.ndjson.gz", [
+        _observation("a", "1", "8480-6", 130, "mmHg", "2024-01-01T08:00:00+00:00"),
+        _observation("b", "1", "8867-4", 70, "/min", "2024-01-01T08:00:00+00:00"),
+        _observation("c", "1", "8867-4", 72, "/min", "2024-01-01T09:00:00+00:00"),
+        _observation("d", "1", "8310-5", 55, "Cel", "2024-01-01T09:00:00+00:00"),  # implausible
+        _observation("e", "1", "9999-9", 1, "x", "2024-01-01T09:00:00+00:00"),  # no column
+    ], extra_lines=["", "{oops"])
+
+    bulk = load_fhir_ndjson(str(tmp_path), batch_lines=2)
+
+    counts = {key: value for key, value in bulk.summary.items() if isinstance(value, int)}
+    assert counts == {
+        "patients_validated": 1,
+        "patient_errors": 1,
+        "observations_validated": 4,
+        "observation_errors": 1,
+        "invalid_lines": 1,
+        "resources_skipped": 0,
+        "unmapped_observations": 1,
+    }
+    assert bulk.summary["errors"][0].startswith("VitalSigns Observation.ndjson.gz line 4: value:")
+    assert [d["resource"] for d in bulk.summary["error_details"]] == ["VitalSigns", "NDJSON", "Patient"]
+
+    frame = bulk.frame
+    assert list(frame.columns) == [
+        "patient_id", "timestamp", "gender", "birthDate", "age", "systolic_bp", "heart_rate",
+    ]
+    assert frame["heart_rate"].tolist() == [70, 72]
+    assert frame["systolic_bp"].isna().tolist() == [False, True]
+    assert frame["age"].tolist() == [73, 73]
+    assert frame["gender"].tolist() == ["female", "female"]
+
+
+def test_pipeline_does_not_validate_the_flattened_frame_again(tmp_path, pipeline_config_path):
+    data = tmp_path / "export"
+    data.mkdir()
+    _write_ndjson(data / "Patient.ndjson", [{"resourceType": "Patient", "id": "1", "gender": "male"}])
+    _write_ndjson(data / "Observation.ndjson", [
+        _observation("a", "1", "8867-4", 70, "/min", "2024-01-01T08:00:00+00:00"),
+        _observation("b", "1", "8867-4", 72, "/min", "2024-01-01T09:00:00+00:00"),
+    ])
+    recorder = MetricsRecorder()
+
+    assert run_pipeline(str(data), pipeline_config_path, str(tmp_path / "out"), recorder=recorder) == 0
+
+    assert "fhir_validation_summary" not in {stage.stage for stage in recorder.stages}
+    fhir = json.loads((tmp_path / "out" / "summary.json").read_text())["fhir"]
+    assert fhir["patients_validated"] == 1 and fhir["observations_validated"] == 2
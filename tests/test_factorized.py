@@ -0,0 +1,46 @@
+import numpy as np
+import pandas as pd
+
+from healthcli.clinical_rules import PatientSexConsistencyRule
+from healthcli.clinical_rules_extended import VitalSignAnomalyRule
+from healthcli.factorized import FactorizedFrame, distinct_per_group
+
+
+def test_distinct_per_group_matches_groupby_nunique():
+    df = pd.DataFrame({
+        "patient_id": ["a", "a", "b", "b", None, "c"],
+        "sex": ["M", "F", "F", None, "M", "F"],
+    })
+    codes = FactorizedFrame(df)
+
+    distinct = distinct_per_group(
+        codes.key_codes, codes.n_groups, codes.codes("sex"), codes.cardinality("sex")
+    )
+
+    assert distinct.tolist() == [2, 1, 1]
+    assert PatientSexConsistencyRule().apply(df, codes=codes)[0].affected_rows == 2
+
+
+def test_vital_spike_detection_matches_per_patient_loop():
+    rng = np.random.default_rng(0)
+    n = 500
+    df = pd.DataFrame({
+        "patient_id": rng.integers(0, 40, n).astype(str),
+        "timestamp": rng.permutation(n),
+        "heart_rate": rng.choice([0.0, 60.0, 70.0, 120.0, np.nan], n),
+    })
+
+    expected = []
+    for _, group in df.groupby("patient_id"):
+        group = group.sort_values("timestamp")
+        values = group["heart_rate"].to_numpy()
+        for i in range(1, len(values)):
+            prev_val, curr_val = values[i - 1], values[i]
+            if np.isnan(prev_val) or np.isnan(curr_val) or prev_val == 0:
+                continue
+            if abs((curr_val - prev_val) / prev_val) * 100 > 50:
+                expected.append(group.index[i])
+
+    detected = VitalSignAnomalyRule().detect_spike(df, "heart_rate")
+
+    assert sorted(detected) == sorted(expected)
@@ -0,0 +1,73 @@
+import gzip
+import json
+import logging
+
+import pandas as pd
+
+from healthcli.fhir_export import NdjsonExporter, merge_parts
+from healthcli.fhir_models import Patient, VitalSigns
+from healthcli.quality import fhir_validation_summary
+
+
+def _read(path):
+    with gzip.open(path, "rt") as f:
+        return [json.loads(line) for line in f]
+
+
+def test_validation_exports_valid_resources_in_batches(tmp_path):
+    df = pd.DataFrame({
+        "patient_nbr": [1, 1, 2],
+        "gender": ["Female", "Female", "Male"],
+        "timestamp": ["2024-01-01T08:00:00+00:00", "2024-01-01T09:00:00+00:00", None],
+        "temperature": [36.6, 55.0, 37.1],
+    })
+
+    with NdjsonExporter(str(tmp_path), batch_size=1) as exporter:
+        summary = fhir_validation_summary(df, logging.getLogger("test"), sink=exporter)
+
+    assert exporter.files == ["Patient.ndjson.gz", "Observation.ndjson.gz"]
+    assert exporter.counts == {"Patient": 2, "Observation": 2}
+    assert summary["observation_errors"] == 1
+    assert [p["id"] for p in _read(tmp_path / "Patient.ndjson.gz")] == ["1", "2"]
+
+    observations = _read(tmp_path / "Observation.ndjson.gz")
+    assert observations[0]["id"] == "vital-0-temperature"
+    assert observations[0]["code"]["coding"] == [{"system": "http://loinc.org", "code": "8310-5"}]
+    assert observations[0]["subject"] == {"reference": "Patient/1"}
+    assert observations[0]["effectiveDateTime"] == "2024-01-01T08:00:00Z"
+    assert observations[0]["valueQuantity"] == {
+        "value": 36.6, "unit": "C", "system": "http://unitsofmeasure.org", "code": "Cel",
+    }
+    assert "effectiveDateTime" not in observations[1]
+    # The export reads back as the same resources
+    assert VitalSigns.model_validate(observations[1]).value.value == 37.1
+
+
+def test_merge_parts_joins_partitions_and_drops_repeated_patients(tmp_path):
+    parts = []
+    for index, (patient, value) in enumerate([("1", 70.0), ("1", 72.0)]):
+        with NdjsonExporter(str(tmp_path), part=index) as exporter:
+            exporter(Patient(id=patient, gender="male"))
+            exporter(VitalSigns(
+                id=f"v{index}", code="heart_rate", subject=patient,
+                value={"value": value, "unit": "bpm", "code": "/min"},
+            ))
+        parts.append(exporter.files)
+
+    merged = merge_parts(str(tmp_path), parts)
+
+    assert merged == ["Patient.ndjson.gz", "Observation.ndjson.gz"]
+    assert sorted(p.name for p in tmp_path.iterdir()) == sorted(merged)
+    assert len(_read(tmp_path / "Patient.ndjson.gz")) == 1
+    assert [o["valueQuantity"]["value"] for o in _read(tmp_path / "Observation.ndjson.gz")] == [70.0, 72.0]
+
+
+def test_timestamps_are_only_parsed_for_the_export(tmp_path):
+    df = pd.DataFrame({"patient_nbr": [1, 2], "timestamp": ["not a time", None], "heart_rate": [70.0, 72.0]})
+
+    summary = fhir_validation_summary(df, logging.getLogger("test"))
+    with NdjsonExporter(str(tmp_path)) as exporter:
+        exported = fhir_validation_summary(df, logging.getLogger("test"), sink=exporter)
+
+    assert (summary["observations_validated"], summary["observation_errors"]) == (2, 0)
+    assert (exported["observations_validated"], exported["observation_errors"]) == (1, 1)
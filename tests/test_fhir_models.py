@@ -0,0 +1,38 @@
+import pytest
+
+from healthcli.fhir_models import (
+    LOINC_COLUMNS,
+    VITAL_SIGN_ALIASES,
+    VITAL_SIGN_RANGES,
+    VitalSigns,
+    vital_sign_column,
+    vital_sign_range,
+)
+
+# Every code the registry resolves: column names, aliases and LOINC codes
+VITAL_CODES = [
+    *((column, column) for column in VITAL_SIGN_RANGES),
+    *((alias, column) for column, aliases in VITAL_SIGN_ALIASES.items() for alias in aliases),
+    *((loinc, column) for loinc, column in LOINC_COLUMNS.items() if column in VITAL_SIGN_RANGES),
+]
+
+
+@pytest.mark.parametrize("code, column", VITAL_CODES)
+def test_vital_codes_resolve_to_their_range(code, column):
+    bounds = VITAL_SIGN_RANGES[column]
+
+    assert vital_sign_column(code) == column
+    assert vital_sign_range(code) is bounds
+    assert vital_sign_range(code.upper().replace("_", " ")) is bounds
+    assert vital_sign_range(code.replace("_", "-")) is bounds
+    with pytest.raises(ValueError, match=bounds.message.split(" {value}")[0]):
+        VitalSigns(
+            id="v", code=code, subject="1", value={"value": bounds.high + 1, "unit": bounds.unit, "code": bounds.ucum}
+        )
+
+
+@pytest.mark.parametrize("code", ["threshold", "heart", "systolic_bp_delta", "glucose", "2345-7", ""])
+def test_other_codes_have_no_vital_range(code):
+    assert vital_sign_range(code) is None
+    vital = VitalSigns(id="v", code=code, subject="1", value={"value": 999.0, "unit": "x", "code": "x"})
+    assert vital.value.value == 999.0
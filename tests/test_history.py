@@ -0,0 +1,37 @@
+import pandas as pd
+
+from healthcli.clinical_rules_extended import RuleResult
+from healthcli.history import HistoryStore
+
+
+def _missing(count):
+    return pd.DataFrame({"missing_count": [count, 0], "missing_ratio": [count / 10, 0.0]}, index=["age", "gender"])
+
+
+def test_trends_are_filtered_by_dataset_and_time(tmp_path):
+    with HistoryStore(str(tmp_path / "history.db")) as store:
+        for month, count in [("2026-01", 1), ("2026-02", 3), ("2026-03", 5)]:
+            store.record_run(
+                "diabetic",
+                "data/diabetic.csv",
+                rows=10,
+                columns=2,
+                missing_summary=_missing(count),
+                clinical_violations={"AgePlausibilityRule": RuleResult(rule_name="AgePlausibilityRule", count=count)},
+                fhir_summary={"patient_errors": count},
+                run_at=f"{month}-01T00:00:00",
+            )
+        store.record_run("vitals", "data/vitals.csv", rows=5, columns=1, run_at="2026-03-02T00:00:00")
+
+        header, rows = store.run_trend(dataset="diabetic", since="2026-02-01")
+        assert [dict(zip(header, r))["violations"] for r in rows] == [5, 3]
+
+        header, rows = store.column_trend(dataset="diabetic", column="age", limit=2)
+        assert [r[header.index("missing_count")] for r in rows] == [5, 3]
+
+        header, rows = store.rule_trend(rule="AgePlausibilityRule", until="2026-02-01")
+        assert [r[header.index("violations")] for r in rows] == [1]
+
+    with HistoryStore(str(tmp_path / "history.db")) as reopened:
+        _, rows = reopened.run_trend()
+        assert len(rows) == 4
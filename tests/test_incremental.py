@@ -0,0 +1,71 @@
+from healthcli.incremental import IncrementalState
+from healthcli.pipeline import run_pipeline
+from healthcli.synthetic import generate_dataset
+
+
+def test_incremental_runs_match_a_full_run(tmp_path, pipeline_config_path):
+    config_path = pipeline_config_path
+    lines = generate_dataset("vitals", 3_000, seed=7).to_csv(index=False).splitlines(keepends=True)
+    data = tmp_path / "vitals.csv"
+
+    # Appended in three parts, splitting patients' timelines across runs
+    for end in (1_001, 2_013, len(lines)):
+        data.write_text("".join(lines[:end]))
+        run_pipeline(str(data), config_path, str(tmp_path / "inc"), incremental=True)
+    run_pipeline(str(data), config_path, str(tmp_path / "full"))
+
+    assert (tmp_path / "inc" / "missing_summary.csv").read_text() == (
+        tmp_path / "full" / "missing_summary.csv"
+    ).read_text()
+    inc_pages = sorted((tmp_path / "inc" / "violations").iterdir())
+    full_pages = sorted((tmp_path / "full" / "violations").iterdir())
+    assert [p.read_text() for p in inc_pages] == [p.read_text() for p in full_pages]
+    assert IncrementalState(str(tmp_path / "inc")).rows == len(lines) - 1
+
+
+def test_state_is_rebuilt_when_the_file_is_rewritten(tmp_path):
+    data = tmp_path / "data.csv"
+    data.write_text("patient_id,age\n1,40\n2,50\n3,")
+
+    state = IncrementalState(str(tmp_path))
+    state.reset(str(data), "config")
+    chunk = state.read_new_rows(str(data))
+    assert chunk.index.tolist() == [0, 1]  # the unterminated last line waits
+    state.update_profile(chunk)
+    state.save()
+
+    data.write_text("patient_id,age\n1,40\n2,50\n3,60\n")
+    reloaded = IncrementalState(str(tmp_path))
+    assert reloaded.matches(str(data), "config")
+    assert reloaded.read_new_rows(str(data)).index.tolist() == [2]
+
+    data.write_text("patient_id,age\n9,41\n2,50\n3,60\n")
+    assert not IncrementalState(str(tmp_path)).matches(str(data), "config")
+    assert not IncrementalState(str(tmp_path)).matches(str(data), "other config")
+
+
+def test_errors_of_an_unsaved_run_are_dropped_on_the_next_save(tmp_path):
+    data = tmp_path / "data.csv"
+    data.write_text("patient_id,age\n1,40\n2,50\n")
+    errors = tmp_path / "incremental" / "fhir_errors.jsonl"
+
+    def save_with_error(state, chunk, row):
+        detail = {"resource": "Patient", "row": row, "column": None, "error": "invalid"}
+        state.merge({}, {"errors": [f"Patient row {row}"], "error_details": [detail]}, chunk)
+        state.save()
+
+    state = IncrementalState(str(tmp_path))
+    state.reset(str(data), "config")
+    chunk = state.read_new_rows(str(data))
+    state.update_profile(chunk)
+    save_with_error(state, chunk, 0)
+    # A run that wrote its errors but crashed before saving its state
+    with open(errors, "ab") as f:
+        f.write(b'{"resource": "Patient", "row": 99, "column": null, "error": "lost"}\n' * 3)
+
+    save_with_error(IncrementalState(str(tmp_path)), chunk, 1)
+
+    reloaded = IncrementalState(str(tmp_path))
+    assert reloaded.rows == 2  # loaded, not rebuilt
+    assert reloaded.fhir_errors_bytes == errors.stat().st_size
+    assert [d["row"] for d in reloaded.fhir_summary()["error_details"]] == [0, 1]
@@ -0,0 +1,53 @@
+import json
+import logging.handlers
+import os
+
+from healthcli.logging_utils import event, log_context, setup_logger, stop_listeners
+
+
+def test_queue_logger_writes_from_listener_and_rotates(tmp_path):
+    logger = setup_logger(
+        "healthcli.test_queue", level="DEBUG", log_dir=str(tmp_path), queue_handler=True, max_bytes=2_000, backup_count=2
+    )
+    assert [type(h) for h in logger.handlers] == [logging.handlers.QueueHandler]
+
+    for i in range(100):
+        logger.debug("record %d", i)
+    stop_listeners()
+
+    # Stopped listeners flush the queue and hand their handlers back to the logger
+    assert logging.handlers.QueueHandler not in [type(h) for h in logger.handlers]
+    files = sorted(tmp_path.glob("quality_*.log*"))
+    assert len(files) == 3
+    assert "record 99" in files[0].read_text()
+    for handler in logger.handlers:
+        handler.close()
+
+
+def test_rotating_loggers_of_a_process_share_its_own_file(tmp_path):
+    first, second = (
+        setup_logger(f"healthcli.test_rotating_{i}", log_dir=str(tmp_path), max_bytes=2_000) for i in range(2)
+    )
+
+    assert first.handlers[0] is second.handlers[0]
+    assert first.handlers[0].baseFilename.endswith(f"_{os.getpid()}.log")
+    first.handlers[0].close()
+
+
+def test_json_log_carries_context_and_event_fields(tmp_path):
+    logger = setup_logger("healthcli.test_json", log_dir=str(tmp_path), log_format="json", buffer_records=10)
+
+    with log_context(run_id="r1", dataset="site1"):
+        logger.info("%s: %d violations", "RuleA", 3, extra=event("rule", rule="RuleA", violations=3))
+    logger.info("outside")
+    log_file = next(tmp_path.glob("quality_*.jsonl"))
+    assert log_file.read_text() == ""  # still buffered
+
+    for handler in logger.handlers:
+        handler.flush()
+    first, second = [json.loads(line) for line in log_file.read_text().splitlines()]
+    assert first["message"] == "RuleA: 3 violations"
+    assert (first["run_id"], first["dataset"], first["event"], first["violations"]) == ("r1", "site1", "rule", 3)
+    assert "run_id" not in second and "event" not in second
+    for handler in logger.handlers:
+        handler.close()
@@ -0,0 +1,24 @@
+from healthcli.manifest import RunManifest
+
+
+def test_artifact_is_fresh_only_for_same_inputs_and_existing_files(tmp_path):
+    data = tmp_path / "data.csv"
+    data.write_text("patient_id,age\n1,40\n")
+    out_dir = tmp_path / "out"
+    out_dir.mkdir()
+    (out_dir / "missing_summary.csv").write_text("x\n")
+
+    manifest = RunManifest(str(out_dir))
+    key = manifest.key(data=manifest.fingerprint(str(data)))
+    manifest.record("missing_summary", key, ["missing_summary.csv"])
+    manifest.save()
+
+    reloaded = RunManifest(str(out_dir))
+    assert reloaded.is_fresh("missing_summary", reloaded.key(data=reloaded.fingerprint(str(data))))
+
+    data.write_text("patient_id,age\n1,41\n")
+    changed_key = reloaded.key(data=reloaded.fingerprint(str(data)))
+    assert not reloaded.is_fresh("missing_summary", changed_key)
+
+    (out_dir / "missing_summary.csv").unlink()
+    assert not reloaded.is_fresh("missing_summary", key)
@@ -0,0 +1,50 @@
+import pytest
+
+from healthcli.memory_budget import RowEstimate, estimate_rows, parse_size, plan_memory
+from healthcli.synthetic import generate_dataset
+
+MB = 2**20
+CONFIG = {"parallel": {"transport": "arrow"}, "transform": {"chunk_rows": 500_000}}
+
+
+def test_parse_size():
+    assert parse_size("512M") == 512 * MB
+    assert parse_size("1.5GB") == 3 * 512 * MB
+    assert parse_size(4096) == 4096
+    with pytest.raises(ValueError):
+        parse_size("lots")
+
+
+def test_estimate_extrapolates_rows_from_sample(tmp_path):
+    path = tmp_path / "vitals.csv"
+    generate_dataset("vitals", 5_000, seed=1).to_csv(path, index=False)
+
+    estimate = estimate_rows(str(path), sample_rows=500)
+
+    assert estimate.sample_rows == 500
+    assert estimate.row_bytes > 0
+    assert 4_500 < estimate.estimated_rows < 5_500
+
+
+def test_plan_only_reduces_requested_settings():
+    estimate = RowEstimate(sample_rows=1_000, row_bytes=150.0, estimated_rows=1_000_000)
+
+    roomy = plan_memory(8 * 1024 * MB, estimate, CONFIG, workers=4, base_bytes=100 * MB)
+    tight = plan_memory(1200 * MB, estimate, CONFIG, workers=4, base_bytes=100 * MB)
+
+    assert (roomy.workers, roomy.transport, roomy.chunk_rows) == (4, "arrow", 500_000)
+    assert roomy.render_process and not roomy.notes
+    assert tight.workers < 4
+    assert tight.chunk_rows < 500_000
+    assert tight.estimated_peak_bytes <= tight.budget_bytes
+    assert tight.apply(CONFIG)["parallel"]["workers"] == tight.workers
+    assert CONFIG["parallel"] == {"transport": "arrow"}
+
+
+def test_plan_notes_budget_below_minimum():
+    estimate = RowEstimate(sample_rows=1_000, row_bytes=150.0, estimated_rows=1_000_000)
+
+    plan = plan_memory(200 * MB, estimate, CONFIG, workers=2, base_bytes=100 * MB)
+
+    assert plan.workers == 1 and not plan.render_process
+    assert any("exceeds the budget" in note for note in plan.notes)
@@ -0,0 +1,33 @@
+import json
+
+from healthcli.metrics import MetricsRecorder
+
+
+def test_nested_stages_record_traced_peak_and_rows(tmp_path):
+    recorder = MetricsRecorder(trace_memory=True)
+    recorder.start()
+
+    with recorder.stage("outer", rows=1000):
+        with recorder.stage("inner") as stage:
+            buffer = bytearray(4_000_000)
+            stage.rows = len(buffer)
+            del buffer
+
+    recorder.stop()
+    recorder.write_json(tmp_path / "metrics.json")
+
+    stages = {m["stage"]: m for m in json.loads((tmp_path / "metrics.json").read_text())["stages"]}
+    assert list(stages) == ["inner", "outer"]
+    # The inner allocation must still count towards the enclosing stage
+    assert stages["inner"]["peak_traced_bytes"] >= 4_000_000
+    assert stages["outer"]["peak_traced_bytes"] >= 4_000_000
+    assert stages["outer"]["rows_per_second"] > 0
+
+
+def test_disabled_recorder_keeps_nothing():
+    recorder = MetricsRecorder(enabled=False)
+
+    with recorder.stage("ingest") as stage:
+        stage.rows = 10
+
+    assert recorder.stages == []
@@ -0,0 +1,72 @@
+import logging
+import os
+
+import pandas as pd
+
+from healthcli.parallel import partition_rows
+from healthcli.pipeline import validate
+from healthcli.shared_frame import SharedFrame, attach_frame
+from healthcli.synthetic import generate_dataset
+
+
+def test_partitions_keep_each_patient_together():
+    df = pd.DataFrame({"patient_id": [3, 1, 3, 2, 1, 3], "value": range(6)})
+
+    partitions = partition_rows(df, 4)
+
+    assert sorted(p for part in partitions for p in part) == list(range(6))
+    assert all(list(part) == sorted(part) for part in partitions)
+    patients = [set(df["patient_id"].iloc[part]) for part in partitions]
+    assert sum(len(p) for p in patients) == df["patient_id"].nunique()
+
+
+def test_parallel_validation_matches_serial(caplog, pipeline_config):
+    caplog.set_level(logging.ERROR)
+    for kind in ("vitals", "diabetic"):
+        df = generate_dataset(kind, 4_000, seed=11)
+
+        serial = validate(df, pipeline_config)
+        parallel = validate(df, pipeline_config, workers=3)
+
+        pd.testing.assert_frame_equal(parallel["missing_summary"], serial["missing_summary"])
+        assert parallel["fhir_summary"] == serial["fhir_summary"]
+        assert parallel["clinical_violations"].keys() == serial["clinical_violations"].keys()
+        for name, result in serial["clinical_violations"].items():
+            assert parallel["clinical_violations"][name].violations == result.violations
+
+
+def test_shared_frame_round_trips_selected_rows():
+    df = generate_dataset("vitals", 500, seed=5)
+    df.index = df.index + 1_000
+    positions = partition_rows(df, 3)[0]
+
+    with SharedFrame.create(df, batch_rows=128) as shared:
+        attached = attach_frame(shared.path, positions)
+
+    pd.testing.assert_frame_equal(attached, df.iloc[positions])
+    assert not os.path.exists(shared.path)
+
+
+def test_pickle_transport_matches_arrow(caplog, pipeline_config):
+    caplog.set_level(logging.ERROR)
+    df = generate_dataset("diabetic", 2_000, seed=3)
+
+    arrow = validate(df, pipeline_config, workers=2)
+    pickled = validate(df, {**pipeline_config, "parallel": {"transport": "pickle"}}, workers=2)
+
+    assert arrow["fhir_summary"] == pickled["fhir_summary"]
+    for name, result in pickled["clinical_violations"].items():
+        assert arrow["clinical_violations"][name].violations == result.violations
+
+
+def test_parallel_logs_rules_as_serial(caplog, pipeline_config):
+    df = generate_dataset("vitals", 2_000, seed=8)
+    logs = []
+    for workers in (1, 2):
+        caplog.clear()
+        with caplog.at_level(logging.WARNING, logger="healthcli.pipeline"):
+            validate(df, pipeline_config, workers=workers)
+        logs.append([r.getMessage() for r in caplog.records if r.getMessage().split(":")[0].endswith("Rule")])
+
+    assert logs[0] == logs[1]
+    assert "found" in logs[0][1] and "vital sign anomalies" in logs[0][1]
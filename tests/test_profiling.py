@@ -0,0 +1,32 @@
+import json
+import pstats
+
+from healthcli.main import main
+from healthcli.synthetic import generate_dataset
+
+
+def test_profile_pipeline_writes_profiles_and_allocations(tmp_path, pipeline_config_path):
+    data = tmp_path / "vitals.csv"
+    generate_dataset("vitals", 300, seed=6).to_csv(data, index=False)
+    profile_dir = tmp_path / "profile"
+
+    status = main([
+        "profile", "pipeline", "--data", str(data), "--config", pipeline_config_path,
+        "--output", str(tmp_path / "out"), "--profile-dir", str(profile_dir),
+        "--top-n", "3", "--sample-interval", "1",
+    ])
+
+    assert status == 0
+    assert (tmp_path / "out" / "quality_report.html").exists()
+    functions = {name for _, _, name in pstats.Stats(str(profile_dir / "profile.pstats")).stats}
+    assert "run_pipeline" in functions
+    stacks = (profile_dir / "profile.collapsed").read_text().splitlines()
+    assert stacks and all(line.rsplit(" ", 1)[1].isdigit() for line in stacks)
+    assert "cumulative" in (profile_dir / "profile.txt").read_text()
+
+    allocations = json.loads((profile_dir / "allocations.json").read_text())
+    assert {"ingest", "run_clinical_rules"} <= set(allocations)
+    assert all(len(sites) <= 3 for sites in allocations.values())
+    assert "[ingest]" in (profile_dir / "allocations.txt").read_text()
+    metrics = json.loads((profile_dir / "metrics.json").read_text())
+    assert "ingest" in {stage["stage"] for stage in metrics["stages"]}
@@ -0,0 +1,35 @@
+import pandas as pd
+
+from healthcli.clinical_rules_extended import RuleResult
+from healthcli.quality_report import QualityReportGenerator
+
+
+def test_full_violations_are_paginated_and_linked(tmp_path):
+    df = pd.DataFrame({"age": range(50)})
+    violations = {
+        "ClinicalCoherenceRule": RuleResult(
+            rule_name="ClinicalCoherenceRule", violations=list(range(45)), count=45
+        ),
+    }
+    generator = QualityReportGenerator()
+
+    files = generator.export_violations(violations, str(tmp_path), page_size=20)
+    generator.generate_html_report(
+        df,
+        clinical_violations=violations,
+        output_path=str(tmp_path / "report.html"),
+        chart_base64="",
+        violation_files=files,
+    )
+
+    assert files["ClinicalCoherenceRule"] == [
+        "violations/ClinicalCoherenceRule_0001.csv",
+        "violations/ClinicalCoherenceRule_0002.csv",
+        "violations/ClinicalCoherenceRule_0003.csv",
+    ]
+    exported = pd.concat(pd.read_csv(tmp_path / f) for f in files["ClinicalCoherenceRule"])
+    assert exported["violation"].tolist() == list(range(45))
+
+    html = (tmp_path / "report.html").read_text(encoding="utf-8")
+    assert "Affected rows (first 20)" in html
+    assert 'href="violations/ClinicalCoherenceRule_0003.csv"' in html
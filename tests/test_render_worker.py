@@ -0,0 +1,88 @@
+import os
+import time
+
+import pytest
+
+from healthcli import quality_report, render_worker
+from healthcli.render_worker import ReportRenderer, read_marker, render_pdf
+
+COUNTS = {"age": 12, "glucose": 40, "gender": 0}
+PARENT_PID = os.getpid()
+_render_pdf = render_pdf
+
+
+def _render_pdf_or_die(*args):
+    # The render process dies mid-render; the pipeline process renders normally
+    if os.getpid() != PARENT_PID:
+        os._exit(1)
+    return _render_pdf(*args)
+
+
+@pytest.fixture
+def no_weasyprint(monkeypatch):
+    monkeypatch.setattr(quality_report, "HTML", None)
+    monkeypatch.setattr(quality_report, "WEASYPRINT_IMPORT_ERROR", ImportError("No module named 'weasyprint'"))
+    monkeypatch.setattr(quality_report, "_WEASYPRINT_LOADED", True)
+
+
+def test_render_process_and_inline_charts_match():
+    renderers = [ReportRenderer(use_process=True), ReportRenderer(use_process=False)]
+    try:
+        for renderer in renderers:
+            renderer.submit_chart(COUNTS)
+        charts = [renderer.chart() for renderer in renderers]
+    finally:
+        for renderer in renderers:
+            renderer.shutdown()
+
+    assert charts[0] and charts[0] == charts[1]
+    assert ReportRenderer(use_process=False).chart() is None
+
+
+def test_pdf_marker_when_weasyprint_is_missing(tmp_path, no_weasyprint):
+    html, pdf = tmp_path / "report.html", tmp_path / "report.pdf"
+    html.write_text("<html><body>report</body></html>")
+
+    marker = render_pdf(str(html), str(pdf))
+
+    assert marker["status"] == "skipped"
+    assert marker["error"] == "WeasyPrint is required for PDF generation"
+    assert marker["html"] == str(html) and marker["pdf"] == str(pdf)
+    assert read_marker(str(pdf)) == marker
+    assert not pdf.exists()
+
+
+def test_pdf_renders_in_process_after_the_render_worker_dies(tmp_path, monkeypatch, no_weasyprint):
+    html, pdf = tmp_path / "report.html", tmp_path / "report.pdf"
+    html.write_text("<html><body>report</body></html>")
+    monkeypatch.setattr(render_worker, "render_pdf", _render_pdf_or_die)
+
+    renderer = ReportRenderer(use_process=True)
+    try:
+        renderer.submit_pdf(str(html), str(pdf))
+        marker = renderer.wait_pdf()
+        # The pool stays broken: later work falls back as well
+        renderer.submit_chart(COUNTS)
+        chart = renderer.chart()
+    finally:
+        renderer.shutdown()
+
+    assert marker["status"] == "skipped"
+    assert read_marker(str(pdf)) == marker
+    assert chart
+
+
+def test_detached_pdf_writes_marker_when_done(tmp_path):
+    html, pdf = tmp_path / "report.html", tmp_path / "report.pdf"
+    html.write_text("<html><body>report</body></html>")
+
+    renderer = ReportRenderer(use_process=False)
+    renderer.submit_pdf(str(html), str(pdf), detach=True)
+    assert renderer.wait_pdf() is None
+
+    deadline = time.monotonic() + 60
+    while read_marker(str(pdf)) is None and time.monotonic() < deadline:
+        time.sleep(0.1)
+    marker = read_marker(str(pdf))
+    assert marker is not None and marker["status"] in ("ok", "skipped")
+    assert marker["html"] == str(html)
@@ -1,6 +1,6 @@
 import pandas as pd
 
-from healthcli.clinical_rules import PatientSexConsistencyRule
+from healthcli.clinical_rules import AgePlausibilityRule, PatientSexConsistencyRule
 from healthcli.runner import RuleRunner
 
 
@@ -17,4 +17,45 @@ def test_runner_executes_rules():
 
     assert len(results) == 1
     assert results[0].rule == "patient_sex_consistency"
-    assert results[0].severity == "ERROR"
\ No newline at end of file
+    assert results[0].severity == "ERROR"
+
+
+def test_runner_fail_fast_orders_by_priority_and_stops_on_error():
+    df = pd.DataFrame({
+        "patient_id": [1, 1, 2],
+        "sex": ["M", "F", "F"],
+        "age": [200, 40, 30],
+    })
+
+    rules = [PatientSexConsistencyRule(), AgePlausibilityRule()]
+    runner = RuleRunner(rules, fail_fast=True)
+
+    results = runner.run(df)
+
+    # AgePlausibilityRule is cheaper and runs first; the ERROR ends the run
+    assert [r.rule for r in results] == ["age_plausibility", "patient_sex_consistency"]
+    assert results[-1].severity == "ERROR"
+
+    class NeverRunRule(AgePlausibilityRule):
+        name = "never_run"
+        priority = 90
+
+        def apply(self, df):
+            raise AssertionError("rule after an ERROR must not run")
+
+    runner = RuleRunner([PatientSexConsistencyRule(), NeverRunRule()], fail_fast=True)
+    assert runner.run(df)[-1].severity == "ERROR"
+
+
+def test_runner_sample_precheck_rejects_without_full_scan():
+    df = pd.DataFrame({
+        "patient_id": [1, 1] + list(range(2, 100)),
+        "sex": ["M", "F"] + ["F"] * 98,
+    })
+
+    runner = RuleRunner([PatientSexConsistencyRule()], fail_fast=True, sample_size=10)
+    results = runner.run(df)
+
+    assert len(results) == 1
+    assert results[0].severity == "ERROR"
+    assert "pre-check sample of 10 rows" in results[0].message
@@ -0,0 +1,65 @@
+import pandas as pd
+
+from healthcli.pipeline import run_pipeline
+from healthcli.sampling import estimate_rates, sample_csv, wilson_interval
+from healthcli.synthetic import generate_dataset
+
+
+def _write(tmp_path, rows=3_000):
+    path = tmp_path / "vitals.csv"
+    generate_dataset("vitals", rows, seed=4).to_csv(path, index=False)
+    return path
+
+
+def test_reservoir_sample_keeps_file_rows_and_exact_missing_counts(tmp_path):
+    path = _write(tmp_path)
+    full = pd.read_csv(path)
+
+    sample = sample_csv(str(path), 500, seed=2, chunk_rows=700)
+
+    assert len(sample.frame) == 500 and sample.total_rows == len(full)
+    pd.testing.assert_frame_equal(sample.frame, full.loc[sample.frame.index])
+    assert sample.missing_counts == full.isna().sum().to_dict()
+    assert sample_csv(str(path), 500, seed=2, chunk_rows=700).frame.index.equals(sample.frame.index)
+
+
+def test_group_sample_keeps_whole_patients(tmp_path):
+    path = _write(tmp_path)
+    full = pd.read_csv(path)
+
+    sample = sample_csv(str(path), 500, by="patient_id", chunk_rows=700)
+
+    sizes = sample.frame["patient_id"].value_counts()
+    assert (full["patient_id"].value_counts().reindex(sizes.index) == sizes).all()
+    assert 500 <= len(sample.frame) < 500 + sizes.max()
+
+
+def test_wilson_interval():
+    low, high = wilson_interval(0, 100)
+    assert low == 0.0 and 0.03 < high < 0.04
+    low, high = wilson_interval(50, 100)
+    assert low < 0.5 < high and abs((0.5 - low) - (high - 0.5)) < 1e-9
+
+
+def test_whole_file_sample_is_exact(tmp_path):
+    path = _write(tmp_path, rows=300)
+    sample = sample_csv(str(path), 10_000)
+
+    fhir = {"error_details": [{"resource": "VitalSigns", "row": int(sample.frame.index[0])}]}
+    estimates = estimate_rates(sample, {}, fhir)
+
+    row = estimates.loc["Any FHIR error"]
+    assert row["ci_low"] == row["rate"] == row["ci_high"] == 1 / 300
+    assert row["estimated_count"] == 1
+
+
+def test_sample_pipeline_labels_report(tmp_path, pipeline_config_path):
+    path = _write(tmp_path)
+    out = tmp_path / "out"
+
+    run_pipeline(str(path), pipeline_config_path, str(out), sample=400, sample_by="patient_id")
+
+    assert "Sample-based report" in (out / "quality_report.html").read_text()
+    estimates = pd.read_csv(out / "sample_estimates.csv", index_col="metric")
+    assert "VitalSignAnomalyRule" in estimates.index
+    assert not (out / "cleaned").exists()
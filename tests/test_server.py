@@ -0,0 +1,62 @@
+import json
+import logging
+import threading
+import time
+import urllib.error
+import urllib.request
+
+import pytest
+
+from healthcli.server import JobQueue, QueueFull, make_server
+from healthcli.synthetic import generate_dataset
+
+
+def _slow_job(spec):
+    time.sleep(0.5)
+    return {"exit_code": 0}
+
+
+def _request(url, payload=None):
+    data = None if payload is None else json.dumps(payload).encode("utf-8")
+    try:
+        with urllib.request.urlopen(urllib.request.Request(url, data=data)) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as exc:
+        return exc.code, json.loads(exc.read())
+
+
+def test_jobs_run_over_http(tmp_path, pipeline_config_path):
+    data = tmp_path / "site.csv"
+    generate_dataset("vitals", 200, seed=2).to_csv(data, index=False)
+
+    queue = JobQueue(workers=1, queue_size=4, initializer=None, default_config=pipeline_config_path)
+    server = make_server(queue, logging.getLogger("test"), port=0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = "http://127.0.0.1:%d" % server.server_address[1]
+    try:
+        status, job = _request(f"{base}/jobs", {"data": str(data), "output": str(tmp_path / "out")})
+        assert status == 202 and job["status"] in ("queued", "running")
+
+        status, job = _request(f"{base}/jobs/{job['id']}?wait=60")
+        assert status == 200 and job["status"] == "succeeded", job
+        assert (tmp_path / "out" / "quality_report.html").exists()
+
+        assert _request(f"{base}/jobs", {"output": "x"})[0] == 400
+        assert _request(f"{base}/jobs/unknown")[0] == 404
+    finally:
+        server.shutdown()
+        server.server_close()
+        queue.shutdown()
+
+
+def test_queue_is_bounded(tmp_path):
+    queue = JobQueue(workers=1, queue_size=2, runner=_slow_job, initializer=None)
+    try:
+        first = queue.submit({"data": "a.csv"})
+        queue.submit({"data": "b.csv"})
+        with pytest.raises(QueueFull):
+            queue.submit({"data": "c.csv"})
+
+        assert queue.status(first["id"], wait=30)["status"] == "succeeded"
+    finally:
+        queue.shutdown()
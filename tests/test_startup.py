@@ -0,0 +1,72 @@
+import subprocess
+import sys
+from pathlib import Path
+
+# Cumulative import time allowed for healthcli.main, in microseconds.
+# Importing the CLI must stay close to the cost of argparse itself.
+STARTUP_BUDGET_US = 100_000
+
+HEAVY_MODULES = ["pandas", "numpy", "pydantic", "matplotlib", "jinja2", "weasyprint"]
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+
+def _loaded_heavy_modules(code: str, cwd: Path) -> list:
+    script = (
+        "import sys\n"
+        f"{code}\n"
+        f"print('LOADED:' + ','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))\n"
+    )
+    out = subprocess.run(
+        [sys.executable, "-c", script],
+        cwd=cwd,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    loaded = out[out.rindex("LOADED:") + len("LOADED:"):].strip()
+    return [m for m in loaded.split(",") if m]
+
+
+def test_import_time_within_budget():
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import healthcli.main"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    cumulative = None
+    for line in result.stderr.splitlines():
+        parts = [p.strip() for p in line.split("|")]
+        if len(parts) == 3 and parts[2] == "healthcli.main":
+            cumulative = int(parts[1])
+
+    assert cumulative is not None
+    assert cumulative < STARTUP_BUDGET_US, f"healthcli.main import took {cumulative} us"
+
+
+def test_help_does_not_import_pandas(tmp_path):
+    code = (
+        "from healthcli.main import main\n"
+        "try:\n"
+        "    main(['--help'])\n"
+        "except SystemExit:\n"
+        "    pass"
+    )
+
+    assert _loaded_heavy_modules(code, tmp_path) == []
+
+
+def test_quality_does_not_import_report_libraries(tmp_path):
+    data = REPO_ROOT / "data" / "sample_clinical.csv"
+    config = REPO_ROOT / "config" / "config.yaml"
+    code = (
+        "from healthcli.main import main\n"
+        f"main(['quality', '--data', {str(data)!r}, '--config', {str(config)!r}])"
+    )
+
+    loaded = _loaded_heavy_modules(code, tmp_path)
+
+    assert "pandas" in loaded
+    assert not {"matplotlib", "jinja2", "weasyprint"} & set(loaded)
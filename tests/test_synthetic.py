@@ -0,0 +1,25 @@
+from healthcli.synthetic import generate_dataset
+
+
+def test_generator_is_deterministic_for_a_seed():
+    first = generate_dataset("diabetic", 2_000, seed=7, chunk_rows=500)
+    second = generate_dataset("diabetic", 2_000, seed=7, chunk_rows=500)
+    other = generate_dataset("diabetic", 2_000, seed=8, chunk_rows=500)
+
+    assert first.equals(second)
+    assert not first.equals(other)
+
+
+def test_vitals_chunks_keep_patient_timelines_whole():
+    df = generate_dataset("vitals", 1_000, seed=1, readings_per_patient=10, chunk_rows=95, missing_rate=0.0)
+
+    assert len(df) == 1_000
+    assert (df.groupby("patient_id").size() == 10).all()
+    assert df.groupby("patient_id")["timestamp"].is_monotonic_increasing.all()
+
+
+def test_missing_rate_is_configurable_per_column():
+    df = generate_dataset("vitals", 5_000, seed=2, missing_rate={"spo2": 0.5}, outlier_rate=0.0)
+
+    assert df["heart_rate"].notna().all()
+    assert 0.4 < df["spo2"].isna().mean() < 0.6
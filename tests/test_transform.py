@@ -0,0 +1,67 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from healthcli.quality import normalize_gender_value
+from healthcli.transform import clean, normalize_gender, null_out_of_range, write_cleaned
+
+
+def test_normalize_gender_matches_row_wise_normalization():
+    values = pd.Series(["Male", " female ", "Unknown/Invalid", None, "OTHER", np.nan, "Male"])
+
+    result = normalize_gender(values)
+
+    assert result.tolist() == [normalize_gender_value(v) for v in values]
+
+
+def test_null_out_of_range_uses_the_vital_sign_ranges():
+    values = pd.Series([25.0, 72.0, 250.0])
+
+    assert null_out_of_range(values, "heart_rate").isna().tolist() == [True, False, True]
+    assert null_out_of_range(values, "glucose").tolist() == values.tolist()
+
+
+def test_clean_coerces_nulls_implausible_vitals_and_fills_medians():
+    df = pd.DataFrame({
+        "gender": ["Male", "Female", "?", "Female"],
+        "glucose": ["120", "?", "abc", "140"],
+        "systolic_bp": [120.0, 320.0, 130.0, np.nan],
+        "notes": ["a", "?", "b", "c"],
+    })
+    config = {
+        "missing_values": {"placeholders": ["?"], "strategy": "median", "max_missing_ratio": 0.6},
+        "transform": {"numeric_columns": ["glucose", "systolic_bp"]},
+    }
+
+    cleaned = clean(df, config)
+
+    assert cleaned["gender"].tolist() == ["male", "female", "unknown", "female"]
+    assert cleaned["glucose"].tolist() == [120.0, 130.0, 130.0, 140.0]
+    assert cleaned["systolic_bp"].tolist() == [120.0, 125.0, 130.0, 125.0]
+    assert cleaned["notes"].isna().tolist() == [False, True, False, False]
+
+
+def test_incremental_clean_keeps_missing_values():
+    df = pd.DataFrame({"glucose": ["120", "?", "140"]})
+    config = {
+        "missing_values": {"placeholders": ["?"], "strategy": "median"},
+        "transform": {"numeric_columns": ["glucose"]},
+    }
+
+    cleaned = clean(df, config, incremental=True)
+
+    assert cleaned["glucose"].isna().tolist() == [False, True, False]
+
+
+@pytest.mark.parametrize("fmt", ["csv", "parquet"])
+def test_cleaned_output_is_streamed_in_chunks(tmp_path, fmt):
+    if fmt == "parquet":
+        pytest.importorskip("pyarrow")
+    df = pd.DataFrame({"patient_id": range(25), "heart_rate": np.linspace(60, 84, 25)})
+
+    files = write_cleaned(df, str(tmp_path), fmt=fmt, chunk_rows=10)
+    files = write_cleaned(df.iloc[20:], str(tmp_path), fmt=fmt, chunk_rows=10, first_row=20)
+
+    assert files == [f"cleaned/part-000000000000.{fmt}", f"cleaned/part-000000000020.{fmt}"]
+    read = pd.read_csv if fmt == "csv" else pd.read_parquet
+    assert read(tmp_path / files[0]).equals(df)
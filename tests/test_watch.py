@@ -0,0 +1,71 @@
+import json
+import threading
+import time
+
+import pytest
+
+from healthcli.synthetic import generate_dataset
+from healthcli.watch import Debouncer, InotifyWatcher, PollingWatcher, watch_directory
+
+
+def test_debouncer_waits_for_complete_settled_files():
+    debouncer = Debouncer(settle=1.0)
+    debouncer.touch("a.csv", False, now=0.0)
+    debouncer.touch("b.csv", True, now=0.5)
+
+    assert debouncer.ready(now=5.0) == ["b.csv"]
+    debouncer.touch("a.csv", True, now=6.0)
+    debouncer.touch("a.csv", True, now=6.8)  # still being written
+    assert debouncer.ready(now=7.0) == []
+    assert debouncer.ready(now=7.8) == ["a.csv"]
+    assert debouncer.pending == {}
+
+
+def test_watchers_report_new_and_changed_files(tmp_path):
+    (tmp_path / "old.csv").write_text("x\n1\n")
+    polling = PollingWatcher(str(tmp_path), interval=0.01)
+    try:
+        inotify = InotifyWatcher(str(tmp_path))
+    except OSError:
+        inotify = None
+
+    (tmp_path / "new.csv").write_text("x\n1\n")
+    assert polling.events(0.01) == [("new.csv", True)]
+    assert polling.events(0.01) == []
+    if inotify is not None:
+        events = inotify.events(1.0)
+        inotify.close()
+        assert ("new.csv", False) in events  # created, written
+        assert events[-1] == ("new.csv", True)  # closed after writing
+
+
+def test_watch_validates_dropped_files(tmp_path, pipeline_config_path):
+    drops, out = tmp_path / "drops", tmp_path / "out"
+    drops.mkdir()
+    generate_dataset("vitals", 100, seed=1).to_csv(drops / "site1.csv", index=False)
+
+    stop = threading.Event()
+    thread = threading.Thread(target=watch_directory, kwargs=dict(
+        directory=str(drops), output_dir=str(out), config_path=pipeline_config_path,
+        settle=0.2, poll_interval=0.05, existing=True, polling=True, stop=stop,
+    ))
+    thread.start()
+    try:
+        generate_dataset("vitals", 50, seed=2).to_csv(drops / "site2.csv", index=False)
+        (drops / "notes.txt").write_text("ignored")
+        deadline = time.monotonic() + 60
+        while time.monotonic() < deadline:
+            if (out / "index.json").exists():
+                index = json.loads((out / "index.json").read_text())
+                if len(index["datasets"]) == 2:
+                    break
+            time.sleep(0.1)
+        else:
+            pytest.fail("watch did not validate both files")
+    finally:
+        stop.set()
+        thread.join()
+
+    rows = {d["name"]: d["summary"]["rows"] for d in index["datasets"]}
+    assert rows == {"site1": 100, "site2": 50}
+    assert (out / "site2" / "quality_report.html").exists()